@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import sys
+
+import duckdb  # type: ignore[import-not-found]
+
+from dags import ROOT, SHAPES
+from suites import BenchResult, bench_loggers, bench_rows, bench_scheduler
+
+SUITES = ("scheduler", "rows", "persist")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_THRESHOLD = 0.15
+
+PROFILES: dict[str, dict[str, object]] = {
+    "quick": {
+        "scheduler_sizes": [100, 500],
+        "rows": 20_000,
+        "workers": [1, 2, 4],
+        "persist_rows": 5_000,
+        "payload_sizes": [64, 1024],
+        "repeat": 5,
+    },
+    "full": {
+        "scheduler_sizes": [100, 1000, 3000],
+        "rows": 200_000,
+        "workers": [1, 2, 4, 8],
+        "persist_rows": 50_000,
+        "payload_sizes": [64, 1024, 16384],
+        "repeat": 3,
+    },
+}
+
+
+def run_suites(suites: list[str], profile: str) -> dict[str, object]:
+    config = PROFILES[profile]
+    repeat = int(config["repeat"])
+    results: list[BenchResult] = []
+    if "scheduler" in suites:
+        results.extend(bench_scheduler(list(config["scheduler_sizes"]), SHAPES, repeat=repeat))
+    if "rows" in suites:
+        results.extend(bench_rows(int(config["rows"]), list(config["workers"]), repeat=repeat))
+    if "persist" in suites:
+        results.extend(
+            bench_loggers(
+                int(config["persist_rows"]),
+                list(config["payload_sizes"]),
+                repeat=repeat,
+            )
+        )
+    return {
+        "created_at_utc": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=" "),
+        "profile": profile,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duckdb": duckdb.__version__,
+        "cpu_count": os.cpu_count(),
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def compare_reports(
+    baseline: dict[str, object],
+    current: dict[str, object],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict[str, object]]:
+    previous = {str(item["name"]): item for item in baseline["results"]}
+    rows: list[dict[str, object]] = []
+    for item in current["results"]:
+        name = str(item["name"])
+        base = previous.get(name)
+        if base is None or not float(base["value"]):
+            rows.append({"name": name, "metric": item["metric"], "status": "new"})
+            continue
+        change = (float(item["value"]) - float(base["value"])) / float(base["value"])
+        worse = -change if item["higher_is_better"] else change
+        if worse > threshold:
+            status = "regression"
+        elif -worse > threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "metric": item["metric"],
+                "baseline": float(base["value"]),
+                "current": float(item["value"]),
+                "change": change,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def _print_results(report: dict[str, object]) -> None:
+    for item in report["results"]:
+        print(f"{item['name']:<40} {item['value']:>14.1f} {item['metric']}")
+
+
+def _print_comparison(rows: list[dict[str, object]]) -> None:
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{row['name']:<40} {'':>14} {'':>14} {'':>8}  new")
+            continue
+        print(
+            f"{row['name']:<40} {row['baseline']:>14.1f} {row['current']:>14.1f} "
+            f"{row['change']:>+8.1%}  {row['status']}"
+        )
+
+
+def _load(path: str) -> dict[str, object]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ninout benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark suites")
+    run_parser.add_argument("--suite", action="append", choices=SUITES, dest="suites")
+    run_parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    run_parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    run_parser.add_argument("--baseline", help="compare against this result file after running")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run_suites(args.suites or list(SUITES), args.profile)
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        _print_results(report)
+        print(f"Results: {output}")
+        if not args.baseline:
+            return 0
+        baseline, current = _load(args.baseline), report
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    rows = compare_reports(baseline, current, args.threshold)
+    _print_comparison(rows)
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from ninout.core.engine.models import Row, Step
+
+SHAPES = ("wide", "deep", "diamond", "random")
+
+
+def _noop(results) -> list[Row]:
+    return []
+
+
+def _identity(row: Row) -> Row:
+    return row
+
+
+def _step(name: str, deps: list[str]) -> Step:
+    return Step(name=name, func=_noop, deps=deps)
+
+
+def build_steps(shape: str, size: int, seed: int = 0, fan_in: int = 3) -> dict[str, Step]:
+    if size < 1:
+        raise ValueError("size deve ser >= 1")
+    names = [f"s{idx:05d}" for idx in range(size)]
+    if shape == "wide":
+        deps = [[]] + [[names[0]] for _ in names[1:]]
+    elif shape == "deep":
+        deps = [[]] + [[names[idx - 1]] for idx in range(1, size)]
+    elif shape == "diamond":
+        deps = [[]]
+        join = names[0]
+        branches: list[str] = []
+        for idx in range(1, size):
+            if len(branches) < 4 and idx < size - 1:
+                deps.append([join])
+                branches.append(names[idx])
+            else:
+                deps.append(branches or [join])
+                join = names[idx]
+                branches = []
+    elif shape == "random":
+        rng = random.Random(seed)
+        deps = [[]]
+        for idx in range(1, size):
+            deps.append(sorted(rng.sample(names[:idx], min(idx, rng.randint(1, fan_in)))))
+    else:
+        raise ValueError(f"shape invalido: {shape}. Use {', '.join(SHAPES)}.")
+    return {name: _step(name, step_deps) for name, step_deps in zip(names, deps)}
+
+
+def build_row_steps(rows: list[Row], consumers: int) -> dict[str, Step]:
+    steps = {"source": Step(name="source", func=lambda results: rows)}
+    for idx in range(consumers):
+        name = f"rows_{idx:03d}"
+        steps[name] = Step(name=name, func=_identity, deps=["source"], mode="row")
+    return steps
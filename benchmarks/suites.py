@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+import os
+import tempfile
+import time
+from typing import Callable
+
+from dags import SHAPES, build_row_steps, build_steps
+
+from ninout.core.engine.executor import run
+from ninout.core.engine.models import Row, Step
+from ninout.core.ui.persist_duckdb import DuckDBRunLogger
+from ninout.core.ui.persist_sqlite import SQLiteRunLogger
+
+
+@dataclass
+class BenchResult:
+    name: str
+    suite: str
+    metric: str
+    value: float
+    higher_is_better: bool = True
+    seconds: float = 0.0
+    params: dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, object]:
+        return asdict(self)
+
+
+def _best_of(repeat: int, func: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_scheduler(
+    sizes: list[int],
+    shapes: tuple[str, ...] = SHAPES,
+    max_workers: int = 4,
+    repeat: int = 3,
+) -> list[BenchResult]:
+    results: list[BenchResult] = []
+    for shape in shapes:
+        for size in sizes:
+            steps = build_steps(shape, size)
+            seconds = _best_of(repeat, lambda: run(steps, max_workers=max_workers))
+            results.append(
+                BenchResult(
+                    name=f"scheduler/{shape}/{size}",
+                    suite="scheduler",
+                    metric="us_per_step",
+                    value=seconds / size * 1_000_000,
+                    higher_is_better=False,
+                    seconds=seconds,
+                    params={"shape": shape, "size": size, "max_workers": max_workers},
+                )
+            )
+    return results
+
+
+def bench_rows(
+    rows: int,
+    workers: list[int],
+    repeat: int = 3,
+) -> list[BenchResult]:
+    payload: list[Row] = [{"id": idx, "value": idx * 2, "label": f"row-{idx}"} for idx in range(rows)]
+    results: list[BenchResult] = []
+    for count in workers:
+        steps = build_row_steps(payload, count)
+        seconds = _best_of(repeat, lambda: run(steps, max_workers=count))
+        results.append(
+            BenchResult(
+                name=f"rows/workers={count}",
+                suite="rows",
+                metric="rows_per_s",
+                value=rows * count / seconds,
+                seconds=seconds,
+                params={"rows": rows, "workers": count},
+            )
+        )
+    return results
+
+
+def _logger_meta(records: list[Row]) -> dict[str, object]:
+    return {
+        "status": "done",
+        "output": "",
+        "duration_ms": 1.0,
+        "result": records,
+        "row_ids": None,
+        "append_offset": None,
+        "input_lines": 0,
+        "output_lines": len(records),
+        "throughput_in_lps": 0.0,
+        "throughput_out_lps": 0.0,
+        "disabled_deps": [],
+        "disabled_self": False,
+    }
+
+
+def _write_run(kind: str, work_dir: str, steps: dict[str, Step], records: list[Row]) -> None:
+    if kind == "duckdb":
+        logger: DuckDBRunLogger | SQLiteRunLogger = DuckDBRunLogger(
+            db_path=os.path.join(work_dir, "run.duckdb"),
+            dag_name="bench",
+            steps=steps,
+        )
+    else:
+        logger = SQLiteRunLogger(
+            db_path=os.path.join(work_dir, "runs.sqlite"),
+            run_name=os.path.basename(work_dir),
+            dag_name="bench",
+            steps=steps,
+        )
+    try:
+        logger.log_step("sink", _logger_meta(records))
+    finally:
+        logger.close()
+
+
+def bench_loggers(
+    rows: int,
+    payload_sizes: list[int],
+    kinds: tuple[str, ...] = ("duckdb", "sqlite"),
+    repeat: int = 3,
+) -> list[BenchResult]:
+    steps = {"sink": Step(name="sink", func=lambda results: [])}
+    results: list[BenchResult] = []
+    for payload_size in payload_sizes:
+        records: list[Row] = [
+            {"id": idx, "score": idx / 3, "payload": "x" * payload_size} for idx in range(rows)
+        ]
+        for kind in kinds:
+            best = float("inf")
+            for _ in range(max(1, repeat)):
+                with tempfile.TemporaryDirectory(prefix="ninout_bench_") as work_dir:
+                    start = time.perf_counter()
+                    _write_run(kind, work_dir, steps, records)
+                    best = min(best, time.perf_counter() - start)
+            results.append(
+                BenchResult(
+                    name=f"persist/{kind}/payload={payload_size}",
+                    suite="persist",
+                    metric="rows_per_s",
+                    value=rows / best,
+                    seconds=best,
+                    params={
+                        "kind": kind,
+                        "rows": rows,
+                        "payload_bytes": payload_size,
+                        "mb_per_s": round(rows * payload_size / best / 1_000_000, 3),
+                    },
+                )
+            )
+    return results
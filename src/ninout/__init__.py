@@ -1,3 +1,3 @@
-from ninout.core import Dag
+from ninout.core import Dag, Runner
 
-__all__ = ["Dag"]
+__all__ = ["Dag", "Runner"]
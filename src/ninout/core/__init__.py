@@ -1,3 +1,3 @@
-from ninout.core.engine import Dag
+from ninout.core.engine import Dag, Runner
 
-__all__ = ["Dag"]
+__all__ = ["Dag", "Runner"]
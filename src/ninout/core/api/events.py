@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from ninout.core.api.repository import (
+    get_run_etag,
+    get_step_changes,
+    is_run_finished,
+    normalize_timestamp,
+)
+from ninout.core.api.schemas import StepChange
+
+_POLL_INTERVAL_S = 0.5
+_KEEPALIVE_S = 15.0
+_MAX_POLL_FAILURES = 20
+
+
+def format_event(event: str, data: object, event_id: str | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _end_event(feed: _RunFeed) -> str:
+    data: dict[str, object] = {"run_name": feed.run_name}
+    if feed.error is not None:
+        data["error"] = feed.error
+    return format_event("end", data)
+
+
+def _steps_event(changes: list[StepChange]) -> str:
+    return format_event(
+        "steps",
+        [change.model_dump() for change in changes],
+        event_id=max(change.updated_at_utc for change in changes),
+    )
+
+
+class _RunFeed:
+    def __init__(self, run_name: str) -> None:
+        self.run_name = run_name
+        self.subscribers: set[asyncio.Queue[str]] = set()
+        self.steps: dict[str, StepChange] = {}
+        self.finished = False
+        self.error: str | None = None
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+    def publish(self, event: str) -> None:
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+
+class RunEventHub:
+    def __init__(
+        self,
+        poll_interval_s: float = _POLL_INTERVAL_S,
+        keepalive_s: float = _KEEPALIVE_S,
+        max_poll_failures: int = _MAX_POLL_FAILURES,
+    ) -> None:
+        self.poll_interval_s = poll_interval_s
+        self.keepalive_s = keepalive_s
+        self.max_poll_failures = max_poll_failures
+        self._feeds: dict[str, _RunFeed] = {}
+
+    async def stream(self, run_name: str, since: str | None = None) -> AsyncIterator[str]:
+        since = normalize_timestamp(since) if since else None
+        feed = self._feeds.get(run_name)
+        if feed is None:
+            feed = _RunFeed(run_name)
+            self._feeds[run_name] = feed
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        feed.subscribers.add(queue)
+        if feed.task is None:
+            feed.task = asyncio.create_task(self._poll(feed))
+        try:
+            while not feed.ready.is_set():
+                try:
+                    await asyncio.wait_for(feed.ready.wait(), timeout=self.keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+            initial = [
+                change
+                for change in feed.steps.values()
+                if since is None or change.updated_at_utc > since
+            ]
+            if initial:
+                yield _steps_event(initial)
+            if feed.finished:
+                yield _end_event(feed)
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event
+                if event.startswith("event: end"):
+                    return
+        finally:
+            feed.subscribers.discard(queue)
+            if not feed.subscribers and self._feeds.get(run_name) is feed:
+                del self._feeds[run_name]
+                if feed.task is not None:
+                    feed.task.cancel()
+
+    async def _poll(self, feed: _RunFeed) -> None:
+        version: str | None = None
+        cursor: str | None = None
+        failures = 0
+        while True:
+            try:
+                current = await asyncio.to_thread(get_run_etag, feed.run_name)
+                if current != version:
+                    changes = await asyncio.to_thread(get_step_changes, feed.run_name, cursor)
+                    finished = await asyncio.to_thread(is_run_finished, feed.run_name)
+                    version = current
+                    if changes:
+                        cursor = max(change.updated_at_utc for change in changes)
+                        feed.steps.update((change.step_name, change) for change in changes)
+                        if feed.ready.is_set():
+                            feed.publish(_steps_event(changes))
+                    feed.finished = finished
+                    if finished and feed.ready.is_set():
+                        feed.publish(_end_event(feed))
+                    feed.ready.set()
+                    if finished:
+                        return
+                failures = 0
+            except Exception as exc:  # noqa: BLE001
+                version = None
+                failures += 1
+                if failures >= self.max_poll_failures:
+                    self._fail(feed, f"{type(exc).__name__}: {exc}")
+                    return
+            await asyncio.sleep(self.poll_interval_s)
+
+    def _fail(self, feed: _RunFeed, error: str) -> None:
+        feed.error = error
+        feed.finished = True
+        if feed.ready.is_set():
+            feed.publish(_end_event(feed))
+        feed.ready.set()
+        if self._feeds.get(feed.run_name) is feed:
+            del self._feeds[feed.run_name]
+
+
+run_events = RunEventHub()
@@ -6,10 +6,12 @@ from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from ninout.core.api.routes.metrics import router as metrics_router
 from ninout.core.api.routes.runs import router as runs_router
 
 app = FastAPI(title="ninout API", version="0.1.0")
 app.include_router(runs_router)
+app.include_router(metrics_router)
 
 _dashboard_dir = os.path.join(
     os.path.dirname(os.path.dirname(__file__)),
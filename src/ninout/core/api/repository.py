@@ -1,18 +1,105 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import hashlib
 import json
+import logging
 import os
 import re
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator
 
 from ninout.core.api.schemas import (
+    ColumnStats,
+    DagTrend,
     GraphEdge,
     GraphNode,
+    LayoutEdge,
+    LayoutNode,
+    ProfileFunctionStat,
+    ProfileStack,
+    RunChanges,
+    RunComparison,
     RunDetails,
     RunGraph,
+    RunLayout,
     RunSummary,
     StepRowsPage,
+    StepChange,
+    StepComparison,
+    StepProfileReport,
+    StepStats,
     StepSummary,
+    StepTrend,
 )
+from ninout.core.ui.layout import DagLayout, compute_layout, dag_fingerprint, layout_from_json
+from ninout.core.ui.persist_duckdb import (
+    ROW_FILTER_OPERATORS,
+    RowFilter,
+    _RUNTIME_METRIC_COLUMNS,
+    _quote_literal,
+    _table_name_for_step,
+    count_step_rows,
+    read_step_rows,
+    set_rows_search_path,
+    table_exists,
+)
+from ninout.core.ui.persist_sqlite import (
+    LIVE_PREVIEW_ROWS,
+    connect_runs_db,
+    ensure_run_catalog,
+    run_status_from_summary,
+    upsert_run_catalog,
+)
+from ninout.core.ui.prometheus import (
+    DURATION_BUCKETS_S,
+    MetricFamily,
+    format_bucket,
+    render_metrics,
+)
+from ninout.core.ui.trace import build_chrome_trace
+
+_READ_POOL_SIZE = 8
+_RUN_CACHE_SIZE = 256
+_LAYOUT_CACHE_SIZE = 64
+_FINAL_STATUSES = {"done", "failed", "skipped"}
+_TREND_PERCENTILES = (0.5, 0.9, 0.95)
+_CATALOG_BUSY_TIMEOUT_S = 2.0
+_CATALOG_RETRIES = 3
+_CATALOG_RETRY_DELAY_S = 0.05
+_STALE_RUN_S = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedRun:
+    db_path: str
+    signature: tuple[int, ...]
+    details: RunDetails
+    finished: bool
+    outputs: dict[str, str] | None = None
+    live: bool = False
+
+
+@dataclass
+class _PooledDatabase:
+    con: Any
+    users: int = 0
+
+
+_catalog_synced: dict[str, float] = {}
+_catalog_ready: set[str] = set()
+_catalog_lock = threading.Lock()
+_run_cache: OrderedDict[str, _CachedRun] = OrderedDict()
+_read_pool: OrderedDict[str, _PooledDatabase] = OrderedDict()
+_layout_cache: OrderedDict[str, DagLayout] = OrderedDict()
+_cache_lock = threading.Lock()
 
 
 def _logs_dir() -> str:
@@ -26,7 +113,9 @@ def _run_db_path(run_name: str) -> str:
 def _connect(db_path: str):
     import duckdb  # type: ignore[import-not-found]
 
-    return duckdb.connect(db_path, read_only=True)
+    con = duckdb.connect(db_path, read_only=True)
+    set_rows_search_path(con, db_path)
+    return con
 
 
 def _ensure_table_name(name: str) -> str:
@@ -35,147 +124,974 @@ def _ensure_table_name(name: str) -> str:
     return name
 
 
-def list_runs() -> list[RunSummary]:
+def _catalog_path() -> str:
+    return os.path.join(_logs_dir(), "runs.sqlite")
+
+
+def normalize_timestamp(value: str) -> str:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(sep=" ")
+
+
+def _table_exists_sqlite(con: sqlite3.Connection, table_name: str) -> bool:
+    return (
+        con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            [table_name],
+        ).fetchone()
+        is not None
+    )
+
+
+def _scan_run(run_name: str) -> dict[str, object] | None:
+    db_path = _run_db_path(run_name)
+    db_mtime = os.path.getmtime(db_path)
+    con = _connect(db_path)
+    try:
+        row = con.execute(
+            "SELECT run_id, dag_name, created_at_utc, step_count FROM run_metadata ORDER BY created_at_utc DESC LIMIT 1"
+        ).fetchone()
+        if not row:
+            return None
+        runtime_rows = con.execute(
+            "SELECT status, count(*) FROM step_runtime WHERE run_id = ? GROUP BY status",
+            [row[0]],
+        ).fetchall()
+    finally:
+        con.close()
+    status_summary = {str(status): int(count) for status, count in runtime_rows}
+    return {
+        "run_name": run_name,
+        "run_id": str(row[0]),
+        "dag_name": str(row[1]),
+        "created_at_utc": str(row[2]),
+        "finished_at_utc": None,
+        "updated_at_utc": None,
+        "status": run_status_from_summary(status_summary, finished=False),
+        "step_count": int(row[3]),
+        "status_summary": status_summary,
+        "source": "scan",
+        "db_mtime": db_mtime,
+    }
+
+
+def _catalog_candidates(con: sqlite3.Connection, force: bool = False) -> tuple[list[str], float]:
     logs_dir = _logs_dir()
-    if not os.path.isdir(logs_dir):
-        return []
-    items: list[RunSummary] = []
-    for run_name in sorted(os.listdir(logs_dir), reverse=True):
+    dir_mtime = os.path.getmtime(logs_dir)
+    known = {
+        str(row[0]): (row[1], row[2], row[3])
+        for row in con.execute(
+            "SELECT run_name, source, status, db_mtime FROM run_catalog"
+        ).fetchall()
+    }
+    candidates: list[str] = []
+    if force or _catalog_synced.get(logs_dir) != dir_mtime:
+        candidates.extend(
+            run_name
+            for run_name in os.listdir(logs_dir)
+            if run_name not in known and os.path.isfile(_run_db_path(run_name))
+        )
+    for run_name, (source, status, db_mtime) in known.items():
+        if source != "scan" or status != "running":
+            continue
         db_path = _run_db_path(run_name)
-        if not os.path.isfile(db_path):
+        if os.path.isfile(db_path) and os.path.getmtime(db_path) != db_mtime:
+            candidates.append(run_name)
+    return candidates, dir_mtime
+
+
+def _scan_into_catalog(con: sqlite3.Connection, candidates: list[str], dir_mtime: float) -> None:
+    import duckdb  # type: ignore[import-not-found]
+
+    locked = False
+    for run_name in candidates:
+        try:
+            entry = _scan_run(run_name)
+        except duckdb.OperationalError:
+            locked = True
             continue
-        con = _connect(db_path)
+        if entry is not None:
+            upsert_run_catalog(con, entry)
+    con.commit()
+    if not locked:
+        _catalog_synced[_logs_dir()] = dir_mtime
+
+
+def _sync_catalog(con: sqlite3.Connection, force: bool = False) -> None:
+    candidates, dir_mtime = _catalog_candidates(con, force)
+    _scan_into_catalog(con, candidates, dir_mtime)
+
+
+def _open_catalog_snapshot(path: str) -> sqlite3.Connection | None:
+    if not os.path.isfile(path):
+        return None
+    con = sqlite3.connect(
+        f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=_CATALOG_BUSY_TIMEOUT_S
+    )
+    try:
+        con.execute("SELECT 1 FROM run_catalog LIMIT 1").fetchall()
+    except sqlite3.Error:
+        con.close()
+        return None
+    return con
+
+
+def _write_catalog(path: str, candidates: list[str] | None, dir_mtime: float = 0.0) -> None:
+    attempt = 0
+    while True:
+        con: sqlite3.Connection | None = None
         try:
-            row = con.execute(
-                "SELECT run_id, dag_name, created_at_utc, step_count FROM run_metadata ORDER BY created_at_utc DESC LIMIT 1"
-            ).fetchone()
-            if not row:
-                continue
-            runtime_rows = con.execute(
-                "SELECT status, count(*) FROM step_runtime WHERE run_id = ? GROUP BY status",
-                [row[0]],
-            ).fetchall()
-            status_summary = {str(status): int(count) for status, count in runtime_rows}
-            items.append(
-                RunSummary(
-                    run_name=run_name,
-                    run_id=str(row[0]),
-                    dag_name=str(row[1]),
-                    created_at_utc=str(row[2]),
-                    step_count=int(row[3]),
-                    status_summary=status_summary,
-                )
+            con = connect_runs_db(path, busy_timeout_s=_CATALOG_BUSY_TIMEOUT_S)
+            if candidates is None:
+                ensure_run_catalog(con)
+                _sync_catalog(con)
+            else:
+                _scan_into_catalog(con, candidates, dir_mtime)
+            return
+        except sqlite3.OperationalError:
+            attempt += 1
+            if attempt >= _CATALOG_RETRIES:
+                raise
+            time.sleep(_CATALOG_RETRY_DELAY_S * attempt)
+        finally:
+            if con is not None:
+                con.close()
+
+
+def _refresh_catalog(path: str) -> None:
+    with _catalog_lock:
+        snapshot = _open_catalog_snapshot(path) if path in _catalog_ready else None
+        if snapshot is None:
+            _write_catalog(path, None)
+            _catalog_ready.add(path)
+            return
+        try:
+            candidates, dir_mtime = _catalog_candidates(snapshot)
+        finally:
+            snapshot.close()
+        if candidates:
+            _write_catalog(path, candidates, dir_mtime)
+        else:
+            _catalog_synced[_logs_dir()] = dir_mtime
+
+
+def _open_catalog() -> sqlite3.Connection:
+    path = _catalog_path()
+    error: sqlite3.Error | None = None
+    try:
+        _refresh_catalog(path)
+    except sqlite3.Error as exc:
+        error = exc
+    snapshot = _open_catalog_snapshot(path)
+    if snapshot is not None:
+        if error is not None:
+            logger.warning(
+                "Run catalog %s could not be synced (%s); serving the last committed catalog",
+                path,
+                error,
             )
+        return snapshot
+    logger.warning(
+        "Run catalog %s is unreadable (%s); rescanning %s into an in-memory catalog",
+        path,
+        error,
+        _logs_dir(),
+    )
+    con = sqlite3.connect(":memory:")
+    ensure_run_catalog(con)
+    _sync_catalog(con, force=True)
+    return con
+
+
+def _catalog_filters(
+    dag_name: str | None,
+    status: str | None,
+    created_after: str | None,
+    created_before: str | None,
+) -> tuple[str, list[object]]:
+    clauses: list[str] = []
+    params: list[object] = []
+    if dag_name is not None:
+        clauses.append("dag_name = ?")
+        params.append(dag_name)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if created_after is not None:
+        clauses.append("created_at_utc >= ?")
+        params.append(normalize_timestamp(created_after))
+    if created_before is not None:
+        clauses.append("created_at_utc < ?")
+        params.append(normalize_timestamp(created_before))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def _query_runs(
+    con: sqlite3.Connection,
+    where: str,
+    params: list[object],
+    limit: int | None,
+    offset: int,
+) -> list[RunSummary]:
+    query = f"""
+        SELECT run_name, run_id, dag_name, created_at_utc, step_count,
+               status_summary_json, status, finished_at_utc
+        FROM run_catalog
+        {where}
+        ORDER BY created_at_utc DESC, run_name DESC
+    """
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params = [*params, limit, offset]
+    return [
+        RunSummary(
+            run_name=str(row[0]),
+            run_id=str(row[1]),
+            dag_name=str(row[2]),
+            created_at_utc=str(row[3]),
+            step_count=int(row[4] or 0),
+            status_summary={
+                str(key): int(value) for key, value in json.loads(row[5] or "{}").items()
+            },
+            status=str(row[6]) if row[6] is not None else None,
+            finished_at_utc=str(row[7]) if row[7] is not None else None,
+        )
+        for row in con.execute(query, params).fetchall()
+    ]
+
+
+def _count_runs(con: sqlite3.Connection, where: str, params: list[object]) -> int:
+    return int(con.execute(f"SELECT count(*) FROM run_catalog {where}", params).fetchone()[0])
+
+
+def list_runs(
+    dag_name: str | None = None,
+    status: str | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[RunSummary]:
+    if not os.path.isdir(_logs_dir()):
+        return []
+    where, params = _catalog_filters(dag_name, status, created_after, created_before)
+    con = _open_catalog()
+    try:
+        return _query_runs(con, where, params, limit, offset)
+    finally:
+        con.close()
+
+
+def list_runs_page(
+    dag_name: str | None = None,
+    status: str | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[list[RunSummary], int]:
+    if not os.path.isdir(_logs_dir()):
+        return [], 0
+    where, params = _catalog_filters(dag_name, status, created_after, created_before)
+    con = _open_catalog()
+    try:
+        with con:
+            con.execute("BEGIN")
+            return _query_runs(con, where, params, limit, offset), _count_runs(con, where, params)
+    finally:
+        con.close()
+
+
+def _db_signature(db_path: str, wal_suffix: str = ".wal") -> tuple[int, ...]:
+    signature: list[int] = []
+    for path in (db_path, f"{db_path}{wal_suffix}"):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.extend((0, 0))
+            continue
+        signature.extend((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _release_connection(db_path: str, entry: _PooledDatabase) -> None:
+    if _read_pool.get(db_path) is entry:
+        del _read_pool[db_path]
+    if entry.users == 0:
+        entry.con.close()
+
+
+@contextmanager
+def _read_connection(db_path: str, pooled: bool = False) -> Iterator[Any]:
+    if not pooled:
+        con = _connect(db_path)
+        try:
+            yield con
         finally:
             con.close()
-    return items
+        return
+    with _cache_lock:
+        entry = _read_pool.pop(db_path, None)
+        if entry is None:
+            entry = _PooledDatabase(_connect(db_path))
+        _read_pool[db_path] = entry
+        entry.users += 1
+        idle = [path for path, pooled_entry in _read_pool.items() if pooled_entry.users == 0]
+        for path in idle[: max(0, len(_read_pool) - _READ_POOL_SIZE)]:
+            _release_connection(path, _read_pool[path])
+    cursor = entry.con.cursor()
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+        with _cache_lock:
+            entry.users -= 1
+            if entry.users == 0 and _read_pool.get(db_path) is not entry:
+                entry.con.close()
 
 
-def get_run_details(run_name: str) -> RunDetails:
-    db_path = _run_db_path(run_name)
-    if not os.path.isfile(db_path):
+def _runtime_metrics_sql(con: Any, alias: str = "") -> str:
+    if isinstance(con, sqlite3.Connection):
+        present = set(_RUNTIME_METRIC_COLUMNS)
+    else:
+        present = {
+            str(row[0])
+            for row in con.execute(
+                "SELECT column_name FROM duckdb_columns() WHERE table_name = 'step_runtime'"
+            ).fetchall()
+        }
+    return ", ".join(
+        f"{alias}{name}" if name in present else f"NULL AS {name}"
+        for name in _RUNTIME_METRIC_COLUMNS
+    )
+
+
+def _runtime_metrics(values: tuple[object, ...]) -> dict[str, object]:
+    parsed: dict[str, object] = {}
+    for (name, kind), value in zip(_RUNTIME_METRIC_COLUMNS.items(), values):
+        if value is None:
+            parsed[name] = None
+        elif kind == "DOUBLE":
+            parsed[name] = float(value) if isinstance(value, (int, float)) else None
+        elif kind == "BIGINT":
+            parsed[name] = int(value) if isinstance(value, int) else None
+        elif kind == "TIMESTAMP":
+            parsed[name] = normalize_timestamp(str(value))
+        elif kind == "JSON":
+            parsed[name] = json.loads(str(value))
+        else:
+            parsed[name] = str(value)
+    return parsed
+
+
+def _query_run_details(con: Any, run_name: str) -> RunDetails:
+    run_row = con.execute(
+        "SELECT run_id, dag_name, created_at_utc, step_count FROM run_metadata ORDER BY created_at_utc DESC LIMIT 1"
+    ).fetchone()
+    if not run_row:
         raise FileNotFoundError(run_name)
-    con = _connect(db_path)
-    try:
-        run_row = con.execute(
-            "SELECT run_id, dag_name, created_at_utc, step_count FROM run_metadata ORDER BY created_at_utc DESC LIMIT 1"
-        ).fetchone()
-        if not run_row:
-            raise FileNotFoundError(run_name)
-        run_id = str(run_row[0])
-        rows = con.execute(
-            """
-            SELECT
-                d.step_name,
-                d.table_name,
-                r.status,
-                r.duration_ms,
-                r.input_lines,
-                r.output_lines,
-                r.throughput_in_lps,
-                r.throughput_out_lps,
-                d.when_name,
-                d.condition_bool,
-                d.is_branch,
-                d.disabled_self,
-                d.disabled_deps_json,
-                d.deps_json,
-                r.output_text
-            FROM step_definition d
-            JOIN step_runtime r
-              ON d.run_id = r.run_id AND d.step_name = r.step_name
-            WHERE d.run_id = ?
-            ORDER BY d.step_name
-            """,
-            [run_id],
-        ).fetchall()
-        steps: list[StepSummary] = []
-        for row in rows:
-            steps.append(
-                StepSummary(
-                    step_name=str(row[0]),
-                    table_name=str(row[1]),
-                    status=str(row[2]),
-                    duration_ms=float(row[3]) if isinstance(row[3], (int, float)) else None,
-                    input_lines=int(row[4]) if isinstance(row[4], int) else None,
-                    output_lines=int(row[5]) if isinstance(row[5], int) else None,
-                    throughput_in_lps=float(row[6])
-                    if isinstance(row[6], (int, float))
-                    else None,
-                    throughput_out_lps=float(row[7])
-                    if isinstance(row[7], (int, float))
-                    else None,
-                    when_name=str(row[8]) if isinstance(row[8], str) and row[8] else None,
-                    condition_bool=row[9] if isinstance(row[9], bool) else None,
-                    is_branch=bool(row[10]),
-                    disabled_self=bool(row[11]),
-                    disabled_deps=list(json.loads(row[12] or "[]")),
-                    deps=list(json.loads(row[13] or "[]")),
-                    output_text=str(row[14]) if row[14] is not None else "",
-                )
+    run_id = str(run_row[0])
+    rows = con.execute(
+        f"""
+        SELECT
+            d.step_name,
+            d.table_name,
+            r.status,
+            r.duration_ms,
+            r.input_lines,
+            r.output_lines,
+            r.throughput_in_lps,
+            r.throughput_out_lps,
+            d.when_name,
+            d.condition_bool,
+            d.is_branch,
+            d.disabled_self,
+            d.disabled_deps_json,
+            d.deps_json,
+            {_runtime_metrics_sql(con, "r.")}
+        FROM step_definition d
+        JOIN step_runtime r
+          ON d.run_id = r.run_id AND d.step_name = r.step_name
+        WHERE d.run_id = ?
+        ORDER BY d.step_name
+        """,
+        [run_id],
+    ).fetchall()
+    steps: list[StepSummary] = []
+    for row in rows:
+        steps.append(
+            StepSummary(
+                step_name=str(row[0]),
+                table_name=str(row[1]),
+                status=str(row[2]),
+                duration_ms=float(row[3]) if isinstance(row[3], (int, float)) else None,
+                input_lines=int(row[4]) if isinstance(row[4], int) else None,
+                output_lines=int(row[5]) if isinstance(row[5], int) else None,
+                throughput_in_lps=float(row[6])
+                if isinstance(row[6], (int, float))
+                else None,
+                throughput_out_lps=float(row[7])
+                if isinstance(row[7], (int, float))
+                else None,
+                when_name=str(row[8]) if isinstance(row[8], str) and row[8] else None,
+                condition_bool=row[9] if isinstance(row[9], bool) else None,
+                is_branch=bool(row[10]),
+                disabled_self=bool(row[11]),
+                disabled_deps=list(json.loads(row[12] or "[]")),
+                deps=list(json.loads(row[13] or "[]")),
+                output_text="",
+                **_runtime_metrics(row[14:]),
             )
-        return RunDetails(
-            run_name=run_name,
-            run_id=run_id,
-            dag_name=str(run_row[1]),
-            created_at_utc=str(run_row[2]),
-            step_count=int(run_row[3]),
-            steps=steps,
         )
+    return RunDetails(
+        run_name=run_name,
+        run_id=run_id,
+        dag_name=str(run_row[1]),
+        created_at_utc=str(run_row[2]),
+        step_count=int(run_row[3]),
+        steps=steps,
+    )
+
+
+def _query_step_outputs(con: Any, run_id: str) -> dict[str, str]:
+    rows = con.execute(
+        "SELECT step_name, output_text FROM step_runtime WHERE run_id = ?",
+        [run_id],
+    ).fetchall()
+    return {str(row[0]): str(row[1]) if row[1] is not None else "" for row in rows}
+
+
+@contextmanager
+def _mirror_connection() -> Iterator[sqlite3.Connection]:
+    con = sqlite3.connect(
+        f"file:{os.path.abspath(_catalog_path())}?mode=ro",
+        uri=True,
+        timeout=_CATALOG_BUSY_TIMEOUT_S,
+    )
+    try:
+        yield con
     finally:
         con.close()
 
 
-def get_step_rows(run_name: str, step_name: str, limit: int = 100, offset: int = 0) -> StepRowsPage:
-    details = get_run_details(run_name)
-    step = next((s for s in details.steps if s.step_name == step_name), None)
+def _mirror_run_id(run_name: str, live_only: bool = True) -> str | None:
+    if not os.path.isfile(_catalog_path()):
+        return None
+    query = "SELECT run_id FROM run_catalog WHERE run_name = ? AND source = 'run'"
+    params: list[object] = [run_name]
+    if live_only:
+        query += " AND finished_at_utc IS NULL AND updated_at_utc >= ?"
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=_STALE_RUN_S)
+        params.append(stale_before.replace(tzinfo=None).isoformat(sep=" "))
+    try:
+        with _mirror_connection() as con:
+            row = con.execute(query, params).fetchone()
+    except sqlite3.Error:
+        return None
+    return str(row[0]) if row else None
+
+
+def _query_mirror_details(con: sqlite3.Connection, run_name: str, run_id: str) -> RunDetails:
+    run_row = con.execute(
+        """
+        SELECT dag_name, created_at_utc, step_count
+        FROM run_metadata
+        WHERE run_name = ? AND run_id = ?
+        """,
+        [run_name, run_id],
+    ).fetchone()
+    if not run_row:
+        raise FileNotFoundError(run_name)
+    rows = con.execute(
+        f"""
+        SELECT
+            d.step_name,
+            r.status,
+            r.duration_ms,
+            r.input_lines,
+            r.output_lines,
+            r.throughput_in_lps,
+            r.throughput_out_lps,
+            d.when_name,
+            d.condition_bool,
+            d.is_branch,
+            d.disabled_self,
+            d.disabled_deps_json,
+            d.deps_json,
+            {_runtime_metrics_sql(con, "r.")}
+        FROM step_definition d
+        JOIN step_runtime r
+          ON d.run_name = r.run_name AND d.run_id = r.run_id AND d.step_name = r.step_name
+        WHERE d.run_name = ? AND d.run_id = ?
+        ORDER BY d.step_name
+        """,
+        [run_name, run_id],
+    ).fetchall()
+    return RunDetails(
+        run_name=run_name,
+        run_id=run_id,
+        dag_name=str(run_row[0]),
+        created_at_utc=normalize_timestamp(str(run_row[1])),
+        step_count=int(run_row[2]),
+        steps=[
+            StepSummary(
+                step_name=str(row[0]),
+                table_name=_table_name_for_step(str(row[0])),
+                status=str(row[1]),
+                duration_ms=float(row[2]) if isinstance(row[2], (int, float)) else None,
+                input_lines=int(row[3]) if isinstance(row[3], int) else None,
+                output_lines=int(row[4]) if isinstance(row[4], int) else None,
+                throughput_in_lps=float(row[5])
+                if isinstance(row[5], (int, float))
+                else None,
+                throughput_out_lps=float(row[6])
+                if isinstance(row[6], (int, float))
+                else None,
+                when_name=str(row[7]) if isinstance(row[7], str) and row[7] else None,
+                condition_bool=bool(row[8]) if isinstance(row[8], int) else None,
+                is_branch=bool(row[9]),
+                disabled_self=bool(row[10]),
+                disabled_deps=list(json.loads(row[11] or "[]")),
+                deps=list(json.loads(row[12] or "[]")),
+                output_text="",
+                **_runtime_metrics(row[13:]),
+            )
+            for row in rows
+        ],
+    )
+
+
+def _cache_run(cached: _CachedRun) -> _CachedRun:
+    with _cache_lock:
+        _run_cache[cached.db_path] = cached
+        _run_cache.move_to_end(cached.db_path)
+        while len(_run_cache) > _RUN_CACHE_SIZE:
+            _run_cache.popitem(last=False)
+    return cached
+
+
+def _load_mirror_run(run_name: str, db_path: str, run_id: str) -> _CachedRun:
+    signature = _db_signature(os.path.abspath(_catalog_path()), "-wal")
+    with _cache_lock:
+        cached = _run_cache.get(db_path)
+        if cached is not None and cached.live and cached.signature == signature:
+            _run_cache.move_to_end(db_path)
+            return cached
+    with _mirror_connection() as con:
+        details = _query_mirror_details(con, run_name, run_id)
+    return _cache_run(
+        _CachedRun(
+            db_path=db_path,
+            signature=signature,
+            details=details,
+            finished=False,
+            live=True,
+        )
+    )
+
+
+def _load_run(run_name: str) -> _CachedRun:
+    import duckdb  # type: ignore[import-not-found]
+
+    db_path = os.path.abspath(_run_db_path(run_name))
+    live_run_id = _mirror_run_id(run_name)
+    if live_run_id is not None:
+        return _load_mirror_run(run_name, db_path, live_run_id)
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(run_name)
+    signature = _db_signature(db_path)
+    with _cache_lock:
+        cached = _run_cache.get(db_path)
+        if cached is not None and not cached.live and cached.signature == signature:
+            _run_cache.move_to_end(db_path)
+            return cached
+        pooled_entry = _read_pool.get(db_path)
+        if pooled_entry is not None:
+            _release_connection(db_path, pooled_entry)
+    try:
+        with _read_connection(db_path) as con:
+            details = _query_run_details(con, run_name)
+    except duckdb.Error:
+        mirror_run_id = _mirror_run_id(run_name, live_only=False)
+        if mirror_run_id is None:
+            raise
+        return _load_mirror_run(run_name, db_path, mirror_run_id)
+    return _cache_run(
+        _CachedRun(
+            db_path=db_path,
+            signature=signature,
+            details=details,
+            finished=all(step.status in _FINAL_STATUSES for step in details.steps),
+        )
+    )
+
+
+@contextmanager
+def _run_connection(cached: _CachedRun) -> Iterator[Any]:
+    if cached.live:
+        with _mirror_connection() as con:
+            yield con
+        return
+    with _read_connection(cached.db_path, pooled=cached.finished) as con:
+        yield con
+
+
+def clear_run_cache() -> None:
+    with _cache_lock:
+        _run_cache.clear()
+        for db_path, entry in list(_read_pool.items()):
+            _release_connection(db_path, entry)
+
+
+def get_run_etag(run_name: str) -> str:
+    cached = _load_run(run_name)
+    digest = hashlib.sha1(repr((cached.details.run_id, cached.signature)).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def get_run_details(run_name: str, include_output: bool = True) -> RunDetails:
+    cached = _load_run(run_name)
+    if not include_output:
+        return cached.details
+    outputs = cached.outputs
+    if outputs is None:
+        with _run_connection(cached) as con:
+            outputs = _query_step_outputs(con, cached.details.run_id)
+        if cached.finished:
+            cached.outputs = outputs
+    return cached.details.model_copy(
+        update={
+            "steps": [
+                step.model_copy(update={"output_text": outputs.get(step.step_name, "")})
+                for step in cached.details.steps
+            ]
+        }
+    )
+
+
+def is_run_finished(run_name: str) -> bool:
+    return _load_run(run_name).finished
+
+
+def get_step_changes(run_name: str, since: str | None = None) -> list[StepChange]:
+    cached = _load_run(run_name)
+    params: list[object] = [cached.details.run_id]
+    with _run_connection(cached) as con:
+        query = f"""
+            SELECT step_name, status, duration_ms, input_lines, output_lines,
+                   throughput_in_lps, throughput_out_lps, updated_at_utc,
+                   {_runtime_metrics_sql(con)}
+            FROM step_runtime
+            WHERE run_id = ?
+        """
+        if since is not None and not cached.live:
+            query += " AND updated_at_utc > CAST(? AS TIMESTAMP)"
+            params.append(normalize_timestamp(since))
+        query += " ORDER BY updated_at_utc, step_name"
+        rows = con.execute(query, params).fetchall()
+    if cached.live:
+        rows = sorted(
+            (row[:7] + (normalize_timestamp(str(row[7])),) + row[8:] for row in rows),
+            key=lambda row: (datetime.fromisoformat(row[7]), row[0]),
+        )
+        if since is not None:
+            cursor = datetime.fromisoformat(normalize_timestamp(since))
+            rows = [row for row in rows if datetime.fromisoformat(row[7]) > cursor]
+    return [
+        StepChange(
+            step_name=str(row[0]),
+            status=str(row[1]),
+            duration_ms=float(row[2]) if isinstance(row[2], (int, float)) else None,
+            input_lines=int(row[3]) if isinstance(row[3], int) else None,
+            output_lines=int(row[4]) if isinstance(row[4], int) else None,
+            throughput_in_lps=float(row[5]) if isinstance(row[5], (int, float)) else None,
+            throughput_out_lps=float(row[6]) if isinstance(row[6], (int, float)) else None,
+            updated_at_utc=str(row[7]),
+            **_runtime_metrics(row[8:]),
+        )
+        for row in rows
+    ]
+
+
+def get_run_changes(run_name: str, since: str | None = None) -> RunChanges:
+    server_time = datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=" ")
+    normalized = normalize_timestamp(since) if since else None
+    steps = get_step_changes(run_name, normalized)
+    cached = _load_run(run_name)
+    return RunChanges(
+        run_name=run_name,
+        run_id=cached.details.run_id,
+        since=normalized,
+        next_since=max((step.updated_at_utc for step in steps), default=normalized),
+        server_time_utc=server_time,
+        finished=cached.finished,
+        steps=steps,
+    )
+
+
+def _find_step(cached: _CachedRun, step_name: str) -> StepSummary:
+    step = next((s for s in cached.details.steps if s.step_name == step_name), None)
     if step is None:
         raise FileNotFoundError(step_name)
+    return step
 
-    db_path = _run_db_path(run_name)
-    con = _connect(db_path)
+
+def parse_row_filter(text: str) -> RowFilter:
+    parts = text.split(":", 2)
+    if len(parts) != 3 or not parts[0] or parts[1] not in ROW_FILTER_OPERATORS:
+        raise ValueError(f"Invalid filter: {text} (expected column:op:value)")
+    column, op, raw_value = parts
     try:
-        table_name = _ensure_table_name(step.table_name)
-        total = con.execute(f"SELECT count(*) FROM {table_name}").fetchone()[0]
-        rows = con.execute(
-            f"SELECT row_id, payload_json FROM {table_name} ORDER BY row_id LIMIT ? OFFSET ?",
-            [limit, offset],
-        ).fetchall()
-        payload = [{"row_id": int(r[0]), "payload": json.loads(r[1])} for r in rows]
-        return StepRowsPage(
+        value: object = json.loads(raw_value)
+    except json.JSONDecodeError:
+        value = raw_value
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"Invalid filter value: {raw_value}")
+    if value is None and op not in ("eq", "ne"):
+        raise ValueError(f"Filter {op} does not accept null")
+    return RowFilter(column=column, op=op, value=value)
+
+
+def _live_json_path(key: str) -> str:
+    return f'$."{key}"'
+
+
+def _live_filter_clause(row_filter: RowFilter) -> tuple[str, list[object]]:
+    if row_filter.column == "row_id":
+        expression, params = "row_id", []
+    else:
+        expression, params = "json_extract(payload_json, ?)", [_live_json_path(row_filter.column)]
+    if row_filter.value is None:
+        negation = "" if row_filter.op == "eq" else "NOT "
+        return f"{expression} IS {negation}NULL", params
+    if row_filter.op == "contains":
+        return f"instr(CAST({expression} AS TEXT), ?) > 0", [*params, str(row_filter.value)]
+    if isinstance(row_filter.value, str):
+        expression = f"CAST({expression} AS TEXT)"
+    operator = ROW_FILTER_OPERATORS[row_filter.op]
+    return f"{expression} {operator} ?", [*params, row_filter.value]
+
+
+def _live_record(payload_json: str, columns: list[str] | None) -> object:
+    record = json.loads(payload_json)
+    if columns is None or not isinstance(record, dict):
+        return record
+    return {name: record.get(name) for name in columns}
+
+
+def _read_live_rows(
+    cached: _CachedRun,
+    step: StepSummary,
+    limit: int | None = None,
+    offset: int = 0,
+    after_row_id: int | None = None,
+    columns: list[str] | None = None,
+    filters: list[RowFilter] | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+) -> tuple[int, list[tuple[int, object]]]:
+    clauses = ["run_name = ?", "run_id = ?", "step_name = ?"]
+    params: list[object] = [cached.details.run_name, cached.details.run_id, step.step_name]
+    for row_filter in filters or ():
+        clause, clause_params = _live_filter_clause(row_filter)
+        clauses.append(clause)
+        params.extend(clause_params)
+    with _mirror_connection() as con:
+        if not _table_exists_sqlite(con, "step_rows"):
+            return 0, []
+        total = int(
+            con.execute(
+                f"SELECT count(*) FROM step_rows WHERE {' AND '.join(clauses)}", params
+            ).fetchone()[0]
+        )
+        if limit == 0 or not total:
+            return total, []
+        direction = "DESC" if descending else "ASC"
+        if after_row_id is not None:
+            clauses.append("row_id < ?" if descending else "row_id > ?")
+            params.append(after_row_id)
+        order = f"row_id {direction}"
+        if sort not in (None, "row_id"):
+            path = _live_json_path(str(sort))
+            order = (
+                f"json_extract(payload_json, ?) IS NULL, "
+                f"json_extract(payload_json, ?) {direction}, {order}"
+            )
+            params.extend([path, path])
+        query = f"SELECT row_id, payload_json FROM step_rows WHERE {' AND '.join(clauses)} ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        rows = con.execute(query, params).fetchall()
+    return total, [(int(row_id), _live_record(payload_json, columns)) for row_id, payload_json in rows]
+
+
+def get_step_rows(
+    run_name: str,
+    step_name: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_row_id: int | None = None,
+    columns: list[str] | None = None,
+    filters: list[RowFilter] | None = None,
+    sort: str | None = None,
+) -> StepRowsPage:
+    descending = bool(sort and sort.startswith("-"))
+    sort_column = sort[1:] if sort and descending else sort
+    if after_row_id is not None and sort_column not in (None, "row_id"):
+        raise ValueError("after_row_id requires sort=row_id or sort=-row_id")
+    cached = _load_run(run_name)
+    step = _find_step(cached, step_name)
+    truncated = False
+    if cached.live:
+        total, rows = _read_live_rows(
+            cached,
+            step,
+            limit=limit,
+            offset=offset,
+            after_row_id=after_row_id,
+            columns=columns,
+            filters=filters,
+            sort=sort_column,
+            descending=descending,
+        )
+        stored = _read_live_rows(cached, step, limit=0)[0] if filters else total
+        output_lines = step.output_lines or 0
+        truncated = stored < output_lines and (not stored or stored >= LIVE_PREVIEW_ROWS)
+        if truncated and not filters:
+            total = output_lines
+            if limit and not rows and not descending:
+                raise RuntimeError(
+                    f"Only the first {stored} rows are readable until the run finishes"
+                    if stored
+                    else "Rows are not readable until the run finishes"
+                )
+    else:
+        with _read_connection(cached.db_path, pooled=cached.finished) as con:
+            table_name = _ensure_table_name(step.table_name)
+            total = count_step_rows(con, table_name, filters or ())
+            rows = read_step_rows(
+                con,
+                table_name,
+                limit=limit,
+                offset=offset,
+                after_row_id=after_row_id,
+                columns=columns,
+                filters=filters or (),
+                sort=sort_column,
+                descending=descending,
+            )
+    payload = [{"row_id": row_id, "payload": record} for row_id, record in rows]
+    keyset = sort_column in (None, "row_id")
+    return StepRowsPage(
+        run_name=run_name,
+        step_name=step_name,
+        total_rows=int(total),
+        offset=offset,
+        limit=limit,
+        rows=payload,
+        after_row_id=after_row_id,
+        next_after_row_id=rows[-1][0] if keyset and len(rows) == limit else None,
+        truncated=truncated,
+    )
+
+
+def get_step_stats(run_name: str, step_name: str) -> StepStats:
+    cached = _load_run(run_name)
+    step = _find_step(cached, step_name)
+    if cached.live:
+        stored_rows, _rows = _read_live_rows(cached, step, limit=0)
+        return StepStats(
             run_name=run_name,
             step_name=step_name,
-            total_rows=int(total),
-            offset=offset,
-            limit=limit,
-            rows=payload,
+            row_count=step.output_lines,
+            stored_rows=stored_rows,
+            columns=[],
+        )
+    with _read_connection(cached.db_path, pooled=cached.finished) as con:
+        stored_rows = count_step_rows(con, _ensure_table_name(step.table_name))
+        rows = []
+        if table_exists(con, "step_stats"):
+            rows = con.execute(
+                """
+                SELECT column_name, row_count, value_count, null_count,
+                       min_json, max_json, distinct_estimate
+                FROM step_stats
+                WHERE run_id = ? AND step_name = ?
+                """,
+                [cached.details.run_id, step_name],
+            ).fetchall()
+        return StepStats(
+            run_name=run_name,
+            step_name=step_name,
+            row_count=int(rows[0][1]) if rows else step.output_lines,
+            stored_rows=stored_rows,
+            columns=[
+                ColumnStats(
+                    column_name=str(row[0]),
+                    value_count=int(row[2]),
+                    null_count=int(row[3]),
+                    min_value=json.loads(row[4]) if row[4] is not None else None,
+                    max_value=json.loads(row[5]) if row[5] is not None else None,
+                    distinct_estimate=int(row[6]),
+                )
+                for row in rows
+            ],
         )
-    finally:
-        con.close()
+
+
+def get_step_profile(run_name: str, step_name: str) -> StepProfileReport:
+    cached = _load_run(run_name)
+    _find_step(cached, step_name)
+    if cached.live:
+        raise RuntimeError("Profiles are not readable until the run finishes")
+    with _read_connection(cached.db_path, pooled=cached.finished) as con:
+        rows = []
+        if table_exists(con, "step_profile"):
+            rows = con.execute(
+                """
+                SELECT mode, samples, kind, name, calls, self_ms, total_ms
+                FROM step_profile
+                WHERE run_id = ? AND step_name = ?
+                ORDER BY kind, self_ms DESC NULLS LAST, name
+                """,
+                [cached.details.run_id, step_name],
+            ).fetchall()
+    if not rows:
+        raise FileNotFoundError(step_name)
+    return StepProfileReport(
+        run_name=run_name,
+        step_name=step_name,
+        mode=str(rows[0][0]),
+        samples=int(rows[0][1] or 0),
+        functions=[
+            ProfileFunctionStat(
+                name=str(row[3]),
+                calls=int(row[4]) if row[4] is not None else None,
+                self_ms=float(row[5] or 0.0),
+                total_ms=float(row[6] or 0.0),
+            )
+            for row in rows
+            if row[2] == "function"
+        ],
+        stacks=[
+            ProfileStack(stack=str(row[3]), ms=float(row[5] or 0.0))
+            for row in rows
+            if row[2] == "stack"
+        ],
+    )
+
+
+def get_run_trace(run_name: str) -> dict[str, object]:
+    details = get_run_details(run_name, include_output=False)
+    return build_chrome_trace(run_name, [step.model_dump() for step in details.steps])
 
 
 def get_run_graph(run_name: str) -> RunGraph:
-    details = get_run_details(run_name)
+    details = get_run_details(run_name, include_output=False)
     nodes = [
         GraphNode(
             step_name=step.step_name,
@@ -210,3 +1126,318 @@ def get_run_graph(run_name: str) -> RunGraph:
         nodes=nodes,
         edges=edges,
     )
+
+
+def _stored_layout(cached: _CachedRun, fingerprint: str) -> DagLayout | None:
+    with _read_connection(cached.db_path, pooled=True) as con:
+        if not table_exists(con, "dag_layout"):
+            return None
+        row = con.execute(
+            "SELECT layout_json FROM dag_layout WHERE fingerprint = ?",
+            [fingerprint],
+        ).fetchone()
+    return layout_from_json(str(row[0])) if row else None
+
+
+def get_run_layout(run_name: str) -> RunLayout:
+    cached = _load_run(run_name)
+    deps = {step.step_name: step.deps for step in cached.details.steps}
+    fingerprint = dag_fingerprint(deps)
+    with _cache_lock:
+        layout = _layout_cache.get(fingerprint)
+        if layout is not None:
+            _layout_cache.move_to_end(fingerprint)
+    if layout is None and cached.finished:
+        layout = _stored_layout(cached, fingerprint)
+    if layout is None:
+        layout = compute_layout(deps)
+    with _cache_lock:
+        _layout_cache[fingerprint] = layout
+        _layout_cache.move_to_end(fingerprint)
+        while len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return RunLayout(
+        run_name=run_name,
+        fingerprint=fingerprint,
+        width=layout.width,
+        height=layout.height,
+        node_width=layout.node_width,
+        node_height=layout.node_height,
+        nodes=[
+            LayoutNode(step_name=name, x=x, y=y, level=layout.levels.get(name, 0))
+            for name, (x, y) in layout.positions.items()
+        ],
+        edges=[
+            LayoutEdge(source=source, target=target, points=points)
+            for source, target, points in layout.edges
+        ],
+    )
+
+
+def _metric_families(
+    run_rows: list[tuple[Any, ...]],
+    step_rows: list[tuple[Any, ...]],
+) -> list[MetricFamily]:
+    started = MetricFamily("ninout_runs_started_total", "counter", "Runs recorded in the run catalog.")
+    finished = MetricFamily("ninout_runs_finished_total", "counter", "Runs that reached a final status.")
+    failed = MetricFamily("ninout_runs_failed_total", "counter", "Runs that finished with failed steps.")
+    active = MetricFamily("ninout_runs_active", "gauge", "Runs still in progress.")
+    runs: dict[str, dict[str, int]] = {}
+    for dag_name, status, count in run_rows:
+        runs.setdefault(str(dag_name), {})[str(status)] = int(count)
+    for dag_name, by_status in sorted(runs.items()):
+        running = by_status.get("running", 0)
+        started.add(sum(by_status.values()), dag=dag_name)
+        finished.add(sum(by_status.values()) - running, dag=dag_name)
+        failed.add(by_status.get("failed", 0), dag=dag_name)
+        active.add(running, dag=dag_name)
+
+    duration = MetricFamily(
+        "ninout_step_duration_seconds",
+        "histogram",
+        "Duration of finished (done or failed) steps.",
+    )
+    rows = MetricFamily("ninout_step_rows_total", "counter", "Rows read and produced by steps.")
+    running_steps = MetricFamily("ninout_steps_running", "gauge", "Steps currently running.")
+    for row in step_rows:
+        dag_name, step_name = str(row[0]), str(row[1])
+        count, sum_ms, input_lines, output_lines, running = (
+            int(row[2] or 0),
+            float(row[3] or 0.0),
+            int(row[4] or 0),
+            int(row[5] or 0),
+            int(row[6] or 0),
+        )
+        for bound, bucket_count in zip(DURATION_BUCKETS_S, row[7:]):
+            duration.add(
+                int(bucket_count or 0),
+                "_bucket",
+                dag=dag_name,
+                step=step_name,
+                le=format_bucket(bound),
+            )
+        duration.add(count, "_bucket", dag=dag_name, step=step_name, le="+Inf")
+        duration.add(sum_ms / 1000.0, "_sum", dag=dag_name, step=step_name)
+        duration.add(count, "_count", dag=dag_name, step=step_name)
+        rows.add(input_lines, dag=dag_name, step=step_name, direction="in")
+        rows.add(output_lines, dag=dag_name, step=step_name, direction="out")
+        running_steps.add(running, dag=dag_name, step=step_name)
+    return [started, finished, failed, active, duration, rows, running_steps]
+
+
+def get_metrics_text() -> str:
+    if not os.path.isdir(_logs_dir()):
+        return render_metrics(_metric_families([], []))
+    finished = "s.status IN ('done', 'failed')"
+    buckets = ", ".join(
+        f"SUM(CASE WHEN {finished} AND s.duration_ms <= {bound * 1000.0!r} THEN 1 ELSE 0 END)"
+        for bound in DURATION_BUCKETS_S
+    )
+    con = _open_catalog()
+    try:
+        run_rows = con.execute(
+            "SELECT dag_name, status, count(*) FROM run_catalog GROUP BY dag_name, status"
+        ).fetchall()
+        step_rows: list[tuple[Any, ...]] = []
+        if _table_exists_sqlite(con, "step_runtime"):
+            step_rows = con.execute(
+                f"""
+                SELECT c.dag_name, s.step_name,
+                       SUM(CASE WHEN {finished} THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN {finished} THEN s.duration_ms ELSE 0 END),
+                       SUM(s.input_lines),
+                       SUM(s.output_lines),
+                       SUM(CASE WHEN s.status = 'running' AND c.status = 'running' THEN 1 ELSE 0 END),
+                       {buckets}
+                FROM step_runtime s
+                JOIN run_catalog c ON c.run_name = s.run_name AND c.run_id = s.run_id
+                GROUP BY c.dag_name, s.step_name
+                ORDER BY c.dag_name, s.step_name
+                """
+            ).fetchall()
+    finally:
+        con.close()
+    return render_metrics(_metric_families(run_rows, step_rows))
+
+
+def _relative_change(base: float | None, head: float | None) -> float | None:
+    if base is None or head is None or not base:
+        return None
+    return round((head - base) / base, 4)
+
+
+def _is_regression(
+    base_ms: float | None,
+    head_ms: float | None,
+    threshold: float,
+    min_delta_ms: float,
+) -> bool:
+    change = _relative_change(base_ms, head_ms)
+    if change is None or base_ms is None or head_ms is None:
+        return False
+    return change > threshold and head_ms - base_ms >= min_delta_ms
+
+
+def compare_runs(
+    base_run: str,
+    head_run: str,
+    threshold: float = 0.2,
+    min_delta_ms: float = 10.0,
+) -> RunComparison:
+    base = get_run_details(base_run, include_output=False)
+    head = get_run_details(head_run, include_output=False)
+    base_steps = {step.step_name: step for step in base.steps}
+    head_steps = {step.step_name: step for step in head.steps}
+    steps: list[StepComparison] = []
+    for step_name in sorted(set(base_steps) | set(head_steps)):
+        before = base_steps.get(step_name)
+        after = head_steps.get(step_name)
+        base_ms = before.duration_ms if before is not None and before.status == "done" else None
+        head_ms = after.duration_ms if after is not None and after.status == "done" else None
+        base_lps = before.throughput_out_lps if before is not None else None
+        head_lps = after.throughput_out_lps if after is not None else None
+        base_lines = before.output_lines if before is not None else None
+        head_lines = after.output_lines if after is not None else None
+        steps.append(
+            StepComparison(
+                step_name=step_name,
+                base_status=before.status if before is not None else None,
+                head_status=after.status if after is not None else None,
+                base_duration_ms=base_ms,
+                head_duration_ms=head_ms,
+                duration_delta_ms=round(head_ms - base_ms, 3)
+                if base_ms is not None and head_ms is not None
+                else None,
+                duration_change=_relative_change(base_ms, head_ms),
+                base_throughput_out_lps=base_lps,
+                head_throughput_out_lps=head_lps,
+                throughput_change=_relative_change(base_lps, head_lps),
+                base_output_lines=base_lines,
+                head_output_lines=head_lines,
+                output_lines_delta=head_lines - base_lines
+                if base_lines is not None and head_lines is not None
+                else None,
+                regressed=_is_regression(base_ms, head_ms, threshold, min_delta_ms),
+            )
+        )
+    return RunComparison(
+        base_run=base_run,
+        head_run=head_run,
+        base_dag_name=base.dag_name,
+        head_dag_name=head.dag_name,
+        threshold=threshold,
+        min_delta_ms=min_delta_ms,
+        regressions=[step.step_name for step in steps if step.regressed],
+        steps=steps,
+    )
+
+
+def _trend_run_names(dag_name: str, runs: int) -> list[str]:
+    if not os.path.isdir(_logs_dir()):
+        return []
+    con = _open_catalog()
+    try:
+        rows = con.execute(
+            """
+            SELECT run_name FROM run_catalog
+            WHERE dag_name = ? AND status IN ('done', 'failed')
+            ORDER BY created_at_utc DESC, run_name DESC
+            LIMIT ?
+            """,
+            [dag_name, runs],
+        ).fetchall()
+    finally:
+        con.close()
+    return [str(row[0]) for row in rows if os.path.isfile(_run_db_path(str(row[0])))]
+
+
+def _optional_float(value: object) -> float | None:
+    return round(float(value), 3) if isinstance(value, (int, float)) else None
+
+
+def get_dag_trend(
+    dag_name: str,
+    runs: int = 20,
+    threshold: float = 0.2,
+    min_delta_ms: float = 10.0,
+) -> DagTrend:
+    import duckdb  # type: ignore[import-not-found]
+
+    run_names = _trend_run_names(dag_name, runs)
+    if not run_names:
+        raise FileNotFoundError(dag_name)
+    con = duckdb.connect()
+    try:
+        selects: list[str] = []
+        for position, run_name in enumerate(run_names):
+            alias = f"run_{position}"
+            con.execute(
+                f"ATTACH {_quote_literal(os.path.abspath(_run_db_path(run_name)))} "
+                f"AS {alias} (READ_ONLY)"
+            )
+            selects.append(
+                f"""
+                SELECT {position} AS run_order, step_name, status, duration_ms,
+                       output_lines, throughput_out_lps
+                FROM {alias}.step_runtime
+                WHERE run_id = (
+                    SELECT run_id FROM {alias}.run_metadata
+                    ORDER BY created_at_utc DESC LIMIT 1
+                )
+                """
+            )
+        percentiles = ", ".join(str(value) for value in _TREND_PERCENTILES)
+        done = "FILTER (WHERE status = 'done')"
+        rows = con.execute(
+            f"""
+            WITH history AS ({" UNION ALL ".join(selects)})
+            SELECT
+                step_name,
+                count(*) FILTER (WHERE status IN ('done', 'failed')),
+                count(*) FILTER (WHERE status = 'failed'),
+                quantile_cont(duration_ms, [{percentiles}]) {done},
+                min(duration_ms) {done},
+                max(duration_ms) {done},
+                avg(duration_ms) {done},
+                quantile_cont(throughput_out_lps, 0.5) {done},
+                quantile_cont(output_lines, 0.5) {done},
+                max(duration_ms) FILTER (WHERE status = 'done' AND run_order = 0),
+                quantile_cont(duration_ms, 0.5) FILTER (WHERE status = 'done' AND run_order > 0)
+            FROM history
+            GROUP BY step_name
+            ORDER BY step_name
+            """
+        ).fetchall()
+    finally:
+        con.close()
+    steps: list[StepTrend] = []
+    for row in rows:
+        quantiles = list(row[3] or [None] * len(_TREND_PERCENTILES))
+        latest_ms, baseline_ms = _optional_float(row[9]), _optional_float(row[10])
+        steps.append(
+            StepTrend(
+                step_name=str(row[0]),
+                runs=int(row[1]),
+                failed_runs=int(row[2]),
+                duration_p50_ms=_optional_float(quantiles[0]),
+                duration_p90_ms=_optional_float(quantiles[1]),
+                duration_p95_ms=_optional_float(quantiles[2]),
+                duration_min_ms=_optional_float(row[4]),
+                duration_max_ms=_optional_float(row[5]),
+                duration_mean_ms=_optional_float(row[6]),
+                throughput_out_p50_lps=_optional_float(row[7]),
+                output_lines_p50=_optional_float(row[8]),
+                latest_duration_ms=latest_ms,
+                baseline_duration_ms=baseline_ms,
+                latest_change=_relative_change(baseline_ms, latest_ms),
+                regressed=_is_regression(baseline_ms, latest_ms, threshold, min_delta_ms),
+            )
+        )
+    return DagTrend(
+        dag_name=dag_name,
+        runs=run_names,
+        threshold=threshold,
+        min_delta_ms=min_delta_ms,
+        regressions=[step.step_name for step in steps if step.regressed],
+        steps=steps,
+    )
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from ninout.core.api.repository import get_metrics_text
+from ninout.core.ui.prometheus import CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=Response)
+def metrics_endpoint() -> Response:
+    return Response(get_metrics_text(), media_type=CONTENT_TYPE)
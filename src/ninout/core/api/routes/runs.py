@@ -1,32 +1,169 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Callable
 
-from ninout.core.api.repository import get_run_details, get_run_graph, get_step_rows, list_runs
-from ninout.core.api.schemas import RunDetails, RunGraph, RunSummary, StepRowsPage
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from ninout.core.api.events import run_events
+from ninout.core.api.repository import (
+    compare_runs,
+    get_dag_trend,
+    get_run_changes,
+    get_run_details,
+    get_run_etag,
+    get_run_graph,
+    get_run_layout,
+    get_run_trace,
+    get_step_profile,
+    get_step_rows,
+    get_step_stats,
+    list_runs_page,
+    normalize_timestamp,
+    parse_row_filter,
+)
+from ninout.core.api.schemas import (
+    DagTrend,
+    RunChanges,
+    RunComparison,
+    RunDetails,
+    RunGraph,
+    RunLayout,
+    RunSummary,
+    StepProfileReport,
+    StepRowsPage,
+    StepStats,
+    StepSummary,
+)
 
 router = APIRouter(prefix="/api", tags=["runs"])
 
 
 @router.get("/runs", response_model=list[RunSummary])
-def list_runs_endpoint() -> list[RunSummary]:
-    return list_runs()
+def list_runs_endpoint(
+    response: Response,
+    dag_name: str | None = None,
+    status: str | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+) -> list[RunSummary]:
+    filters = {
+        "dag_name": dag_name,
+        "status": status,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    try:
+        runs, total = list_runs_page(**filters, limit=limit, offset=offset)
+        response.headers["X-Total-Count"] = str(total)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return runs
 
 
-@router.get("/runs/{run_name}", response_model=RunDetails)
-def run_details_endpoint(run_name: str) -> RunDetails:
+def _parse_step_fields(fields: str | None) -> set[str] | None:
+    if fields is None:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(StepSummary.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected | {"step_name"}
+
+
+def _etag_response(request: Request, run_name: str, build: Callable[[], Any]) -> Response:
     try:
-        return get_run_details(run_name)
+        etag = get_run_etag(run_name)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(jsonable_encoder(build()), headers=headers)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run not found") from exc
 
 
+@router.get("/runs/{run_name}", response_model=RunDetails)
+def run_details_endpoint(
+    request: Request,
+    run_name: str,
+    fields: str | None = Query(default=None),
+) -> Response:
+    step_fields = _parse_step_fields(fields)
+
+    def build() -> Any:
+        include_output = step_fields is None or "output_text" in step_fields
+        details = get_run_details(run_name, include_output=include_output)
+        if step_fields is None:
+            return details
+        return details.model_dump(
+            include={
+                **{name: True for name in RunDetails.model_fields if name != "steps"},
+                "steps": {"__all__": step_fields},
+            }
+        )
+
+    return _etag_response(request, run_name, build)
+
+
 @router.get("/runs/{run_name}/graph", response_model=RunGraph)
-def run_graph_endpoint(run_name: str) -> RunGraph:
+def run_graph_endpoint(request: Request, run_name: str) -> Response:
+    return _etag_response(request, run_name, lambda: get_run_graph(run_name))
+
+
+@router.get("/runs/{run_name}/trace")
+def run_trace_endpoint(request: Request, run_name: str) -> Response:
+    return _etag_response(request, run_name, lambda: get_run_trace(run_name))
+
+
+@router.get("/runs/{run_name}/layout", response_model=RunLayout)
+def run_layout_endpoint(request: Request, run_name: str) -> Response:
+    try:
+        layout = get_run_layout(run_name)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Run not found") from exc
+    etag = f'"{layout.fingerprint}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(jsonable_encoder(layout), headers=headers)
+
+
+@router.get("/runs/{run_name}/changes", response_model=RunChanges)
+def run_changes_endpoint(
+    run_name: str,
+    since: str | None = Query(default=None),
+) -> RunChanges:
     try:
-        return get_run_graph(run_name)
+        return get_run_changes(run_name, since)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/runs/{run_name}/events")
+def run_events_endpoint(
+    request: Request,
+    run_name: str,
+    since: str | None = Query(default=None),
+) -> StreamingResponse:
+    since = since or request.headers.get("last-event-id")
+    try:
+        get_run_etag(run_name)
+        if since:
+            normalize_timestamp(since)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Run not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        run_events.stream(run_name, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/runs/{run_name}/steps/{step_name}/rows", response_model=StepRowsPage)
@@ -35,15 +172,91 @@ def run_step_rows_endpoint(
     step_name: str,
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    after_row_id: int | None = Query(default=None, ge=0),
+    columns: str | None = Query(default=None),
+    filters: list[str] = Query(default=[], alias="filter"),
+    sort: str | None = Query(default=None),
 ) -> StepRowsPage:
     try:
-        return get_step_rows(run_name, step_name, limit=limit, offset=offset)
+        return get_step_rows(
+            run_name,
+            step_name,
+            limit=limit,
+            offset=offset,
+            after_row_id=after_row_id,
+            columns=[name.strip() for name in columns.split(",") if name.strip()]
+            if columns
+            else None,
+            filters=[parse_row_filter(item) for item in filters],
+            sort=sort,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Run or step not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@router.get("/runs/{run_name}/steps/{step_name}/stats", response_model=StepStats)
+def run_step_stats_endpoint(run_name: str, step_name: str) -> StepStats:
+    try:
+        return get_step_stats(run_name, step_name)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run or step not found") from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+@router.get(
+    "/runs/{run_name}/steps/{step_name}/profile",
+    response_model=StepProfileReport,
+    responses={200: {"content": {"text/plain": {}}}},
+)
+def run_step_profile_endpoint(
+    run_name: str,
+    step_name: str,
+    format: str = Query(default="json", pattern="^(json|collapsed)$"),
+) -> Any:
+    try:
+        report = get_step_profile(run_name, step_name)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Profile not found") from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if format == "collapsed":
+        return PlainTextResponse(
+            "".join(f"{item.stack} {max(1, round(item.ms * 1000))}\n" for item in report.stacks)
+        )
+    return report
+
+
+@router.get("/compare", response_model=RunComparison)
+def compare_runs_endpoint(
+    base: str,
+    head: str,
+    threshold: float = Query(default=0.2, ge=0),
+    min_delta_ms: float = Query(default=10.0, ge=0),
+) -> RunComparison:
+    try:
+        return compare_runs(base, head, threshold=threshold, min_delta_ms=min_delta_ms)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Run not found") from exc
+
+
+@router.get("/dags/{dag_name}/trend", response_model=DagTrend)
+def dag_trend_endpoint(
+    dag_name: str,
+    runs: int = Query(default=20, ge=1, le=200),
+    threshold: float = Query(default=0.2, ge=0),
+    min_delta_ms: float = Query(default=10.0, ge=0),
+) -> DagTrend:
+    try:
+        return get_dag_trend(dag_name, runs=runs, threshold=threshold, min_delta_ms=min_delta_ms)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="No finished runs for this DAG") from exc
+
+
 @router.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -10,6 +10,28 @@ class RunSummary(BaseModel):
     created_at_utc: str
     step_count: int
     status_summary: dict[str, int]
+    status: str | None = None
+    finished_at_utc: str | None = None
+
+
+class RowTelemetry(BaseModel):
+    queue_size: int
+    rows: int
+    timed_rows: int
+    in_depth_max: int
+    in_depth_mean: float
+    out_depth_max: int
+    out_depth_mean: float
+    producer_blocked_ms: float
+    worker_starved_ms: float
+    worker_blocked_ms: float
+    latency_mean_ms: float | None
+    latency_max_ms: float | None
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+    latency_histogram: list[tuple[float, int]]
+    depth_samples: list[tuple[float, int, int]]
 
 
 class StepSummary(BaseModel):
@@ -28,6 +50,45 @@ class StepSummary(BaseModel):
     disabled_deps: list[str]
     deps: list[str]
     output_text: str
+    cpu_ms: float | None = None
+    result_bytes: int | None = None
+    peak_alloc_bytes: int | None = None
+    ready_at_utc: str | None = None
+    started_at_utc: str | None = None
+    finished_at_utc: str | None = None
+    worker: str | None = None
+    queue_wait_ms: float | None = None
+    row_telemetry: RowTelemetry | None = None
+
+
+class StepChange(BaseModel):
+    step_name: str
+    status: str
+    duration_ms: float | None
+    input_lines: int | None
+    output_lines: int | None
+    throughput_in_lps: float | None
+    throughput_out_lps: float | None
+    updated_at_utc: str
+    cpu_ms: float | None = None
+    result_bytes: int | None = None
+    peak_alloc_bytes: int | None = None
+    ready_at_utc: str | None = None
+    started_at_utc: str | None = None
+    finished_at_utc: str | None = None
+    worker: str | None = None
+    queue_wait_ms: float | None = None
+    row_telemetry: RowTelemetry | None = None
+
+
+class RunChanges(BaseModel):
+    run_name: str
+    run_id: str
+    since: str | None
+    next_since: str | None
+    server_time_utc: str
+    finished: bool
+    steps: list[StepChange]
 
 
 class RunDetails(BaseModel):
@@ -39,6 +100,61 @@ class RunDetails(BaseModel):
     steps: list[StepSummary]
 
 
+class StepComparison(BaseModel):
+    step_name: str
+    base_status: str | None
+    head_status: str | None
+    base_duration_ms: float | None
+    head_duration_ms: float | None
+    duration_delta_ms: float | None
+    duration_change: float | None
+    base_throughput_out_lps: float | None
+    head_throughput_out_lps: float | None
+    throughput_change: float | None
+    base_output_lines: int | None
+    head_output_lines: int | None
+    output_lines_delta: int | None
+    regressed: bool
+
+
+class RunComparison(BaseModel):
+    base_run: str
+    head_run: str
+    base_dag_name: str
+    head_dag_name: str
+    threshold: float
+    min_delta_ms: float
+    regressions: list[str]
+    steps: list[StepComparison]
+
+
+class StepTrend(BaseModel):
+    step_name: str
+    runs: int
+    failed_runs: int
+    duration_p50_ms: float | None
+    duration_p90_ms: float | None
+    duration_p95_ms: float | None
+    duration_min_ms: float | None
+    duration_max_ms: float | None
+    duration_mean_ms: float | None
+    throughput_out_p50_lps: float | None
+    output_lines_p50: float | None
+    latest_duration_ms: float | None
+    baseline_duration_ms: float | None
+    latest_change: float | None
+    regressed: bool
+
+
+class DagTrend(BaseModel):
+    dag_name: str
+    runs: list[str]
+    threshold: float
+    min_delta_ms: float
+    regressions: list[str]
+    steps: list[StepTrend]
+
+
 class StepRowsPage(BaseModel):
     run_name: str
     step_name: str
@@ -46,6 +162,47 @@ class StepRowsPage(BaseModel):
     offset: int
     limit: int
     rows: list[dict[str, object]]
+    after_row_id: int | None = None
+    next_after_row_id: int | None = None
+    truncated: bool = False
+
+
+class ColumnStats(BaseModel):
+    column_name: str
+    value_count: int
+    null_count: int
+    min_value: object | None
+    max_value: object | None
+    distinct_estimate: int
+
+
+class StepStats(BaseModel):
+    run_name: str
+    step_name: str
+    row_count: int | None
+    stored_rows: int
+    columns: list[ColumnStats]
+
+
+class ProfileFunctionStat(BaseModel):
+    name: str
+    calls: int | None
+    self_ms: float
+    total_ms: float
+
+
+class ProfileStack(BaseModel):
+    stack: str
+    ms: float
+
+
+class StepProfileReport(BaseModel):
+    run_name: str
+    step_name: str
+    mode: str
+    samples: int
+    functions: list[ProfileFunctionStat]
+    stacks: list[ProfileStack]
 
 
 class GraphNode(BaseModel):
@@ -74,3 +231,27 @@ class RunGraph(BaseModel):
     created_at_utc: str
     nodes: list[GraphNode]
     edges: list[GraphEdge]
+
+
+class LayoutNode(BaseModel):
+    step_name: str
+    x: int
+    y: int
+    level: int
+
+
+class LayoutEdge(BaseModel):
+    source: str
+    target: str
+    points: list[tuple[int, int]]
+
+
+class RunLayout(BaseModel):
+    run_name: str
+    fingerprint: str
+    width: int
+    height: int
+    node_width: int
+    node_height: int
+    nodes: list[LayoutNode]
+    edges: list[LayoutEdge]
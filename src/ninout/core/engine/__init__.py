@@ -1,7 +1,9 @@
-from ninout.core.engine.dag import Dag
+from ninout.core.engine.dag import Dag, RunResources
+from ninout.core.engine.estimate import RunEstimate, estimate_run
 from ninout.core.engine.executor import run
 from ninout.core.engine.models import Step
 from ninout.core.engine.planner import ExecutionPlan, compile_execution_plan
+from ninout.core.engine.runner import Runner
 from ninout.core.engine.validate import (
     levels,
     topological_order,
@@ -11,8 +13,12 @@ from ninout.core.engine.validate import (
 __all__ = [
     "Dag",
     "ExecutionPlan",
+    "RunEstimate",
+    "RunResources",
+    "Runner",
     "Step",
     "compile_execution_plan",
+    "estimate_run",
     "levels",
     "run",
     "topological_order",
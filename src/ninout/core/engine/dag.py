@@ -1,16 +1,80 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable, MutableMapping
+from typing import Callable, Iterable, Literal, Mapping, MutableMapping, TypeAlias
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 import os
+import sqlite3
 import threading
+import time
 
+from ninout.core.engine.estimate import RunEstimate, estimate_run
 from ninout.core.engine.executor import run
+from ninout.core.engine.metrics import RunStats, SinkStats
 from ninout.core.engine.models import Step, StepMode, StepResult
+from ninout.core.engine.planner import ExecutionPlan, compile_execution_plan
+from ninout.core.engine.profiling import ProfileMode, parse_profile_mode
 from ninout.core.ui.persist_duckdb import DuckDBRunLogger
-from ninout.core.ui.persist_sqlite import SQLiteRunLogger
+from ninout.core.ui.persist_parquet import ParquetRunLogger
+from ninout.core.ui.persist_sqlite import SQLiteRunLogger, load_step_durations
+from ninout.core.ui.retention import StepStatsCollector, parse_row_retention, retain_rows
+from ninout.core.ui.sinks import NullRunLogger, RunSink, Sink, SinkKind, resolve_sinks
 from ninout.core.engine.validate import validate_steps
 
+RowStorage: TypeAlias = Literal["duckdb", "parquet"]
+
+
+@dataclass
+class RunResources:
+    pool: ThreadPoolExecutor
+    plan: ExecutionPlan
+    plan_ms: float = 0.0
+    duckdb_connection: object | None = None
+    sqlite_connection: sqlite3.Connection | None = None
+
+
+def _create_run_dir(logs_dir: str, dag_name: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_dir = os.path.join(logs_dir, f"{dag_name}_{timestamp}")
+    os.makedirs(logs_dir, exist_ok=True)
+    run_dir = base_dir
+    suffix = 1
+    while True:
+        try:
+            os.mkdir(run_dir)
+            return run_dir
+        except FileExistsError:
+            suffix += 1
+            run_dir = f"{base_dir}_{suffix}"
+
+
+def _finish_loggers(
+    loggers: list[object], sink_stats: list[SinkStats], run_stats: RunStats
+) -> None:
+    errors: list[Exception] = []
+    for logger in loggers:
+        log_run_stats = getattr(logger, "log_run_stats", None)
+        if log_run_stats is None:
+            continue
+        try:
+            log_run_stats(run_stats)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+    for logger, stats in zip(loggers, sink_stats):
+        started = time.perf_counter()
+        try:
+            logger.close()
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+        finally:
+            stats.close_ms = (time.perf_counter() - started) * 1000.0
+            serialize_s = getattr(logger, "serialize_s", None)
+            if serialize_s is not None:
+                stats.serialize_ms = serialize_s * 1000.0
+    if errors:
+        raise errors[0]
+
 
 class Dag:
     def __init__(self) -> None:
@@ -19,11 +83,50 @@ class Dag:
         self._disabled_steps: set[str] = set()
         self._last_run: dict[str, dict[str, object]] | None = None
         self._last_run_dir: str | None = None
+        self._last_run_stats: RunStats | None = None
+        self._revision = 0
+
+    @property
+    def last_run_dir(self) -> str | None:
+        return self._last_run_dir
+
+    @property
+    def last_run_stats(self) -> RunStats | None:
+        return self._last_run_stats
+
+    @property
+    def revision(self) -> int:
+        return self._revision
 
     @staticmethod
     def _ref_name(ref: Callable[..., object] | str) -> str:
         return ref.__name__ if callable(ref) else str(ref)
 
+    def resolve_disabled(
+        self,
+        disabled_edges: Iterable[
+            tuple[Callable[..., object] | str, Callable[..., object] | str]
+        ]
+        | None,
+        disabled_steps: Iterable[Callable[..., object] | str] | None,
+    ) -> tuple[set[tuple[str, str]], set[str]]:
+        all_disabled_edges = set(self._disabled_edges)
+        for source, target in disabled_edges or []:
+            all_disabled_edges.add((self._ref_name(source), self._ref_name(target)))
+        all_disabled_steps = set(self._disabled_steps)
+        for step_ref in disabled_steps or []:
+            all_disabled_steps.add(self._ref_name(step_ref))
+        return all_disabled_edges, all_disabled_steps
+
+    def compile_plan(
+        self, disabled_edges: set[tuple[str, str]], disabled_steps: set[str]
+    ) -> ExecutionPlan:
+        return compile_execution_plan(
+            self._steps,
+            disabled_edges=disabled_edges,
+            disabled_steps=disabled_steps,
+        )
+
     def step(
         self,
         depends_on: Iterable[Callable[..., object] | str] | None = None,
@@ -31,7 +134,13 @@ class Dag:
         condition: bool | None = None,
         is_branch: bool = False,
         mode: StepMode = "task",
+        persist_rows: str | None = None,
+        profile: bool = False,
+        queue_size: int = 1024,
     ):
+        if persist_rows is not None:
+            parse_row_retention(persist_rows)
+
         def decorator(func: Callable[..., StepResult]) -> Callable[..., StepResult]:
             name = func.__name__
             deps = []
@@ -51,6 +160,7 @@ class Dag:
                     cond_value = condition
             else:
                 cond_value = None
+            self._revision += 1
             self._steps[name] = Step(
                 name=name,
                 func=func,
@@ -59,6 +169,9 @@ class Dag:
                 condition=cond_value,
                 is_branch=is_branch,
                 mode=mode,
+                persist_rows=persist_rows,
+                profile=profile,
+                queue_size=queue_size,
             )
             return func
 
@@ -90,46 +203,150 @@ class Dag:
         logs_dir: str = "logs",
         persist_duckdb: bool = True,
         duckdb_file_name: str = "run.duckdb",
+        sinks: Iterable[SinkKind | Sink | RunSink] | None = None,
+        persist_rows: str = "all",
+        row_storage: RowStorage = "duckdb",
+        profile: ProfileMode | None = None,
+        trace_memory: bool = False,
     ) -> tuple[MutableMapping[str, object], MutableMapping[str, str]]:
-        all_disabled_edges = set(self._disabled_edges)
-        for source, target in disabled_edges or []:
-            source_name = self._ref_name(source)
-            target_name = self._ref_name(target)
-            all_disabled_edges.add((source_name, target_name))
-        all_disabled_steps = set(self._disabled_steps)
-        for step_ref in disabled_steps or []:
-            all_disabled_steps.add(self._ref_name(step_ref))
+        return self.execute(
+            max_workers=max_workers,
+            raise_on_fail=raise_on_fail,
+            disabled_edges=disabled_edges,
+            disabled_steps=disabled_steps,
+            dag_name=dag_name,
+            logs_dir=logs_dir,
+            persist_duckdb=persist_duckdb,
+            duckdb_file_name=duckdb_file_name,
+            sinks=sinks,
+            persist_rows=persist_rows,
+            row_storage=row_storage,
+            profile=profile,
+            trace_memory=trace_memory,
+        )
+
+    def execute(
+        self,
+        max_workers: int | None = None,
+        raise_on_fail: bool = True,
+        disabled_edges: Iterable[
+            tuple[Callable[..., object] | str, Callable[..., object] | str]
+        ]
+        | None = None,
+        disabled_steps: Iterable[Callable[..., object] | str] | None = None,
+        dag_name: str = "dag",
+        logs_dir: str = "logs",
+        persist_duckdb: bool = True,
+        duckdb_file_name: str = "run.duckdb",
+        sinks: Iterable[SinkKind | Sink | RunSink] | None = None,
+        persist_rows: str = "all",
+        row_storage: RowStorage = "duckdb",
+        profile: ProfileMode | None = None,
+        trace_memory: bool = False,
+        resources: RunResources | None = None,
+    ) -> tuple[MutableMapping[str, object], MutableMapping[str, str]]:
+        run_start = time.perf_counter()
+        all_disabled_edges, all_disabled_steps = self.resolve_disabled(
+            disabled_edges, disabled_steps
+        )
         if not persist_duckdb:
             raise RuntimeError(
                 "persist_duckdb=False nao e suportado. DuckDB e obrigatorio neste runtime."
             )
+        if row_storage not in {"duckdb", "parquet"}:
+            raise ValueError(f"row_storage invalido: {row_storage}. Use duckdb ou parquet.")
+        resolved_sinks = resolve_sinks(sinks)
+        run_profile = parse_profile_mode(profile)
+        step_profiles: dict[str, ProfileMode] = {
+            name: run_profile or "trace"
+            for name, step in self._steps.items()
+            if run_profile is not None or step.profile
+        }
+        run_retention = parse_row_retention(persist_rows)
+        step_retention = {
+            name: run_retention
+            if step.persist_rows is None
+            else parse_row_retention(step.persist_rows)
+            for name, step in self._steps.items()
+        }
         loggers: list[object] = []
+        sink_stats: list[SinkStats] = []
         self._last_run_dir = None
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        run_dir = os.path.join(logs_dir, f"{dag_name}_{timestamp}")
+        self._last_run_stats = None
+        run_dir = _create_run_dir(logs_dir, dag_name)
         run_name = os.path.basename(run_dir)
-        os.makedirs(run_dir, exist_ok=True)
         self._last_run_dir = run_dir
-        db_path = os.path.join(run_dir, duckdb_file_name)
-        duckdb_logger = DuckDBRunLogger(
-            db_path=db_path,
-            dag_name=dag_name,
-            steps=self._steps,
-            disabled_edges=all_disabled_edges,
-            disabled_steps=all_disabled_steps,
-        )
-        loggers.append(duckdb_logger)
-        sqlite_path = os.path.join(logs_dir, "runs.sqlite")
-        sqlite_logger = SQLiteRunLogger(
-            db_path=sqlite_path,
-            run_name=run_name,
-            dag_name=dag_name,
-            steps=self._steps,
-            disabled_edges=all_disabled_edges,
-            disabled_steps=all_disabled_steps,
-        )
-        loggers.append(sqlite_logger)
+
+        def _open_sink(sink: Sink | RunSink) -> object:
+            if not isinstance(sink, Sink):
+                return sink
+            if sink.kind == "duckdb":
+                return DuckDBRunLogger(
+                    db_path=os.path.join(run_dir, duckdb_file_name),
+                    dag_name=dag_name,
+                    steps=self._steps,
+                    disabled_edges=all_disabled_edges,
+                    disabled_steps=all_disabled_steps,
+                    store_rows=sink.store_rows,
+                    parquet_dir=os.path.join(run_dir, "rows")
+                    if row_storage == "parquet"
+                    else None,
+                    **({} if resources is None else {"connection": resources.duckdb_connection}),
+                )
+            if sink.kind == "sqlite":
+                return SQLiteRunLogger(
+                    db_path=os.path.join(logs_dir, "runs.sqlite"),
+                    run_name=run_name,
+                    dag_name=dag_name,
+                    steps=self._steps,
+                    disabled_edges=all_disabled_edges,
+                    disabled_steps=all_disabled_steps,
+                    store_rows=sink.store_rows,
+                    live_preview=sink.live_preview,
+                    **({} if resources is None else {"connection": resources.sqlite_connection}),
+                )
+            if sink.kind == "parquet":
+                return ParquetRunLogger(
+                    output_dir=os.path.join(run_dir, "parquet"),
+                    dag_name=dag_name,
+                    steps=self._steps,
+                    disabled_edges=all_disabled_edges,
+                    disabled_steps=all_disabled_steps,
+                    store_rows=sink.store_rows,
+                )
+            return NullRunLogger()
+
         logger_lock = threading.Lock()
+        appended_rows: dict[str, int] = {}
+        step_metrics: dict[str, dict[str, object]] = {}
+        step_stats: dict[str, StepStatsCollector] = {}
+        stats_rows: dict[str, int] = {}
+        engine_metrics: dict[str, float] = {}
+        overhead = {"retention_s": 0.0, "in_step_s": 0.0, "main_thread_s": 0.0}
+        scheduler_thread = threading.get_ident()
+
+        def _on_step_metrics(step_name: str, metrics: Mapping[str, object]) -> None:
+            step_metrics.setdefault(step_name, {}).update(metrics)
+
+        def _collect_stats(step_name: str, rows: list[object]) -> None:
+            collector = step_stats.get(step_name)
+            if collector is None:
+                collector = step_stats[step_name] = StepStatsCollector()
+            collector.update(rows)
+            stats_rows[step_name] = stats_rows.get(step_name, 0) + len(rows)
+
+        def _on_step_result(step_name: str, step_result: object) -> None:
+            if step_retention[step_name].keeps_all:
+                return
+            started = time.perf_counter()
+            if isinstance(step_result, list):
+                _collect_stats(step_name, step_result[stats_rows.get(step_name, 0) :])
+            elif step_result is not None:
+                _collect_stats(step_name, [step_result])
+            spent_s = time.perf_counter() - started
+            with logger_lock:
+                overhead["retention_s"] += spent_s
+                overhead["in_step_s"] += spent_s
 
         def _on_step_update(
             step_name: str,
@@ -140,13 +357,40 @@ class Dag:
             input_lines: int,
             output_lines: int,
         ) -> None:
+            update_start = time.perf_counter()
             throughput_in_lps = 0.0 if duration_s <= 0 else input_lines / duration_s
             throughput_out_lps = 0.0 if duration_s <= 0 else output_lines / duration_s
+            retention = step_retention[step_name]
+            append_offset: int | None = None
+            stats_delta: list[object] | None = None
+            with logger_lock:
+                streamed = appended_rows.get(step_name)
+                if step_status == "running" and isinstance(step_result, list):
+                    if retention.keeps_all:
+                        append_offset = streamed or 0
+                        appended_rows[step_name] = append_offset + len(step_result)
+                        persisted_result, row_ids = step_result, None
+                    else:
+                        persisted_result, row_ids = None, None
+                        stats_delta = step_result
+                elif (
+                    step_status == "done"
+                    and streamed is not None
+                    and isinstance(step_result, list)
+                ):
+                    append_offset = streamed
+                    persisted_result, row_ids = step_result[streamed:], None
+                else:
+                    persisted_result, row_ids = retain_rows(step_result, retention)
+            if stats_delta:
+                _collect_stats(step_name, stats_delta)
             meta = {
                 "status": step_status,
                 "output": step_output,
                 "duration_ms": round(duration_s * 1000.0, 3),
-                "result": step_result,
+                "result": persisted_result,
+                "row_ids": row_ids,
+                "append_offset": append_offset,
                 "input_lines": input_lines,
                 "output_lines": output_lines,
                 "throughput_in_lps": round(throughput_in_lps, 3),
@@ -158,10 +402,67 @@ class Dag:
                 ),
                 "disabled_self": step_name in all_disabled_steps,
             }
+            if not retention.keeps_all and step_status == "done":
+                meta["stats"] = step_stats.pop(step_name, StepStatsCollector()).rows()
+            if step_status in {"done", "failed"}:
+                meta.update(step_metrics.pop(step_name, {}))
+            elif step_status == "running":
+                meta.update(step_metrics.get(step_name, {}))
             with logger_lock:
-                for logger in loggers:
+                sinks_start = time.perf_counter()
+                retention_s = sinks_start - update_start
+                overhead["retention_s"] += retention_s
+                for logger, stats in zip(loggers, sink_stats):
+                    started = time.perf_counter()
                     logger.log_step(step_name, meta)
+                    stats.calls += 1
+                    stats.log_step_ms += (time.perf_counter() - started) * 1000.0
+                spent_s = time.perf_counter() - update_start
+                if threading.get_ident() != scheduler_thread:
+                    overhead["in_step_s"] += spent_s
+                else:
+                    overhead["main_thread_s"] += spent_s
+
+        def _record_run_stats() -> RunStats:
+            metrics_ms = engine_metrics.get("metrics_ms", 0.0) + max(
+                0.0,
+                engine_metrics.get("callbacks_ms", 0.0) - overhead["main_thread_s"] * 1000.0,
+            )
+            normalize_ms = engine_metrics.get("normalize_ms", 0.0)
+            capture_ms = engine_metrics.get("capture_ms", 0.0)
+            steps_ms = engine_metrics.get("steps_ms", 0.0)
+            for logger, stats in zip(loggers, sink_stats):
+                serialize_s = getattr(logger, "serialize_s", None)
+                stats.serialize_ms = None if serialize_s is None else serialize_s * 1000.0
+            return RunStats(
+                wall_ms=(time.perf_counter() - run_start) * 1000.0,
+                plan_ms=engine_metrics.get("plan_ms", 0.0)
+                + (0.0 if resources is None else resources.plan_ms),
+                scheduler_ms=engine_metrics.get("scheduler_ms", 0.0),
+                scheduler_iterations=int(engine_metrics.get("scheduler_iterations", 0)),
+                wait_ms=engine_metrics.get("wait_ms", 0.0),
+                steps_ms=steps_ms,
+                user_ms=max(
+                    0.0,
+                    steps_ms - normalize_ms - capture_ms - overhead["in_step_s"] * 1000.0,
+                ),
+                normalize_ms=normalize_ms,
+                capture_ms=capture_ms,
+                metrics_ms=metrics_ms,
+                retention_ms=overhead["retention_s"] * 1000.0,
+                sinks=sink_stats,
+            )
+
         try:
+            for sink in resolved_sinks:
+                started = time.perf_counter()
+                loggers.append(_open_sink(sink))
+                sink_stats.append(
+                    SinkStats(
+                        sink=sink.kind if isinstance(sink, Sink) else type(sink).__name__,
+                        open_ms=(time.perf_counter() - started) * 1000.0,
+                    )
+                )
             results, status, outputs, timings, input_lines_map, output_lines_map = run(
                 self._steps,
                 max_workers=max_workers,
@@ -169,6 +470,13 @@ class Dag:
                 disabled_edges=all_disabled_edges,
                 disabled_steps=all_disabled_steps,
                 on_step_update=_on_step_update,
+                profile=step_profiles,
+                on_step_metrics=_on_step_metrics,
+                trace_memory=trace_memory,
+                on_run_metrics=engine_metrics.update,
+                on_step_result=_on_step_result,
+                plan=None if resources is None else resources.plan,
+                pool=None if resources is None else resources.pool,
             )
             self._last_run = {
                 name: {
@@ -205,8 +513,39 @@ class Dag:
             }
             return results, status
         finally:
-            for logger in loggers:
-                logger.close()
+            run_stats = _record_run_stats()
+            try:
+                _finish_loggers(loggers, sink_stats, run_stats)
+            finally:
+                run_stats.wall_ms = (time.perf_counter() - run_start) * 1000.0
+                self._last_run_stats = run_stats
+
+    def explain(
+        self,
+        max_workers: int | None = None,
+        disabled_edges: Iterable[
+            tuple[Callable[..., object] | str, Callable[..., object] | str]
+        ]
+        | None = None,
+        disabled_steps: Iterable[Callable[..., object] | str] | None = None,
+        dag_name: str = "dag",
+        logs_dir: str = "logs",
+        history_runs: int = 20,
+        default_ms: float = 0.0,
+        durations: Mapping[Callable[..., object] | str, float] | None = None,
+    ) -> RunEstimate:
+        all_disabled_edges, all_disabled_steps = self.resolve_disabled(
+            disabled_edges, disabled_steps
+        )
+        plan = self.compile_plan(all_disabled_edges, all_disabled_steps)
+        return estimate_run(
+            self._steps,
+            plan,
+            load_step_durations(os.path.join(logs_dir, "runs.sqlite"), dag_name, history_runs),
+            max_workers=max_workers,
+            default_ms=default_ms,
+            durations={self._ref_name(ref): value for ref, value in (durations or {}).items()},
+        )
 
     def validate(self) -> None:
         validate_steps(self._steps)
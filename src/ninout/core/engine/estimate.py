@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import heapq
+import os
+import statistics
+from typing import Mapping
+
+from ninout.core.engine.models import Step
+from ninout.core.engine.planner import ExecutionPlan
+from ninout.core.engine.validate import levels
+
+
+@dataclass
+class StepEstimate:
+    step_name: str
+    level: int
+    duration_ms: float
+    samples: int
+    source: str
+    start_ms: float = 0.0
+    finish_ms: float = 0.0
+    slack_ms: float = 0.0
+    critical: bool = False
+
+
+@dataclass
+class LevelEstimate:
+    level: int
+    steps: int
+    work_ms: float
+    span_ms: float
+    utilization: float
+
+
+@dataclass
+class RunEstimate:
+    max_workers: int
+    total_ms: float
+    work_ms: float
+    critical_path_ms: float
+    critical_path: list[str]
+    steps: list[StepEstimate] = field(default_factory=list)
+    levels: list[LevelEstimate] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    missing_history: list[str] = field(default_factory=list)
+
+    @property
+    def parallelism(self) -> float:
+        return self.work_ms / self.critical_path_ms if self.critical_path_ms else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"estimated total: {self.total_ms:.1f} ms with {self.max_workers} workers",
+            f"critical path: {self.critical_path_ms:.1f} ms ({' -> '.join(self.critical_path)})",
+            f"work: {self.work_ms:.1f} ms, average parallelism: {self.parallelism:.2f}",
+        ]
+        for item in self.levels:
+            lines.append(
+                f"level {item.level}: {item.steps} steps, span {item.span_ms:.1f} ms, "
+                f"utilization {item.utilization:.0%}"
+            )
+        for step in self.steps:
+            marker = "*" if step.critical else " "
+            lines.append(
+                f"{marker} {step.step_name}: {step.duration_ms:.1f} ms "
+                f"[{step.start_ms:.1f}, {step.finish_ms:.1f}] slack {step.slack_ms:.1f} ms "
+                f"({step.source}, {step.samples} runs)"
+            )
+        if self.missing_history:
+            lines.append(f"no history: {', '.join(self.missing_history)}")
+        return "\n".join(lines)
+
+
+def default_max_workers() -> int:
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def _skipped_steps(steps: Mapping[str, Step], plan: ExecutionPlan) -> set[str]:
+    skipped: set[str] = set()
+    for name in plan.order:
+        if name in plan.disabled_steps or any(
+            (dep, name) in plan.disabled_edges or dep in skipped for dep in steps[name].deps
+        ):
+            skipped.add(name)
+    return skipped
+
+
+def _simulate(
+    steps: Mapping[str, Step],
+    order: list[str],
+    durations: Mapping[str, float],
+    max_workers: int,
+) -> dict[str, tuple[float, float]]:
+    position = {name: idx for idx, name in enumerate(order)}
+    waiting = {name: len(steps[name].deps) for name in order}
+    dependents: dict[str, list[str]] = {name: [] for name in order}
+    for name in order:
+        for dep in steps[name].deps:
+            dependents[dep].append(name)
+    ready = deque(name for name in order if not waiting[name])
+    running: list[tuple[float, int, str]] = []
+    schedule: dict[str, tuple[float, float]] = {}
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < max_workers:
+            name = ready.popleft()
+            finish = now + durations[name]
+            schedule[name] = (now, finish)
+            heapq.heappush(running, (finish, position[name], name))
+        now, _idx, name = heapq.heappop(running)
+        released = []
+        for target in dependents[name]:
+            waiting[target] -= 1
+            if not waiting[target]:
+                released.append(target)
+        ready.extend(sorted(released, key=position.__getitem__))
+    return schedule
+
+
+def estimate_run(
+    steps: Mapping[str, Step],
+    plan: ExecutionPlan,
+    history: Mapping[str, list[float]],
+    max_workers: int | None = None,
+    default_ms: float = 0.0,
+    durations: Mapping[str, float] | None = None,
+) -> RunEstimate:
+    workers = max_workers or default_max_workers()
+    skipped = _skipped_steps(steps, plan)
+    order = [name for name in plan.order if name not in skipped]
+    active = {name: steps[name] for name in order}
+    step_levels = levels(active, order)
+    estimates: dict[str, StepEstimate] = {}
+    for name in order:
+        samples = history.get(name, [])
+        if durations is not None and name in durations:
+            duration, source = float(durations[name]), "override"
+        elif samples:
+            duration, source = float(statistics.median(samples)), "history"
+        else:
+            duration, source = float(default_ms), "default"
+        estimates[name] = StepEstimate(
+            step_name=name,
+            level=step_levels[name],
+            duration_ms=round(duration, 3),
+            samples=len(samples),
+            source=source,
+        )
+    duration_ms = {name: estimates[name].duration_ms for name in order}
+
+    dependents: dict[str, list[str]] = {name: [] for name in order}
+    earliest: dict[str, float] = {}
+    via: dict[str, str | None] = {}
+    for name in order:
+        earliest[name], via[name] = 0.0, None
+        for dep in active[name].deps:
+            dependents[dep].append(name)
+            if earliest[dep] + duration_ms[dep] > earliest[name] or via[name] is None:
+                earliest[name], via[name] = earliest[dep] + duration_ms[dep], dep
+    last = max(reversed(order), key=lambda name: earliest[name] + duration_ms[name], default=None)
+    critical_path_ms = earliest[last] + duration_ms[last] if last is not None else 0.0
+    critical_path: list[str] = []
+    while last is not None:
+        critical_path.insert(0, last)
+        last = via[last]
+    latest: dict[str, float] = {}
+    for name in reversed(order):
+        latest_finish = min((latest[target] for target in dependents[name]), default=critical_path_ms)
+        latest[name] = latest_finish - duration_ms[name]
+
+    schedule = _simulate(active, order, duration_ms, workers)
+    on_critical_path = set(critical_path)
+    for name in order:
+        estimate = estimates[name]
+        estimate.start_ms, estimate.finish_ms = (round(value, 3) for value in schedule[name])
+        estimate.slack_ms = round(latest[name] - earliest[name], 3)
+        estimate.critical = name in on_critical_path
+
+    by_level: dict[int, list[StepEstimate]] = {}
+    for name in order:
+        by_level.setdefault(step_levels[name], []).append(estimates[name])
+    level_estimates: list[LevelEstimate] = []
+    for level, members in sorted(by_level.items()):
+        work = sum(item.duration_ms for item in members)
+        span = max(item.finish_ms for item in members) - min(item.start_ms for item in members)
+        level_estimates.append(
+            LevelEstimate(
+                level=level,
+                steps=len(members),
+                work_ms=round(work, 3),
+                span_ms=round(span, 3),
+                utilization=round(work / (span * workers), 4) if span else 0.0,
+            )
+        )
+    return RunEstimate(
+        max_workers=workers,
+        total_ms=round(max((item.finish_ms for item in estimates.values()), default=0.0), 3),
+        work_ms=round(sum(duration_ms.values()), 3),
+        critical_path_ms=round(critical_path_ms, 3),
+        critical_path=critical_path,
+        steps=list(estimates.values()),
+        levels=level_estimates,
+        skipped=[name for name in plan.order if name in skipped],
+        missing_history=[name for name, item in estimates.items() if item.source == "default"],
+    )
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
+from datetime import datetime, timezone
 import io
-from queue import Queue
+from itertools import chain
+from queue import Empty, Full, Queue
 import sys
 import threading
 import time
 from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Callable, Iterable, Mapping, MutableMapping
 
+from ninout.core.engine.metrics import MemoryTracker, RowPipelineTelemetry, estimate_size_bytes
 from ninout.core.engine.models import Step
-from ninout.core.engine.planner import compile_execution_plan
+from ninout.core.engine.planner import ExecutionPlan, compile_execution_plan
+from ninout.core.engine.profiling import ProfileMode, StepProfiler
 
 
 def run(
@@ -21,13 +26,35 @@ def run(
     on_step_update: (
         Callable[[str, str, object | None, str, float, int, int], None] | None
     ) = None,
+    profile: Mapping[str, ProfileMode] | None = None,
+    on_step_metrics: Callable[[str, Mapping[str, object]], None] | None = None,
+    trace_memory: bool = False,
+    on_run_metrics: Callable[[Mapping[str, float]], None] | None = None,
+    on_step_result: Callable[[str, object], None] | None = None,
+    plan: ExecutionPlan | None = None,
+    pool: ThreadPoolExecutor | None = None,
 ) -> tuple[MutableMapping[str, object], MutableMapping[str, str], MutableMapping[str, str]]:
     progress_emit_interval_s = 0.2
-    plan = compile_execution_plan(
-        steps,
-        disabled_edges=set(disabled_edges or set()),
-        disabled_steps=set(disabled_steps or set()),
-    )
+    queue_sample_interval_s = 0.01
+    engine: dict[str, float] = {
+        "plan_s": 0.0,
+        "loop_s": 0.0,
+        "iterations": 0,
+        "wait_s": 0.0,
+        "callbacks_s": 0.0,
+        "metrics_s": 0.0,
+        "normalize_s": 0.0,
+        "capture_s": 0.0,
+    }
+    engine_lock = threading.Lock()
+    if plan is None:
+        plan_start = time.perf_counter()
+        plan = compile_execution_plan(
+            steps,
+            disabled_edges=set(disabled_edges or set()),
+            disabled_steps=set(disabled_steps or set()),
+        )
+        engine["plan_s"] = time.perf_counter() - plan_start
     disabled = set(plan.disabled_edges)
     disabled_nodes = set(plan.disabled_steps)
     order = plan.order
@@ -36,6 +63,10 @@ def run(
     results: MutableMapping[str, object] = {}
     status: MutableMapping[str, str] = {name: "pending" for name in order}
     timings: MutableMapping[str, float] = {}
+    ready_at: dict[str, tuple[datetime, float]] = {}
+
+    def _utc_now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
 
     def _set_status(
         name: str,
@@ -82,7 +113,10 @@ def run(
             buffer = getattr(thread_local, "buffer", None)
             if buffer is None:
                 return stdout.write(text)
-            return buffer.write(text)
+            started = time.perf_counter()
+            written = buffer.write(text)
+            thread_local.capture_s += time.perf_counter() - started
+            return written
 
         def flush(self) -> None:
             buffer = getattr(thread_local, "buffer", None)
@@ -133,14 +167,43 @@ def run(
             ) from exc
         duckdb_connection = duckdb.connect(":memory:")
 
+    step_metrics: dict[str, dict[str, object]] = {}
+    profile_modes = dict(profile or {})
+    memory = MemoryTracker() if trace_memory else None
+
     def _run_step(step: Step) -> tuple[bool, object, str, float, int, int]:
         buffer = io.StringIO()
         thread_local.buffer = buffer
+        thread_local.capture_s = 0.0
+        profiler = (
+            StepProfiler(
+                profile_modes[step.name],
+                None if step.mode == "sql" else step.func,
+            )
+            if step.name in profile_modes
+            else None
+        )
+        profiled = profiler.active if profiler is not None else nullcontext
+        thread_cpu: list[float] = []
+        telemetry: RowPipelineTelemetry | None = None
+        memory_baseline = memory.begin() if memory is not None else 0
+        cpu_start = time.thread_time()
         start = time.perf_counter()
+        ready_at_utc, ready_clock = ready_at.pop(step.name)
+        timeline: dict[str, object] = {
+            "ready_at_utc": ready_at_utc,
+            "started_at_utc": _utc_now(),
+            "worker": threading.current_thread().name,
+            "queue_wait_ms": round((start - ready_clock) * 1000.0, 3),
+        }
+        normalize_start = time.perf_counter()
         input_lines = 0
         for dep in step.deps:
             if dep in results:
                 input_lines += _count_lines(results[dep])
+        normalize_s = time.perf_counter() - normalize_start
+        if on_step_metrics is not None:
+            on_step_metrics(step.name, timeline)
         try:
             if step.mode == "row":
                 input_rows: list[dict[str, object]] = []
@@ -152,34 +215,79 @@ def run(
                         input_rows.extend(dep_value)
 
                 eof = object()
-                in_q: Queue[object] = Queue(maxsize=1024)
-                out_q: Queue[object] = Queue(maxsize=1024)
+                in_q: Queue[object] = Queue(maxsize=step.queue_size)
+                out_q: Queue[object] = Queue(maxsize=step.queue_size)
                 worker_error: dict[str, Exception] = {}
+                pipeline = RowPipelineTelemetry(step.queue_size)
+                telemetry = pipeline
 
                 def _producer() -> None:
-                    for row in input_rows:
-                        in_q.put(row)
-                    in_q.put(eof)
+                    producer_cpu = time.thread_time()
+                    put_nowait = in_q.put_nowait
+                    for row in chain(input_rows, (eof,)):
+                        try:
+                            put_nowait(row)
+                        except Full:
+                            blocked = time.perf_counter()
+                            in_q.put(row)
+                            pipeline.producer_blocked_s += time.perf_counter() - blocked
+                    thread_cpu.append(time.thread_time() - producer_cpu)
+
+                def _emit(row_result: dict[str, object]) -> None:
+                    blocked = time.perf_counter()
+                    out_q.put(row_result)
+                    pipeline.worker_blocked_s += time.perf_counter() - blocked
 
                 def _worker() -> None:
+                    worker_cpu = time.thread_time()
+                    try:
+                        with profiled():
+                            _consume()
+                    finally:
+                        thread_cpu.append(time.thread_time() - worker_cpu)
+
+                def _consume() -> None:
+                    get_nowait = in_q.get_nowait
+                    sample_mask = pipeline.sample_mask
+                    processed = 0
                     while True:
-                        item = in_q.get()
+                        try:
+                            item = get_nowait()
+                        except Empty:
+                            starved = time.perf_counter()
+                            item = in_q.get()
+                            pipeline.worker_starved_s += time.perf_counter() - starved
                         if item is eof:
+                            pipeline.rows = processed
                             out_q.put(eof)
                             return
                         row = item
+                        timed = not processed & sample_mask
+                        processed += 1
+                        if timed:
+                            pipeline.rows = processed
                         try:
+                            if timed:
+                                row_start = time.perf_counter()
                             try:
                                 row_result = step.func(row)
                             except TypeError:
                                 row_result = step.func([row])
+                            if timed:
+                                pipeline.record_row(time.perf_counter() - row_start)
                             if row_result is None:
                                 continue
                             if isinstance(row_result, dict):
-                                out_q.put(row_result)
+                                try:
+                                    out_q.put_nowait(row_result)
+                                except Full:
+                                    _emit(row_result)
                             elif isinstance(row_result, list):
                                 for r in row_result:
-                                    out_q.put(r)
+                                    try:
+                                        out_q.put_nowait(r)
+                                    except Full:
+                                        _emit(r)
                             else:
                                 raise TypeError(
                                     f"Step {step.name} (mode=row) deve retornar dict, list[dict] ou None por linha."
@@ -195,27 +303,34 @@ def run(
                 worker_thread.start()
 
                 collected_rows: list[dict[str, object]] = []
-                last_emit = time.perf_counter()
+                emitted_rows = 0
+                last_emit = last_sample = time.perf_counter()
                 while True:
                     out_item = out_q.get()
                     if out_item is eof:
                         break
                     collected_rows.append(out_item)
                     now = time.perf_counter()
+                    if now - last_sample >= queue_sample_interval_s:
+                        pipeline.sample(in_q.qsize(), out_q.qsize())
+                        last_sample = now
                     if (
                         on_step_update is not None
                         and now - last_emit >= progress_emit_interval_s
                     ):
                         elapsed = now - start
+                        if on_step_metrics is not None:
+                            on_step_metrics(step.name, {"row_telemetry": pipeline.snapshot()})
                         on_step_update(
                             step.name,
                             "running",
-                            None,
+                            collected_rows[emitted_rows:],
                             buffer.getvalue(),
                             elapsed,
                             input_lines,
                             len(collected_rows),
                         )
+                        emitted_rows = len(collected_rows)
                         last_emit = now
 
                 producer_thread.join()
@@ -224,38 +339,45 @@ def run(
                     raise worker_error["error"]
                 result = collected_rows
             elif step.mode == "sql":
-                try:
-                    query = step.func(results)
-                except TypeError:
-                    query = step.func()
-                if not isinstance(query, str):
-                    raise TypeError(
-                        f"Step {step.name} com mode='sql' deve retornar query SQL (str)."
-                    )
-                if duckdb_connection is None:
-                    raise RuntimeError("Conexao DuckDB indisponivel para mode='sql'.")
-                sql_result = duckdb_connection.execute(query).fetchall()
+                with profiled():
+                    try:
+                        query = step.func(results)
+                    except TypeError:
+                        query = step.func()
+                    if not isinstance(query, str):
+                        raise TypeError(
+                            f"Step {step.name} com mode='sql' deve retornar query SQL (str)."
+                        )
+                    if duckdb_connection is None:
+                        raise RuntimeError("Conexao DuckDB indisponivel para mode='sql'.")
+                    sql_result = duckdb_connection.execute(query).fetchall()
                 columns = [desc[0] for desc in duckdb_connection.description]
                 result = [
                     {str(col): row[idx] for idx, col in enumerate(columns)}
                     for row in sql_result
                 ]
             else:
-                try:
-                    result = step.func(results)
-                except TypeError:
-                    result = step.func()
+                with profiled():
+                    try:
+                        result = step.func(results)
+                    except TypeError:
+                        result = step.func()
+            normalize_start = time.perf_counter()
             if step.is_branch:
                 if not isinstance(result, bool):
                     raise ValueError(f"Branch {step.name} deve retornar bool, recebeu {result}")
             else:
                 result = _normalize_payload(result, step.name)
             output_lines = _count_lines(result)
+            normalize_s += time.perf_counter() - normalize_start
+            duration_s = time.perf_counter() - start
+            if on_step_result is not None:
+                on_step_result(step.name, result)
             return (
                 True,
                 result,
                 buffer.getvalue(),
-                time.perf_counter() - start,
+                duration_s,
                 input_lines,
                 output_lines,
             )
@@ -270,16 +392,45 @@ def run(
             )
         finally:
             thread_local.buffer = None
+            with engine_lock:
+                engine["normalize_s"] += normalize_s
+                engine["capture_s"] += thread_local.capture_s
+            cpu_s = time.thread_time() - cpu_start + sum(thread_cpu)
+            metrics: dict[str, object] = {
+                **timeline,
+                "finished_at_utc": _utc_now(),
+                "cpu_ms": round(cpu_s * 1000.0, 3),
+            }
+            if telemetry is not None:
+                metrics["row_telemetry"] = telemetry.snapshot()
+            if memory is not None:
+                metrics["peak_alloc_bytes"] = memory.end(memory_baseline)
+            if profiler is not None:
+                metrics["profile"] = profiler.report()
+            step_metrics[step.name] = metrics
+
+    def _notify(callback: Callable[..., None], *args: object) -> None:
+        started = time.perf_counter()
+        callback(*args)
+        engine["callbacks_s"] += time.perf_counter() - started
 
     outputs: MutableMapping[str, str] = {}
     input_lines_map: MutableMapping[str, int] = {}
     output_lines_map: MutableMapping[str, int] = {}
 
     try:
+        if memory is not None:
+            memory.start()
         sys.stdout = _ThreadLocalIO()
         sys.stderr = sys.stdout
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with (
+            nullcontext(pool)
+            if pool is not None
+            else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ninout-worker")
+        ) as executor:
+            loop_start = time.perf_counter()
             while pending or running:
+                engine["iterations"] += 1
                 progressed = False
                 for name in list(pending):
                     if should_skip(name):
@@ -289,7 +440,7 @@ def run(
                         input_lines_map[name] = 0
                         output_lines_map[name] = 0
                         if on_step_update is not None:
-                            on_step_update(name, "skipped", None, "", 0.0, 0, 0)
+                            _notify(on_step_update, name, "skipped", None, "", 0.0, 0, 0)
                         pending.remove(name)
                         progressed = True
                         continue
@@ -302,19 +453,33 @@ def run(
                         input_lines_map[name] = 0
                         output_lines_map[name] = 0
                         if on_step_update is not None:
-                            on_step_update(name, "skipped", None, "", 0.0, 0, 0)
+                            _notify(on_step_update, name, "skipped", None, "", 0.0, 0, 0)
                         pending.remove(name)
                         progressed = True
                         continue
                     step = steps[name]
+                    ready_at[name] = (_utc_now(), time.perf_counter())
                     future = executor.submit(_run_step, step)
                     running[name] = future
                     _set_status(name, "running", {"pending"})
+                    if on_step_update is not None:
+                        _notify(
+                            on_step_update,
+                            name,
+                            "running",
+                            [] if step.mode == "row" else None,
+                            "",
+                            0.0,
+                            0,
+                            0,
+                        )
                     pending.remove(name)
                     progressed = True
 
                 if running:
+                    wait_start = time.perf_counter()
                     done_futures, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                    engine["wait_s"] += time.perf_counter() - wait_start
                     for future in done_futures:
                         finished = None
                         for name, f in list(running.items()):
@@ -328,6 +493,13 @@ def run(
                         )
                         if output_lines == 0 and output:
                             output_lines = _count_lines(output)
+                        metrics = step_metrics.pop(finished, {})
+                        if ok:
+                            size_start = time.perf_counter()
+                            metrics["result_bytes"] = estimate_size_bytes(payload)
+                            engine["metrics_s"] += time.perf_counter() - size_start
+                        if on_step_metrics is not None:
+                            _notify(on_step_metrics, finished, metrics)
                         outputs[finished] = output
                         timings[finished] = duration
                         input_lines_map[finished] = input_lines
@@ -336,7 +508,8 @@ def run(
                             results[finished] = payload
                             _set_status(finished, "done", {"running"})
                             if on_step_update is not None:
-                                on_step_update(
+                                _notify(
+                                    on_step_update,
                                     finished,
                                     "done",
                                     payload,
@@ -349,7 +522,8 @@ def run(
                             results[finished] = payload
                             _set_status(finished, "failed", {"running"})
                             if on_step_update is not None:
-                                on_step_update(
+                                _notify(
+                                    on_step_update,
                                     finished,
                                     "failed",
                                     payload,
@@ -363,11 +537,35 @@ def run(
 
                 if not progressed and not running and pending:
                     raise RuntimeError("Deadlock ao executar o DAG")
+            engine["loop_s"] = time.perf_counter() - loop_start
     finally:
+        if pool is not None and running:
+            wait(running.values())
         if duckdb_connection is not None:
             duckdb_connection.close()
+        if memory is not None:
+            memory.stop()
         sys.stdout = stdout
         sys.stderr = stderr
+        if on_run_metrics is not None:
+            loop_s = engine["loop_s"]
+            on_run_metrics(
+                {
+                    "plan_ms": engine["plan_s"] * 1000.0,
+                    "scheduler_iterations": engine["iterations"],
+                    "scheduler_ms": max(
+                        0.0,
+                        loop_s - engine["wait_s"] - engine["callbacks_s"] - engine["metrics_s"],
+                    )
+                    * 1000.0,
+                    "wait_ms": engine["wait_s"] * 1000.0,
+                    "callbacks_ms": engine["callbacks_s"] * 1000.0,
+                    "metrics_ms": engine["metrics_s"] * 1000.0,
+                    "steps_ms": sum(timings.values()) * 1000.0,
+                    "normalize_ms": engine["normalize_s"] * 1000.0,
+                    "capture_ms": engine["capture_s"] * 1000.0,
+                }
+            )
 
     failed = [name for name, st in status.items() if st == "failed"]
     if failed and raise_on_fail:
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+import sys
+import threading
+import time
+import tracemalloc
+
+_SIZE_SAMPLE = 100
+_MAX_DEPTH = 8
+_LATENCY_BUCKETS = 128
+_LATENCY_SAMPLE_MASK = 7
+_MAX_DEPTH_SAMPLES = 120
+_PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class SinkStats:
+    sink: str
+    calls: int = 0
+    open_ms: float = 0.0
+    log_step_ms: float = 0.0
+    serialize_ms: float | None = None
+    close_ms: float | None = None
+
+
+@dataclass
+class RunStats:
+    wall_ms: float = 0.0
+    plan_ms: float = 0.0
+    scheduler_ms: float = 0.0
+    scheduler_iterations: int = 0
+    wait_ms: float = 0.0
+    steps_ms: float = 0.0
+    user_ms: float = 0.0
+    normalize_ms: float = 0.0
+    capture_ms: float = 0.0
+    metrics_ms: float = 0.0
+    retention_ms: float = 0.0
+    sinks: list[SinkStats] = field(default_factory=list)
+
+    @property
+    def sink_ms(self) -> float:
+        return sum(
+            item.open_ms + item.log_step_ms + (item.close_ms or 0.0) for item in self.sinks
+        )
+
+    @property
+    def framework_ms(self) -> float:
+        return (
+            self.plan_ms
+            + self.scheduler_ms
+            + self.normalize_ms
+            + self.capture_ms
+            + self.metrics_ms
+            + self.retention_ms
+            + self.sink_ms
+        )
+
+    def rows(self) -> list[tuple[str, str, float]]:
+        rows = [
+            ("run", name, float(getattr(self, name)))
+            for name in (
+                "wall_ms",
+                "plan_ms",
+                "scheduler_ms",
+                "scheduler_iterations",
+                "wait_ms",
+                "steps_ms",
+                "user_ms",
+                "normalize_ms",
+                "capture_ms",
+                "metrics_ms",
+                "retention_ms",
+                "sink_ms",
+                "framework_ms",
+            )
+        ]
+        for item in self.sinks:
+            scope = f"sink:{item.sink}"
+            rows.append((scope, "calls", float(item.calls)))
+            for name in ("open_ms", "log_step_ms", "serialize_ms", "close_ms"):
+                value = getattr(item, name)
+                if value is not None:
+                    rows.append((scope, name, float(value)))
+        return rows
+
+
+def _deep_size(value: object, depth: int = 0) -> int:
+    size = sys.getsizeof(value)
+    if depth >= _MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            _deep_size(key, depth + 1) + _deep_size(item, depth + 1)
+            for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + _sampled_items_size(list(value), depth + 1)
+    return size
+
+
+def _sampled_items_size(items: list[object], depth: int) -> int:
+    if len(items) <= _SIZE_SAMPLE:
+        return sum(_deep_size(item, depth) for item in items)
+    step = len(items) / _SIZE_SAMPLE
+    sample = [items[int(idx * step)] for idx in range(_SIZE_SAMPLE)]
+    return int(sum(_deep_size(item, depth) for item in sample) / _SIZE_SAMPLE * len(items))
+
+
+def estimate_size_bytes(value: object) -> int:
+    if value is None:
+        return 0
+    return _deep_size(value)
+
+
+class MemoryTracker:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active = 0
+        self._owned = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owned = True
+
+    def stop(self) -> None:
+        if self._owned:
+            tracemalloc.stop()
+            self._owned = False
+
+    def begin(self) -> int:
+        with self._lock:
+            if not self._active:
+                tracemalloc.reset_peak()
+            self._active += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def end(self, baseline: int) -> int:
+        with self._lock:
+            self._active -= 1
+            return max(0, tracemalloc.get_traced_memory()[1] - baseline)
+
+
+def _bucket_upper_ms(index: int) -> float:
+    if index < 4:
+        return (index + 1) / 1000.0
+    shift = index // 4 - 1
+    return ((index % 4 + 5) << shift) / 1000.0
+
+
+class RowPipelineTelemetry:
+    sample_mask = _LATENCY_SAMPLE_MASK
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.rows = 0
+        self.latency_total_s = 0.0
+        self.latency_max_s = 0.0
+        self.latency_counts = [0] * _LATENCY_BUCKETS
+        self.producer_blocked_s = 0.0
+        self.worker_starved_s = 0.0
+        self.worker_blocked_s = 0.0
+        self._start = time.perf_counter()
+        self._samples: list[tuple[float, int, int]] = []
+        self._stride = 1
+        self._calls = 0
+
+    def record_row(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000)
+        if micros < 4:
+            index = micros
+        else:
+            shift = micros.bit_length() - 3
+            index = (shift + 1) * 4 + (micros >> shift) - 4
+        self.latency_counts[min(index, _LATENCY_BUCKETS - 1)] += 1
+        self.latency_total_s += seconds
+        if seconds > self.latency_max_s:
+            self.latency_max_s = seconds
+
+    def sample(self, in_depth: int, out_depth: int) -> None:
+        self._calls += 1
+        if self._calls % self._stride:
+            return
+        self._samples.append(
+            (round((time.perf_counter() - self._start) * 1000.0, 3), in_depth, out_depth)
+        )
+        if len(self._samples) >= _MAX_DEPTH_SAMPLES:
+            self._samples = self._samples[::2]
+            self._stride *= 2
+
+    def _percentiles(self, counts: list[int]) -> dict[str, float | None]:
+        total = sum(counts)
+        result: dict[str, float | None] = {}
+        for percentile in _PERCENTILES:
+            if not total:
+                result[f"p{percentile}_ms"] = None
+                continue
+            target = math.ceil(total * percentile / 100)
+            seen = 0
+            for index, count in enumerate(counts):
+                seen += count
+                if seen >= target:
+                    upper = min(_bucket_upper_ms(index), self.latency_max_s * 1000.0)
+                    result[f"p{percentile}_ms"] = round(upper, 4)
+                    break
+        return result
+
+    def snapshot(self) -> dict[str, object]:
+        counts = list(self.latency_counts)
+        samples = list(self._samples)
+        in_depths = [item[1] for item in samples]
+        out_depths = [item[2] for item in samples]
+        timed = sum(counts)
+        return {
+            "queue_size": self.queue_size,
+            "rows": self.rows,
+            "timed_rows": timed,
+            "in_depth_max": max(in_depths, default=0),
+            "in_depth_mean": round(sum(in_depths) / len(in_depths), 2) if in_depths else 0.0,
+            "out_depth_max": max(out_depths, default=0),
+            "out_depth_mean": round(sum(out_depths) / len(out_depths), 2) if out_depths else 0.0,
+            "producer_blocked_ms": round(self.producer_blocked_s * 1000.0, 3),
+            "worker_starved_ms": round(self.worker_starved_s * 1000.0, 3),
+            "worker_blocked_ms": round(self.worker_blocked_s * 1000.0, 3),
+            "latency_mean_ms": round(self.latency_total_s * 1000.0 / timed, 4) if timed else None,
+            "latency_max_ms": round(self.latency_max_s * 1000.0, 4) if timed else None,
+            **self._percentiles(counts),
+            "latency_histogram": [
+                [round(_bucket_upper_ms(index), 4), count]
+                for index, count in enumerate(counts)
+                if count
+            ],
+            "depth_samples": [list(item) for item in samples],
+        }
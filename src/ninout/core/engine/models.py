@@ -18,6 +18,9 @@ class Step:
     condition: bool | None = None
     is_branch: bool = False
     mode: StepMode = "task"
+    persist_rows: str | None = None
+    profile: bool = False
+    queue_size: int = 1024
     code: str | None = None
     output: str | None = None
     result: str | None = None
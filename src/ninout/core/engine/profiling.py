@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import os
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Callable, Iterator, Literal, TypeAlias
+
+ProfileMode: TypeAlias = Literal["trace", "sampling"]
+PROFILE_MODES: tuple[str, ...] = ("trace", "sampling")
+
+_TOP_FUNCTIONS = 50
+_MAX_STACKS = 2000
+_SAMPLE_INTERVAL_S = 0.005
+
+
+@dataclass
+class ProfileFunction:
+    name: str
+    calls: int | None
+    self_ms: float
+    total_ms: float
+
+
+@dataclass
+class StepProfile:
+    mode: str
+    samples: int
+    functions: list[ProfileFunction] = field(default_factory=list)
+    stacks: dict[str, float] = field(default_factory=dict)
+
+
+def parse_profile_mode(value: object) -> ProfileMode | None:
+    if value is None or value is False:
+        return None
+    if value is True:
+        return "trace"
+    if value not in PROFILE_MODES:
+        raise ValueError(f"profile invalido: {value}. Use trace ou sampling.")
+    return value  # type: ignore[return-value]
+
+
+def _code_label(code: CodeType) -> str:
+    label = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ",")
+
+
+def _builtin_label(func: object) -> str:
+    module = getattr(func, "__module__", None)
+    name = getattr(func, "__qualname__", None) or repr(func)
+    label = f"<{module}.{name}>" if module else f"<{name}>"
+    return label.replace(";", ",")
+
+
+def _top_functions(
+    calls: dict[str, int],
+    self_ms: dict[str, float],
+    total_ms: dict[str, float],
+    counted: bool,
+) -> list[ProfileFunction]:
+    names = sorted(total_ms, key=lambda name: (-self_ms.get(name, 0.0), -total_ms[name], name))
+    return [
+        ProfileFunction(
+            name=name,
+            calls=calls.get(name, 0) if counted else None,
+            self_ms=round(self_ms.get(name, 0.0), 3),
+            total_ms=round(total_ms[name], 3),
+        )
+        for name in names[:_TOP_FUNCTIONS]
+    ]
+
+
+def _top_stacks(stacks: dict[str, float]) -> dict[str, float]:
+    heaviest = sorted(stacks.items(), key=lambda item: -item[1])[:_MAX_STACKS]
+    return {stack: round(weight, 3) for stack, weight in heaviest if weight > 0}
+
+
+class _TraceProfiler:
+    def __init__(self, entry: CodeType | None) -> None:
+        self._entry = entry
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.self_ms: dict[str, float] = {}
+        self.total_ms: dict[str, float] = {}
+        self.stacks: dict[str, float] = {}
+
+    def _merge(self, local: _ThreadTrace) -> None:
+        with self._lock:
+            for name, count in local.calls.items():
+                self.calls[name] = self.calls.get(name, 0) + count
+            for target, source in (
+                (self.self_ms, local.self_ms),
+                (self.total_ms, local.total_ms),
+                (self.stacks, local.stacks),
+            ):
+                for key, value in source.items():
+                    target[key] = target.get(key, 0.0) + value
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        trace = _ThreadTrace(self._entry)
+        previous = sys.getprofile()
+        sys.setprofile(trace.event)
+        try:
+            yield
+        finally:
+            sys.setprofile(previous)
+            trace.flush()
+            self._merge(trace)
+
+    def report(self) -> StepProfile:
+        return StepProfile(
+            mode="trace",
+            samples=sum(self.calls.values()),
+            functions=_top_functions(self.calls, self.self_ms, self.total_ms, counted=True),
+            stacks=_top_stacks(self.stacks),
+        )
+
+
+class _ThreadTrace:
+    def __init__(self, entry: CodeType | None) -> None:
+        self._entry = entry
+        self._frames: list[tuple[object, str, float, float]] = []
+        self._labels: list[str] = []
+        self._active: dict[str, int] = {}
+        self.calls: dict[str, int] = {}
+        self.self_ms: dict[str, float] = {}
+        self.total_ms: dict[str, float] = {}
+        self.stacks: dict[str, float] = {}
+
+    def event(self, frame: FrameType, event: str, arg: object) -> None:
+        now = time.perf_counter()
+        if event == "call":
+            if not self._frames and self._entry is not None and frame.f_code is not self._entry:
+                return
+            self._push(frame, _code_label(frame.f_code), now)
+        elif event == "c_call":
+            if self._frames:
+                self._push(arg, _builtin_label(arg), now)
+        elif event == "return":
+            self._pop_until(frame, now)
+        elif self._frames and self._frames[-1][0] is arg:
+            self._pop(now)
+
+    def _push(self, key: object, label: str, now: float) -> None:
+        self._frames.append((key, label, now, 0.0))
+        self._labels.append(label)
+        self.calls[label] = self.calls.get(label, 0) + 1
+        self._active[label] = self._active.get(label, 0) + 1
+
+    def _pop(self, now: float) -> None:
+        key, label, start, child = self._frames.pop()
+        elapsed = (now - start) * 1000.0
+        own = max(0.0, elapsed - child)
+        stack = ";".join(self._labels)
+        self._labels.pop()
+        self.self_ms[label] = self.self_ms.get(label, 0.0) + own
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+        self._active[label] -= 1
+        if not self._active[label]:
+            self.total_ms[label] = self.total_ms.get(label, 0.0) + elapsed
+        if self._frames:
+            parent_key, parent_label, parent_start, parent_child = self._frames[-1]
+            self._frames[-1] = (parent_key, parent_label, parent_start, parent_child + elapsed)
+
+    def _pop_until(self, frame: FrameType, now: float) -> None:
+        if not any(entry[0] is frame for entry in self._frames):
+            return
+        while self._frames:
+            top = self._frames[-1][0]
+            self._pop(now)
+            if top is frame:
+                return
+
+    def flush(self) -> None:
+        now = time.perf_counter()
+        while self._frames:
+            self._pop(now)
+        setprofile_label = _builtin_label(sys.setprofile)
+        self.calls.pop(setprofile_label, None)
+        self.self_ms.pop(setprofile_label, None)
+        self.total_ms.pop(setprofile_label, None)
+        self.stacks = {
+            stack: weight
+            for stack, weight in self.stacks.items()
+            if not stack.endswith(setprofile_label)
+        }
+
+
+class _SamplingProfiler:
+    def __init__(self, entry: CodeType | None, interval_s: float = _SAMPLE_INTERVAL_S) -> None:
+        self._entry = entry
+        self._interval_s = interval_s
+        self._lock = threading.Lock()
+        self._threads: dict[int, int] = {}
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self.samples = 0
+        self.self_ms: dict[str, float] = {}
+        self.total_ms: dict[str, float] = {}
+        self.stacks: dict[str, float] = {}
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, daemon=True)
+                self._sampler.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def _labels(self, frame: FrameType | None) -> list[str] | None:
+        codes: list[CodeType] = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        if self._entry is not None:
+            if self._entry not in codes:
+                return None
+            codes = codes[codes.index(self._entry) :]
+        return [_code_label(code) for code in codes]
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self._interval_s):
+            now = time.perf_counter()
+            weight = (now - last) * 1000.0
+            last = now
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                labels = self._labels(frames.get(ident))
+                if not labels:
+                    continue
+                self.samples += 1
+                stack = ";".join(labels)
+                self.stacks[stack] = self.stacks.get(stack, 0.0) + weight
+                self.self_ms[labels[-1]] = self.self_ms.get(labels[-1], 0.0) + weight
+                for label in set(labels):
+                    self.total_ms[label] = self.total_ms.get(label, 0.0) + weight
+
+    def report(self) -> StepProfile:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return StepProfile(
+            mode="sampling",
+            samples=self.samples,
+            functions=_top_functions({}, self.self_ms, self.total_ms, counted=False),
+            stacks=_top_stacks(self.stacks),
+        )
+
+
+class StepProfiler:
+    def __init__(self, mode: ProfileMode, entry: Callable[..., object] | None = None) -> None:
+        code = getattr(entry, "__code__", None)
+        self._profiler: _TraceProfiler | _SamplingProfiler = (
+            _SamplingProfiler(code) if mode == "sampling" else _TraceProfiler(code)
+        )
+
+    def active(self):
+        return self._profiler.active()
+
+    def report(self) -> StepProfile:
+        return self._profiler.report()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+from typing import Callable, Iterable, MutableMapping
+
+from ninout.core.engine.dag import Dag, RowStorage, RunResources
+from ninout.core.engine.estimate import default_max_workers
+from ninout.core.engine.metrics import RunStats
+from ninout.core.engine.planner import ExecutionPlan
+from ninout.core.engine.profiling import ProfileMode
+from ninout.core.ui.persist_sqlite import connect_runs_db
+from ninout.core.ui.sinks import RunSink, Sink, SinkKind, resolve_sinks
+
+
+class Runner:
+    def __init__(
+        self,
+        dag: Dag,
+        max_workers: int | None = None,
+        dag_name: str = "dag",
+        logs_dir: str = "logs",
+        sinks: Iterable[SinkKind | Sink | RunSink] | None = None,
+        persist_rows: str = "all",
+        row_storage: RowStorage = "duckdb",
+        duckdb_file_name: str = "run.duckdb",
+    ) -> None:
+        if row_storage not in {"duckdb", "parquet"}:
+            raise ValueError(f"row_storage invalido: {row_storage}. Use duckdb ou parquet.")
+        self._dag = dag
+        self._sinks = resolve_sinks(sinks)
+        self._dag_name = dag_name
+        self._logs_dir = logs_dir
+        self._persist_rows = persist_rows
+        self._row_storage = row_storage
+        self._duckdb_file_name = duckdb_file_name
+        self._lock = threading.Lock()
+        self._plans: dict[
+            tuple[int, frozenset[tuple[str, str]], frozenset[str]], ExecutionPlan
+        ] = {}
+        self._closed = False
+        self._duckdb_connection: object | None = None
+        self._sqlite_connection = None
+        kinds = {sink.kind for sink in self._sinks if isinstance(sink, Sink)}
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or default_max_workers(),
+            thread_name_prefix="ninout-worker",
+        )
+        try:
+            if "duckdb" in kinds:
+                try:
+                    import duckdb  # type: ignore[import-not-found]
+                except ImportError as exc:
+                    raise RuntimeError(
+                        "duckdb nao esta instalado. Instale com `uv add duckdb` para persistir resultados."
+                    ) from exc
+                self._duckdb_connection = duckdb.connect()
+            if "sqlite" in kinds:
+                self._sqlite_connection = connect_runs_db(os.path.join(logs_dir, "runs.sqlite"))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def last_run_dir(self) -> str | None:
+        return self._dag.last_run_dir
+
+    @property
+    def last_run_stats(self) -> RunStats | None:
+        return self._dag.last_run_stats
+
+    def _plan(
+        self, disabled_edges: set[tuple[str, str]], disabled_steps: set[str]
+    ) -> tuple[ExecutionPlan, float]:
+        key = (self._dag.revision, frozenset(disabled_edges), frozenset(disabled_steps))
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan, 0.0
+        plan_start = time.perf_counter()
+        self._plans = {
+            cached: value for cached, value in self._plans.items() if cached[0] == key[0]
+        }
+        plan = self._dag.compile_plan(disabled_edges, disabled_steps)
+        self._plans[key] = plan
+        return plan, (time.perf_counter() - plan_start) * 1000.0
+
+    def run(
+        self,
+        raise_on_fail: bool = True,
+        disabled_edges: Iterable[
+            tuple[Callable[..., object] | str, Callable[..., object] | str]
+        ]
+        | None = None,
+        disabled_steps: Iterable[Callable[..., object] | str] | None = None,
+        profile: ProfileMode | None = None,
+        trace_memory: bool = False,
+    ) -> tuple[MutableMapping[str, object], MutableMapping[str, str]]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Runner fechado. Crie um novo Runner para executar o DAG.")
+            all_disabled_edges, all_disabled_steps = self._dag.resolve_disabled(
+                disabled_edges, disabled_steps
+            )
+            plan, plan_ms = self._plan(all_disabled_edges, all_disabled_steps)
+            resources = RunResources(
+                pool=self._pool,
+                plan=plan,
+                plan_ms=plan_ms,
+                duckdb_connection=self._duckdb_connection,
+                sqlite_connection=self._sqlite_connection,
+            )
+            return self._dag.execute(
+                raise_on_fail=raise_on_fail,
+                disabled_edges=disabled_edges,
+                disabled_steps=disabled_steps,
+                dag_name=self._dag_name,
+                logs_dir=self._logs_dir,
+                duckdb_file_name=self._duckdb_file_name,
+                sinks=self._sinks,
+                persist_rows=self._persist_rows,
+                row_storage=self._row_storage,
+                profile=profile,
+                trace_memory=trace_memory,
+                resources=resources,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._pool.shutdown(wait=True)
+            if self._duckdb_connection is not None:
+                self._duckdb_connection.close()
+                self._duckdb_connection = None
+            if self._sqlite_connection is not None:
+                self._sqlite_connection.close()
+                self._sqlite_connection = None
+
+    def __enter__(self) -> Runner:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -9,6 +9,8 @@ def validate_steps(steps: Mapping[str, Step]) -> None:
     for step in steps.values():
         if step.mode not in {"task", "row", "sql"}:
             raise ValueError(f"Step {step.name} tem mode invalido: {step.mode}")
+        if not isinstance(step.queue_size, int) or step.queue_size < 1:
+            raise ValueError(f"Step {step.name} tem queue_size invalido: {step.queue_size}")
         for dep in step.deps:
             if dep not in steps:
                 raise ValueError(f"Dependencia desconhecida: {step.name} -> {dep}")
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+import sqlite3
+import threading
+import time
+
+import duckdb
 from fastapi.testclient import TestClient
 
+from ninout.core.api import events as events_module
+from ninout.core.api import repository
 from ninout.core.api.main import app
+from ninout.core.engine import dag as dag_module
 from ninout.core.engine.dag import Dag
+from ninout.core.ui.sinks import Sink
 
 
-def _create_sample_run(logs_dir: str) -> str:
+def _create_sample_run(logs_dir: str, dag_name: str = "api_test_run") -> str:
     dag = Dag()
 
     @dag.step()
@@ -17,7 +29,7 @@ def _create_sample_run(logs_dir: str) -> str:
     def enrich(row):
         return {"id": row["id"], "value": row["id"] * 10}
 
-    dag.run(dag_name="api_test_run", logs_dir=logs_dir)
+    dag.run(dag_name=dag_name, logs_dir=logs_dir)
     assert dag._last_run_dir is not None
     return dag._last_run_dir
 
@@ -42,6 +54,12 @@ def test_api_lists_runs_and_returns_details_and_rows(tmp_path, monkeypatch) -> N
     step_names = {step["step_name"] for step in detail["steps"]}
     assert "extract" in step_names
     assert "enrich" in step_names
+    enrich_summary = next(step for step in detail["steps"] if step["step_name"] == "enrich")
+    assert enrich_summary["cpu_ms"] >= 0
+    assert enrich_summary["result_bytes"] > 0
+    assert enrich_summary["peak_alloc_bytes"] is None
+    assert enrich_summary["row_telemetry"]["rows"] == 2
+    assert enrich_summary["row_telemetry"]["queue_size"] == 1024
 
     rows_response = client.get(f"/api/runs/{run_name}/steps/enrich/rows?limit=10&offset=0")
     assert rows_response.status_code == 200
@@ -49,6 +67,25 @@ def test_api_lists_runs_and_returns_details_and_rows(tmp_path, monkeypatch) -> N
     assert payload["total_rows"] == 2
     assert len(payload["rows"]) == 2
 
+    first_page = client.get(f"/api/runs/{run_name}/steps/enrich/rows?limit=1").json()
+    assert first_page["next_after_row_id"] == 1
+    next_page = client.get(
+        f"/api/runs/{run_name}/steps/enrich/rows?limit=1&after_row_id=1&columns=value"
+    ).json()
+    assert next_page["rows"] == [{"row_id": 2, "payload": {"value": 20}}]
+    filtered = client.get(
+        f"/api/runs/{run_name}/steps/enrich/rows?filter=value:gt:10&sort=-id"
+    ).json()
+    assert filtered["total_rows"] == 1
+    assert filtered["rows"][0]["payload"] == {"id": 2, "value": 20}
+    bad_filter = client.get(f"/api/runs/{run_name}/steps/enrich/rows?filter=value:like:1")
+    assert bad_filter.status_code == 400
+
+    stats_response = client.get(f"/api/runs/{run_name}/steps/enrich/stats")
+    assert stats_response.status_code == 200
+    assert stats_response.json()["stored_rows"] == 2
+    assert stats_response.json()["columns"] == []
+
     graph_response = client.get(f"/api/runs/{run_name}/graph")
     assert graph_response.status_code == 200
     graph = graph_response.json()
@@ -68,3 +105,547 @@ def test_dashboard_route_serves_html(tmp_path, monkeypatch) -> None:
     response = client.get("/dashboard")
     assert response.status_code == 200
     assert "ninout dashboard" in response.text
+
+
+def test_api_run_catalog_filters_and_paginates(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    _create_sample_run(logs_dir, dag_name="api_other_run")
+    backfilled = Dag()
+
+    @backfilled.step()
+    def only():
+        return [{"id": 1}]
+
+    backfilled.run(dag_name="duckdb_only", logs_dir=logs_dir, sinks=["duckdb"])
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+
+    with sqlite3.connect(os.path.join(logs_dir, "runs.sqlite")) as con:
+        catalog = dict(con.execute("SELECT dag_name, status FROM run_catalog").fetchall())
+    assert catalog == {"api_test_run": "done", "api_other_run": "done"}
+
+    client = TestClient(app)
+
+    response = client.get("/api/runs?limit=2")
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "3"
+    assert len(response.json()) == 2
+
+    second_page = client.get("/api/runs?limit=2&offset=2").json()
+    assert len(second_page) == 1
+
+    filtered = client.get("/api/runs?dag_name=duckdb_only").json()
+    assert len(filtered) == 1
+    assert filtered[0]["status_summary"] == {"done": 1}
+    assert filtered[0]["status"] == "done"
+
+    done = client.get("/api/runs?status=done")
+    assert done.headers["X-Total-Count"] == "3"
+    assert sum(1 for run in done.json() if run["finished_at_utc"]) == 2
+
+    assert client.get("/api/runs?created_after=2999-01-01").json() == []
+    assert client.get("/api/runs?created_after=not-a-date").status_code == 400
+
+
+def test_api_caches_finished_run_metadata_with_etags(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    repository.clear_run_cache()
+    opened: list[str] = []
+    original_connect = repository._connect
+
+    def counting_connect(db_path: str):
+        opened.append(db_path)
+        return original_connect(db_path)
+
+    monkeypatch.setattr(repository, "_connect", counting_connect)
+    client = TestClient(app)
+    run_name = client.get("/api/runs").json()[0]["run_name"]
+
+    detail = client.get(f"/api/runs/{run_name}")
+    assert detail.status_code == 200
+    etag = detail.headers["ETag"]
+    assert {step["output_text"] for step in detail.json()["steps"]} == {""}
+
+    sparse = client.get(f"/api/runs/{run_name}?fields=status,deps")
+    assert sparse.status_code == 200
+    assert set(sparse.json()["steps"][0]) == {"step_name", "status", "deps"}
+    assert client.get(f"/api/runs/{run_name}?fields=nope").status_code == 400
+
+    not_modified = client.get(f"/api/runs/{run_name}/graph", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    for _ in range(3):
+        client.get(f"/api/runs/{run_name}/graph")
+        client.get(f"/api/runs/{run_name}/steps/enrich/rows?limit=10&offset=0")
+    assert len(opened) == 2
+    repository.clear_run_cache()
+
+
+def test_api_streams_step_events_for_run(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    client = TestClient(app)
+    run_name = client.get("/api/runs").json()[0]["run_name"]
+
+    with client.stream("GET", f"/api/runs/{run_name}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.read().decode()
+
+    events = [block for block in body.split("\n\n") if block]
+    assert events[0].startswith("event: steps")
+    assert '"step_name":"enrich"' in events[0]
+    assert events[-1].startswith("event: end")
+    assert client.get("/api/runs/missing_run/events").status_code == 404
+
+
+def test_run_event_hub_ends_feed_after_repeated_poll_failures(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def failing_etag(run_name: str) -> str:
+        calls.append(run_name)
+        time.sleep(0.02)
+        raise RuntimeError("catalog unavailable")
+
+    monkeypatch.setattr(events_module, "get_run_etag", failing_etag)
+    hub = events_module.RunEventHub(poll_interval_s=0.0, keepalive_s=0.01, max_poll_failures=3)
+
+    async def collect() -> list[str]:
+        return [event async for event in hub.stream("broken_run")]
+
+    received = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+    assert len(calls) == 3
+    assert ": keepalive\n\n" in received
+    assert received[-1].startswith("event: end")
+    assert '"error":"RuntimeError: catalog unavailable"' in received[-1]
+    assert "broken_run" not in hub._feeds
+
+
+def test_api_returns_step_changes_since_cursor(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    client = TestClient(app)
+    run_name = client.get("/api/runs").json()[0]["run_name"]
+
+    changes = client.get(f"/api/runs/{run_name}/changes").json()
+    assert {step["step_name"] for step in changes["steps"]} == {"extract", "enrich"}
+    assert changes["finished"] is True
+    assert changes["server_time_utc"]
+
+    latest = changes["next_since"]
+    assert latest == max(step["updated_at_utc"] for step in changes["steps"])
+    unchanged = client.get(f"/api/runs/{run_name}/changes", params={"since": latest}).json()
+    assert unchanged["steps"] == []
+    assert unchanged["next_since"] == latest
+    assert client.get(f"/api/runs/{run_name}/changes?since=yesterday").status_code == 400
+
+
+def test_api_serves_cached_run_layout(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    run_dir = _create_sample_run(logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    repository.clear_run_cache()
+
+    con = duckdb.connect(os.path.join(run_dir, "run.duckdb"), read_only=True)
+    try:
+        stored = con.execute("SELECT fingerprint FROM dag_layout").fetchall()
+    finally:
+        con.close()
+
+    client = TestClient(app)
+    run_name = os.path.basename(run_dir)
+    response = client.get(f"/api/runs/{run_name}/layout")
+    assert response.status_code == 200
+    layout = response.json()
+    assert stored == [(layout["fingerprint"],)]
+    assert {node["step_name"]: node["level"] for node in layout["nodes"]} == {
+        "extract": 0,
+        "enrich": 1,
+    }
+    assert layout["edges"][0]["source"] == "extract"
+    assert len(layout["edges"][0]["points"]) == 2
+
+    cached = client.get(
+        f"/api/runs/{run_name}/layout", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+    repository.clear_run_cache()
+
+
+def test_api_reads_live_run_without_opening_writer_database(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    started = threading.Event()
+    release = threading.Event()
+    dags: dict[str, Dag] = {}
+
+    def _start_run(dag_name: str, row_storage: str, sinks=None) -> threading.Thread:
+        dag = Dag()
+
+        @dag.step()
+        def extract():
+            return [{"id": 1}, {"id": 2}]
+
+        @dag.step(depends_on=[extract])
+        def hold(extract):
+            started.set()
+            release.wait(10)
+            return [{"held": len(extract)}]
+
+        dags[dag_name] = dag
+        thread = threading.Thread(
+            target=dag.run,
+            kwargs={
+                "dag_name": dag_name,
+                "logs_dir": logs_dir,
+                "row_storage": row_storage,
+                "sinks": sinks,
+            },
+        )
+        thread.start()
+        assert started.wait(10)
+        started.clear()
+        return thread
+
+    threads = [
+        _start_run("live_duckdb", "duckdb", sinks=["duckdb", Sink("sqlite", detail="preview")]),
+        _start_run("live_parquet", "parquet"),
+    ]
+    client = TestClient(app)
+    try:
+        runs = {run["dag_name"]: run for run in client.get("/api/runs").json()}
+        assert runs["live_duckdb"]["status"] == "running"
+        run_name = runs["live_duckdb"]["run_name"]
+        parquet_run = runs["live_parquet"]["run_name"]
+
+        detail = client.get(f"/api/runs/{run_name}").json()
+        statuses = {step["step_name"]: step["status"] for step in detail["steps"]}
+        assert statuses == {"extract": "done", "hold": "running"}
+        changes = client.get(f"/api/runs/{run_name}/changes").json()
+        assert changes["finished"] is False
+        assert {step["step_name"] for step in changes["steps"]} == {"extract", "hold"}
+        quiet = client.get(f"/api/runs/{run_name}/changes?since={changes['next_since']}").json()
+        assert quiet["steps"] == []
+
+        first_page = client.get(f"/api/runs/{run_name}/steps/extract/rows?limit=1").json()
+        assert first_page["total_rows"] == 2
+        assert first_page["rows"] == [{"row_id": 1, "payload": {"id": 1}}]
+        next_page = client.get(
+            f"/api/runs/{run_name}/steps/extract/rows"
+            f"?limit=1&after_row_id={first_page['next_after_row_id']}&columns=id"
+        ).json()
+        assert next_page["rows"] == [{"row_id": 2, "payload": {"id": 2}}]
+        newest = client.get(f"/api/runs/{run_name}/steps/extract/rows?sort=-id").json()
+        assert [row["row_id"] for row in newest["rows"]] == [2, 1]
+        assert client.get(f"/api/runs/{run_name}/steps/hold/rows").json()["total_rows"] == 0
+        live_rows = client.get(f"/api/runs/{run_name}/steps/extract/rows?filter=id:gt:1").json()
+        assert live_rows["rows"] == [{"row_id": 2, "payload": {"id": 2}}]
+        stats = client.get(f"/api/runs/{run_name}/steps/extract/stats").json()
+        assert (stats["row_count"], stats["stored_rows"]) == (2, 2)
+        assert client.get(f"/api/runs/{parquet_run}/steps/extract/rows").status_code == 409
+        stats = client.get(f"/api/runs/{parquet_run}/steps/extract/stats").json()
+        assert (stats["row_count"], stats["stored_rows"]) == (2, 0)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+    detail = client.get(f"/api/runs/{run_name}").json()
+    assert {step["status"] for step in detail["steps"]} == {"done"}
+    assert client.get(f"/api/runs/{run_name}/changes").json()["finished"] is True
+    assert client.get(f"/api/runs/{run_name}/steps/extract/rows").json()["total_rows"] == 2
+
+
+def test_api_flags_truncated_live_preview_and_reads_stale_runs_from_duckdb(
+    tmp_path, monkeypatch
+) -> None:
+    logs_dir = str(tmp_path / "logs")
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    started = threading.Event()
+    release = threading.Event()
+    dag = Dag()
+
+    @dag.step()
+    def big():
+        return [{"id": idx} for idx in range(2500)]
+
+    @dag.step(depends_on=[big])
+    def hold(big):
+        started.set()
+        release.wait(10)
+        return {"rows": len(big)}
+
+    thread = threading.Thread(
+        target=dag.run,
+        kwargs={
+            "dag_name": "live_big",
+            "logs_dir": logs_dir,
+            "sinks": ["duckdb", Sink("sqlite", detail="preview")],
+        },
+    )
+    thread.start()
+    client = TestClient(app)
+    try:
+        assert started.wait(10)
+        run_name = client.get("/api/runs").json()[0]["run_name"]
+        page = client.get(f"/api/runs/{run_name}/steps/big/rows?limit=200").json()
+        assert (page["total_rows"], page["truncated"]) == (2500, True)
+        assert len(page["rows"]) == 200
+        tail = client.get(f"/api/runs/{run_name}/steps/big/rows?limit=200&after_row_id=900").json()
+        assert [row["row_id"] for row in tail["rows"]] == list(range(901, 1001))
+        past = client.get(f"/api/runs/{run_name}/steps/big/rows?limit=200&after_row_id=2000")
+        assert past.status_code == 409
+        assert client.get(f"/api/runs/{run_name}/steps/big/rows?offset=1000").status_code == 409
+    finally:
+        release.set()
+        thread.join(10)
+
+    finished = client.get(f"/api/runs/{run_name}/steps/big/rows?after_row_id=2000").json()
+    assert (finished["total_rows"], finished["truncated"]) == (2500, False)
+    assert finished["rows"][0]["row_id"] == 2001
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with sqlite3.connect(os.path.join(logs_dir, "runs.sqlite")) as con:
+        con.execute(
+            "UPDATE run_catalog SET finished_at_utc = NULL, status = 'running', updated_at_utc = ?",
+            [(now - timedelta(minutes=5)).isoformat(sep=" ")],
+        )
+    repository.clear_run_cache()
+    assert repository._load_run(run_name).live is False
+    with sqlite3.connect(os.path.join(logs_dir, "runs.sqlite")) as con:
+        con.execute("UPDATE run_catalog SET updated_at_utc = ?", [now.isoformat(sep=" ")])
+    assert repository._load_run(run_name).live is True
+
+
+def test_api_exports_run_timeline_as_chrome_trace(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir, dag_name="api_trace_run")
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    client = TestClient(app)
+    run_name = client.get("/api/runs").json()[0]["run_name"]
+
+    steps = {step["step_name"]: step for step in client.get(f"/api/runs/{run_name}").json()["steps"]}
+    assert steps["enrich"]["worker"].startswith("ninout-worker")
+    assert steps["extract"]["finished_at_utc"] <= steps["enrich"]["started_at_utc"]
+    assert steps["enrich"]["queue_wait_ms"] >= 0
+
+    trace = client.get(f"/api/runs/{run_name}/trace").json()
+    spans = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+    assert set(spans) == {"extract", "enrich"}
+    assert spans["extract"]["ts"] + spans["extract"]["dur"] <= spans["enrich"]["ts"]
+    assert spans["enrich"]["args"]["status"] == "done"
+    lanes = {
+        event["args"]["name"]
+        for event in trace["traceEvents"]
+        if event["ph"] == "M" and event["name"] == "thread_name"
+    }
+    assert "queue" in lanes and steps["enrich"]["worker"] in lanes
+
+
+def test_api_serves_step_profiles(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    dag = Dag()
+
+    def _score(value: int) -> int:
+        return sum(range(value))
+
+    @dag.step()
+    def extract():
+        return [{"id": idx} for idx in range(20)]
+
+    @dag.step(depends_on=[extract], mode="row", profile=True)
+    def enrich(row):
+        return {"id": row["id"], "score": _score(row["id"])}
+
+    dag.run(dag_name="api_profile_run", logs_dir=logs_dir)
+    run_name = os.path.basename(str(dag._last_run_dir))
+    client = TestClient(app)
+
+    profile = client.get(f"/api/runs/{run_name}/steps/enrich/profile").json()
+    assert profile["mode"] == "trace"
+    calls = {
+        item["name"].split(" ")[0].split(".")[-1]: item["calls"] for item in profile["functions"]
+    }
+    assert calls["enrich"] == 20
+    assert calls["_score"] == 20
+    assert any(";" in item["stack"] for item in profile["stacks"])
+
+    collapsed = client.get(f"/api/runs/{run_name}/steps/enrich/profile?format=collapsed")
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.text.splitlines())
+    assert client.get(f"/api/runs/{run_name}/steps/extract/profile").status_code == 404
+
+
+def test_api_exposes_prometheus_metrics_from_catalog(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir, dag_name="api_metrics_run")
+    failing = Dag()
+
+    @failing.step()
+    def broken():
+        raise ValueError("boom")
+
+    failing.run(dag_name="api_metrics_failed", logs_dir=logs_dir, raise_on_fail=False)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    client = TestClient(app)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in response.text.splitlines()
+        if line and not line.startswith("#")
+    }
+    assert samples['ninout_runs_started_total{dag="api_metrics_run"}'] == 1
+    assert samples['ninout_runs_finished_total{dag="api_metrics_run"}'] == 1
+    assert samples['ninout_runs_failed_total{dag="api_metrics_failed"}'] == 1
+    assert samples['ninout_runs_active{dag="api_metrics_run"}'] == 0
+    enrich = 'dag="api_metrics_run",step="enrich"'
+    assert samples[f'ninout_step_rows_total{{{enrich},direction="in"}}'] == 2
+    assert samples[f'ninout_step_rows_total{{{enrich},direction="out"}}'] == 2
+    assert samples[f'ninout_step_duration_seconds_count{{{enrich}}}'] == 1
+    assert samples[f'ninout_step_duration_seconds_bucket{{{enrich},le="+Inf"}}'] == 1
+    assert samples[f'ninout_step_duration_seconds_bucket{{{enrich},le="900"}}'] == 1
+    assert "# TYPE ninout_step_duration_seconds histogram" in response.text
+
+
+def test_api_compares_runs_and_reports_dag_trend(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    clock = {"now": datetime(2026, 1, 1)}
+
+    class _Clock:
+        @staticmethod
+        def now() -> datetime:
+            clock["now"] += timedelta(seconds=1)
+            return clock["now"]
+
+    monkeypatch.setattr(dag_module, "datetime", _Clock)
+    delays = [0.01, 0.01, 0.01, 0.15]
+    for delay in delays:
+        dag = Dag()
+
+        @dag.step()
+        def extract():
+            return [{"id": idx} for idx in range(3)]
+
+        @dag.step(depends_on=[extract])
+        def slow(results):
+            time.sleep(delay)
+            return results["extract"]
+
+        dag.run(dag_name="api_trend_run", logs_dir=logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    client = TestClient(app)
+    runs = [run["run_name"] for run in client.get("/api/runs").json()]
+    assert len(runs) == len(delays)
+
+    comparison = client.get(f"/api/compare?base={runs[-1]}&head={runs[0]}").json()
+    steps = {step["step_name"]: step for step in comparison["steps"]}
+    assert comparison["regressions"] == ["slow"]
+    assert steps["slow"]["duration_change"] > 1
+    assert steps["slow"]["output_lines_delta"] == 0
+    assert steps["extract"]["regressed"] is False
+    assert client.get(f"/api/compare?base={runs[-1]}&head=missing").status_code == 404
+
+    trend = client.get("/api/dags/api_trend_run/trend?runs=10").json()
+    assert trend["runs"] == runs
+    assert trend["regressions"] == ["slow"]
+    slow = {step["step_name"]: step for step in trend["steps"]}["slow"]
+    assert slow["runs"] == len(delays)
+    assert slow["duration_p50_ms"] <= slow["duration_p95_ms"] <= slow["duration_max_ms"]
+    assert slow["latest_duration_ms"] >= 150
+    assert slow["baseline_duration_ms"] < slow["latest_duration_ms"]
+
+    recent = client.get("/api/dags/api_trend_run/trend?runs=1").json()
+    assert recent["runs"] == runs[:1]
+    assert recent["regressions"] == []
+    assert client.get("/api/dags/unknown/trend").status_code == 404
+
+
+def test_api_catalog_serves_last_committed_catalog_when_locked(
+    tmp_path, monkeypatch, caplog
+) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    unsynced = Dag()
+
+    @unsynced.step()
+    def only():
+        return [{"id": 1}]
+
+    unsynced.run(dag_name="duckdb_only", logs_dir=logs_dir, sinks=["duckdb"])
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    monkeypatch.setattr(repository, "_CATALOG_BUSY_TIMEOUT_S", 0.01)
+    monkeypatch.setattr(repository, "_CATALOG_RETRY_DELAY_S", 0.0)
+
+    writer = sqlite3.connect(os.path.join(logs_dir, "runs.sqlite"))
+    writer.execute("BEGIN EXCLUSIVE")
+    try:
+        with caplog.at_level("WARNING", logger=repository.__name__):
+            runs = repository.list_runs()
+    finally:
+        writer.rollback()
+        writer.close()
+    assert [run.dag_name for run in runs] == ["api_test_run"]
+    assert "serving the last committed catalog" in caplog.text
+
+    assert {run.dag_name for run in repository.list_runs()} == {"api_test_run", "duckdb_only"}
+
+
+def test_api_catalog_writes_only_when_new_runs_appear(tmp_path, monkeypatch) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+    writes: list[str] = []
+    connect_runs_db = repository.connect_runs_db
+
+    def _counting_connect(path, **kwargs):
+        writes.append(path)
+        return connect_runs_db(path, **kwargs)
+
+    monkeypatch.setattr(repository, "connect_runs_db", _counting_connect)
+    client = TestClient(app)
+
+    for _ in range(3):
+        response = client.get("/api/runs")
+        assert response.headers["X-Total-Count"] == "1"
+    assert client.get("/metrics").status_code == 200
+    assert len(writes) == 1
+
+    unsynced = Dag()
+
+    @unsynced.step()
+    def only():
+        return [{"id": 1}]
+
+    unsynced.run(dag_name="duckdb_only", logs_dir=logs_dir, sinks=["duckdb"])
+    runs, total = repository.list_runs_page(limit=1)
+    assert (len(runs), total) == (1, 2)
+    assert len(writes) == 2
+    assert repository.list_runs_page()[1] == 2
+    assert len(writes) == 2
+
+
+def test_api_catalog_rescans_in_memory_when_catalog_is_unreadable(
+    tmp_path, monkeypatch, caplog
+) -> None:
+    logs_dir = str(tmp_path / "logs")
+    _create_sample_run(logs_dir)
+    catalog_path = os.path.join(logs_dir, "runs.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(catalog_path + suffix):
+            os.remove(catalog_path + suffix)
+    with open(catalog_path, "wb") as handle:
+        handle.write(b"not a sqlite database" * 64)
+    monkeypatch.setenv("NINOUT_LOGS_DIR", logs_dir)
+
+    with caplog.at_level("WARNING", logger=repository.__name__):
+        runs = repository.list_runs()
+    assert [run.dag_name for run in runs] == ["api_test_run"]
+    assert "rescanning" in caplog.text
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import ninout.core.api.events as events_module
+from ninout.core.api.events import RunEventHub
+from ninout.core.api.schemas import StepChange
+
+
+def _change(step_name: str, status: str, updated_at: str) -> StepChange:
+    return StepChange(
+        step_name=step_name,
+        status=status,
+        duration_ms=None,
+        input_lines=None,
+        output_lines=None,
+        throughput_in_lps=None,
+        throughput_out_lps=None,
+        updated_at_utc=updated_at,
+    )
+
+
+def _parse(event: str) -> tuple[str, object]:
+    fields = dict(line.split(": ", 1) for line in event.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_run_event_hub_shares_one_poller_between_subscribers(monkeypatch) -> None:
+    timeline = [
+        ("v1", [_change("a", "running", "2026-01-01 00:00:01")], False),
+        ("v1", [], False),
+        ("v2", [_change("a", "done", "2026-01-01 00:00:02")], True),
+    ]
+    state: dict[str, object] = {"tick": 0, "change_reads": 0, "current": timeline[0]}
+
+    def fake_etag(run_name: str) -> str:
+        tick = int(state["tick"])
+        state["current"] = timeline[min(tick, len(timeline) - 1)]
+        state["tick"] = tick + 1
+        return state["current"][0]
+
+    def fake_changes(run_name: str, since: str | None) -> list[StepChange]:
+        state["change_reads"] = int(state["change_reads"]) + 1
+        return state["current"][1]
+
+    def fake_finished(run_name: str) -> bool:
+        return state["current"][2]
+
+    monkeypatch.setattr(events_module, "get_run_etag", fake_etag)
+    monkeypatch.setattr(events_module, "get_step_changes", fake_changes)
+    monkeypatch.setattr(events_module, "is_run_finished", fake_finished)
+
+    async def collect() -> list[list[str]]:
+        hub = RunEventHub(poll_interval_s=0.01)
+
+        async def subscriber() -> list[str]:
+            return [event async for event in hub.stream("run_x")]
+
+        return await asyncio.gather(subscriber(), subscriber())
+
+    first, second = asyncio.run(collect())
+
+    assert first == second
+    assert [_parse(event)[0] for event in first] == ["steps", "steps", "end"]
+    assert _parse(first[1])[1][0]["status"] == "done"
+    assert state["change_reads"] == 2
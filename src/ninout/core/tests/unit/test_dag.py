@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+import sqlite3
+
+import duckdb
 import pytest
 
-from ninout import Dag
+from ninout import Dag, Runner
+from ninout.core.engine import RunResources
+import ninout.core.engine.dag as dag_module
 
 
 def test_step_registration_and_when_dependency_auto_added() -> None:
@@ -199,3 +207,133 @@ def test_step_mode_is_registered() -> None:
         return rows
 
     assert dag._steps["row_step"].mode == "row"
+
+
+def test_runs_in_same_second_get_unique_run_dirs(tmp_path, monkeypatch) -> None:
+    class _Clock:
+        @staticmethod
+        def now() -> datetime:
+            return datetime(2026, 1, 2, 3, 4, 5)
+
+    monkeypatch.setattr(dag_module, "datetime", _Clock)
+    dag = Dag()
+
+    @dag.step()
+    def only():
+        return {"value": "ok"}
+
+    run_dirs = []
+    for _ in range(3):
+        dag.run(logs_dir=str(tmp_path), sinks=["duckdb"])
+        run_dirs.append(os.path.basename(str(dag.last_run_dir)))
+    assert run_dirs == ["dag_20260102_030405", "dag_20260102_030405_2", "dag_20260102_030405_3"]
+
+
+def test_runner_reuses_plan_pool_and_connections(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return [{"id": 1}, {"id": 2}]
+
+    @dag.step(depends_on=[a])
+    def b(results):
+        return {"count": len(results["a"])}
+
+    with Runner(dag, logs_dir=str(tmp_path), dag_name="fast") as runner:
+        run_dirs = set()
+        for idx in range(4):
+            results, status = runner.run()
+            assert results["b"]["count"] == 2
+            assert status == {"a": "done", "b": "done"}
+            stats = runner.last_run_stats
+            assert stats is not None
+            if idx:
+                assert stats.plan_ms == 0.0
+            run_dirs.add(runner.last_run_dir)
+            db_path = os.path.join(str(runner.last_run_dir), "run.duckdb")
+            with duckdb.connect(db_path, read_only=True) as con:
+                rows = con.execute(
+                    "SELECT step_name, status FROM step_runtime ORDER BY step_name"
+                ).fetchall()
+                assert rows == [("a", "done"), ("b", "done")]
+                assert con.execute("SELECT count(*) FROM step_a").fetchone() == (2,)
+        _results, status = runner.run(disabled_steps=[b], raise_on_fail=False)
+        assert status["b"] == "skipped"
+        assert runner.last_run_stats is not None
+        assert runner.last_run_stats.plan_ms > 0.0
+
+    assert len(run_dirs) == 4
+    with sqlite3.connect(tmp_path / "runs.sqlite") as con:
+        assert con.execute("SELECT count(DISTINCT run_name) FROM run_catalog").fetchone() == (5,)
+    with pytest.raises(RuntimeError):
+        runner.run()
+
+
+def test_dag_execute_uses_caller_plan_and_pool(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return [{"id": 1}]
+
+    revision = dag.revision
+
+    @dag.step(depends_on=[a])
+    def b(results):
+        return {"count": len(results["a"])}
+
+    assert dag.revision == revision + 1
+    disabled_edges, disabled_steps = dag.resolve_disabled(None, [b])
+    assert (disabled_edges, disabled_steps) == (set(), {"b"})
+    plan = dag.compile_plan(disabled_edges, disabled_steps)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        _results, status = dag.execute(
+            raise_on_fail=False,
+            disabled_steps=[b],
+            logs_dir=str(tmp_path),
+            sinks=["duckdb"],
+            resources=RunResources(pool=pool, plan=plan, plan_ms=1.5),
+        )
+    assert status == {"a": "done", "b": "skipped"}
+    assert dag.last_run_stats is not None
+    assert dag.last_run_stats.plan_ms == 1.5
+
+
+def test_run_closes_every_sink_when_log_run_stats_fails(tmp_path) -> None:
+    closed: list[str] = []
+
+    class BrokenStatsSink:
+        def log_step(self, step_name, meta) -> None:
+            return None
+
+        def log_run_stats(self, stats) -> None:
+            raise RuntimeError("stats sink down")
+
+        def close(self) -> None:
+            closed.append("broken")
+
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return [{"id": 1}]
+
+    with Runner(dag, logs_dir=str(tmp_path), sinks=["duckdb", BrokenStatsSink()]) as runner:
+        with pytest.raises(RuntimeError, match="stats sink down"):
+            runner.run()
+        first_dir = str(runner.last_run_dir)
+        assert closed == ["broken"]
+        stats = runner.last_run_stats
+        assert stats is not None
+        assert all(item.close_ms is not None for item in stats.sinks)
+        with duckdb.connect(os.path.join(first_dir, "run.duckdb"), read_only=True) as con:
+            metrics = {
+                (scope, metric)
+                for scope, metric in con.execute("SELECT scope, metric FROM run_stats").fetchall()
+            }
+        assert ("run", "wall_ms") in metrics
+        assert not any(metric == "close_ms" for _scope, metric in metrics)
+        with pytest.raises(RuntimeError, match="stats sink down"):
+            runner.run()
+        assert closed == ["broken", "broken"]
@@ -306,6 +306,41 @@ def test_executor_row_mode_emits_running_progress_updates() -> None:
     assert any(name == "row_transform" and st == "running" for name, st, _ in updates)
 
 
+def test_executor_row_mode_running_updates_carry_only_new_rows() -> None:
+    streamed: list[dict[str, object]] = []
+    final: list[object] = []
+
+    def on_update(name: str, status: str, result, _output, _dur, _in_lines, out_lines):
+        if name != "row_transform":
+            return
+        if status == "running":
+            assert len(streamed) + len(result) == out_lines
+            streamed.extend(result)
+        elif status == "done":
+            final.append(result)
+
+    def slow_row(row):
+        time.sleep(0.08)
+        return {"id": row["id"]}
+
+    steps = {
+        "extract": Step(
+            name="extract",
+            func=lambda: [{"id": idx} for idx in range(1, 9)],
+            deps=[],
+        ),
+        "row_transform": Step(
+            name="row_transform",
+            func=slow_row,
+            deps=["extract"],
+            mode="row",
+        ),
+    }
+    run(steps, on_step_update=on_update)
+    assert streamed
+    assert final[0][: len(streamed)] == streamed
+
+
 def test_executor_sql_mode_requires_duckdb() -> None:
     steps = {
         "sql_step": Step(
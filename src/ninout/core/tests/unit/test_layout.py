@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from ninout.core.ui.layout import layout_positions
+import pytest
+
+import ninout.core.ui.layout as layout_module
+from ninout.core.ui.layout import (
+    cached_layout_json,
+    compute_layout,
+    dag_fingerprint,
+    layout_from_json,
+    layout_positions,
+    layout_to_json,
+)
 from ninout.core.engine.models import Step
 
 
@@ -14,3 +24,46 @@ def test_layout_positions() -> None:
     assert set(positions.keys()) == {"a", "b", "c"}
     assert width > 0
     assert height > 0
+
+
+def test_compute_layout_removes_crossings_and_routes_long_edges() -> None:
+    deps = {
+        "a": [],
+        "b": [],
+        "x": ["b"],
+        "y": ["a"],
+        "z": ["a", "x"],
+    }
+    layout = compute_layout(deps)
+    assert layout.levels == {"a": 0, "b": 0, "x": 1, "y": 1, "z": 2}
+    assert layout.positions["y"][1] < layout.positions["x"][1]
+    routed = {(source, target): points for source, target, points in layout.edges}
+    assert len(routed[("a", "z")]) == 4
+    assert len(routed[("x", "z")]) == 2
+    assert layout_from_json(layout_to_json(layout)) == layout
+    assert dag_fingerprint(deps) == dag_fingerprint(dict(reversed(list(deps.items()))))
+
+
+def test_compute_layout_rejects_cycles() -> None:
+    with pytest.raises(ValueError):
+        compute_layout({"a": ["b"], "b": ["a"]})
+
+
+def test_cached_layout_json_computes_each_dag_structure_once(monkeypatch) -> None:
+    calls: list[int] = []
+    original = layout_module.compute_layout
+
+    def counting(deps, sweeps=6):
+        calls.append(len(deps))
+        return original(deps, sweeps)
+
+    monkeypatch.setattr(layout_module, "compute_layout", counting)
+    monkeypatch.setattr(layout_module, "_layout_json_cache", layout_module.OrderedDict())
+    deps = {"a": [], "b": ["a"], "c": ["a", "b"]}
+    fingerprint, payload = cached_layout_json(deps)
+    assert cached_layout_json({"c": ["b", "a"], "b": ["a"], "a": []}) == (fingerprint, payload)
+    assert fingerprint == dag_fingerprint(deps)
+    assert layout_from_json(payload) == original(deps)
+    assert calls == [3]
+    cached_layout_json({"a": [], "b": []})
+    assert calls == [3, 2]
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+
+import duckdb
+import pytest
+
+from ninout import Dag
+from ninout.core.engine.executor import run
+from ninout.core.engine.metrics import RowPipelineTelemetry, estimate_size_bytes
+from ninout.core.engine.models import Step
+
+
+def test_estimate_size_bytes_samples_large_lists() -> None:
+    rows = [{"id": idx, "label": "x" * 32} for idx in range(10_000)]
+    estimate = estimate_size_bytes(rows)
+    row_size = estimate_size_bytes(rows[0])
+    assert estimate_size_bytes(None) == 0
+    assert sys.getsizeof(rows) + row_size * len(rows) * 0.9 <= estimate
+    assert estimate <= sys.getsizeof(rows) + row_size * len(rows) * 1.1
+
+
+def test_executor_reports_cpu_time_result_size_and_peak_alloc() -> None:
+    metrics: dict[str, dict[str, object]] = {}
+
+    def burn() -> list[dict[str, int]]:
+        deadline = time.thread_time() + 0.05
+        while time.thread_time() < deadline:
+            pass
+        return [{"value": 1}]
+
+    def sleep() -> list[dict[str, int]]:
+        time.sleep(0.1)
+        return [{"value": 2}]
+
+    def allocate(results) -> list[dict[str, int]]:
+        buffer = [bytearray(1024) for _ in range(2048)]
+        return [{"value": len(buffer)}]
+
+    steps = {
+        "burn": Step(name="burn", func=burn),
+        "sleep": Step(name="sleep", func=sleep),
+        "allocate": Step(name="allocate", func=allocate, deps=["burn"]),
+        "double": Step(
+            name="double",
+            func=lambda row: {"value": row["value"] * 2},
+            deps=["allocate"],
+            mode="row",
+        ),
+    }
+    run(
+        steps,
+        max_workers=2,
+        on_step_metrics=lambda name, values: metrics.__setitem__(name, dict(values)),
+        trace_memory=True,
+    )
+
+    assert not tracemalloc.is_tracing()
+    assert metrics["burn"]["cpu_ms"] >= 40
+    assert metrics["sleep"]["cpu_ms"] < 50
+    assert metrics["allocate"]["peak_alloc_bytes"] >= 2048 * 1024
+    assert metrics["double"]["cpu_ms"] >= 0
+    assert all(values["result_bytes"] > 0 for values in metrics.values())
+    assert "profile" not in metrics["burn"]
+
+
+def test_executor_records_timeline_and_queue_wait_per_worker() -> None:
+    metrics: dict[str, dict[str, object]] = {}
+    updates: list[tuple[str, str, int]] = []
+
+    def slow() -> list[dict[str, int]]:
+        time.sleep(0.05)
+        return [{"value": 1}]
+
+    steps = {name: Step(name=name, func=slow) for name in ("a", "b", "c")}
+    run(
+        steps,
+        max_workers=1,
+        on_step_update=lambda name, status, *_: updates.append(
+            (name, status, threading.get_ident())
+        ),
+        on_step_metrics=lambda name, values: metrics.setdefault(name, {}).update(values),
+    )
+
+    assert [status for name, status, _thread in updates if name == "a"] == ["running", "done"]
+    assert {thread for _name, _status, thread in updates} == {threading.get_ident()}
+    assert {values["worker"] for values in metrics.values()} == {"ninout-worker_0"}
+    for values in metrics.values():
+        assert values["ready_at_utc"] <= values["started_at_utc"] <= values["finished_at_utc"]
+    waits = sorted(values["queue_wait_ms"] for values in metrics.values())
+    assert waits[0] < 40
+    assert waits[2] >= 90
+
+
+def test_row_pipeline_latency_percentiles_come_from_log_buckets() -> None:
+    telemetry = RowPipelineTelemetry(queue_size=8)
+    for _ in range(90):
+        telemetry.record_row(0.001)
+    for _ in range(10):
+        telemetry.record_row(0.1)
+    snapshot = telemetry.snapshot()
+    assert snapshot["timed_rows"] == 100
+    assert 1.0 <= snapshot["p50_ms"] <= 1.2
+    assert 100.0 <= snapshot["p95_ms"] <= 120.0
+    assert snapshot["p99_ms"] == snapshot["latency_max_ms"] == 100.0
+    assert sum(count for _, count in snapshot["latency_histogram"]) == 100
+
+
+def test_row_mode_reports_backpressure_with_small_queue() -> None:
+    metrics: dict[str, dict[str, object]] = {}
+    progress: list[dict[str, object]] = []
+
+    def slow_row(row):
+        time.sleep(0.005)
+        return row
+
+    def record(name: str, values) -> None:
+        if name == "rows" and "finished_at_utc" not in values and "row_telemetry" in values:
+            progress.append(values["row_telemetry"])
+        metrics.setdefault(name, {}).update(values)
+
+    steps = {
+        "source": Step(name="source", func=lambda: [{"id": idx} for idx in range(100)]),
+        "rows": Step(name="rows", func=slow_row, deps=["source"], mode="row", queue_size=4),
+    }
+    run(steps, on_step_update=lambda *_: None, on_step_metrics=record)
+
+    telemetry = metrics["rows"]["row_telemetry"]
+    assert telemetry["queue_size"] == 4
+    assert telemetry["rows"] == 100
+    assert telemetry["timed_rows"] == 13
+    assert telemetry["producer_blocked_ms"] > 100
+    assert telemetry["in_depth_max"] <= 4
+    assert telemetry["p50_ms"] >= 5
+    assert progress and progress[-1]["rows"] <= 100
+    assert "row_telemetry" not in metrics["source"]
+
+
+def test_queue_size_must_be_positive() -> None:
+    steps = {"rows": Step(name="rows", func=lambda row: row, mode="row", queue_size=0)}
+    with pytest.raises(ValueError, match="queue_size"):
+        run(steps)
+
+
+def test_dag_reports_engine_overhead_and_persists_run_stats(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def extract():
+        for idx in range(200):
+            print("row", idx)
+        time.sleep(0.1)
+        return [{"id": idx} for idx in range(1000)]
+
+    @dag.step(depends_on=[extract])
+    def load(results):
+        return [{"total": len(results["extract"])}]
+
+    dag.run(dag_name="overhead", logs_dir=str(tmp_path), sinks=["duckdb", "sqlite"])
+    stats = dag.last_run_stats
+    assert stats is not None
+    assert stats.scheduler_iterations >= 2
+    assert stats.steps_ms >= 100
+    assert stats.user_ms >= 100
+    assert stats.user_ms <= stats.steps_ms
+    assert stats.capture_ms > 0
+    assert stats.normalize_ms > 0
+    assert stats.wall_ms >= stats.steps_ms
+    assert stats.framework_ms <= stats.wall_ms
+    assert [item.sink for item in stats.sinks] == ["duckdb", "sqlite"]
+    assert all(item.calls >= 4 for item in stats.sinks)
+    assert all(item.serialize_ms is not None and item.serialize_ms > 0 for item in stats.sinks)
+
+    run_dir = next(tmp_path.glob("overhead_*"))
+    con = duckdb.connect(str(run_dir / "run.duckdb"), read_only=True)
+    try:
+        rows = {
+            (scope, metric): value
+            for scope, metric, value in con.execute(
+                "SELECT scope, metric, value FROM run_stats"
+            ).fetchall()
+        }
+    finally:
+        con.close()
+    assert rows[("run", "user_ms")] == pytest.approx(stats.user_ms)
+    assert rows[("run", "scheduler_iterations")] == stats.scheduler_iterations
+    assert ("sink:duckdb", "log_step_ms") in rows
+    assert ("sink:sqlite", "serialize_ms") in rows
@@ -1,21 +1,44 @@
 from __future__ import annotations
 
 import builtins
+from datetime import date
+import functools
+import os
+from pathlib import Path
+import shutil
 import sqlite3
+import threading
 import time
 
+import duckdb
 import pytest
 
 import ninout.core.engine.dag as dag_module
+import ninout.core.ui.persist_duckdb as persist_duckdb
 from ninout import Dag
-from ninout.core.ui.persist_duckdb import _rows_for_result, _table_name_for_step, persist_run_to_duckdb
+from ninout.core.ui._util import cached_source, safe_source
+from ninout.core.ui.persist_duckdb import (
+    DuckDBRunLogger,
+    RowFilter,
+    _rows_for_result,
+    _table_name_for_step,
+    count_step_rows,
+    load_steps_from_duckdb,
+    persist_run_to_duckdb,
+    read_step_rows,
+    set_rows_search_path,
+)
+import ninout.core.ui.persist_sqlite as persist_sqlite
 from ninout.core.ui.persist_sqlite import SQLiteRunLogger
+from ninout.core.ui.sinks import Sink
 
 
 def test_table_name_for_step_sanitizes_values() -> None:
     assert _table_name_for_step("My-Step") == "step_my_step"
     assert _table_name_for_step("123") == "step_s_123"
     assert _table_name_for_step("___") == "step_step"
+    assert _table_name_for_step("stats") == "step_stats_rows"
+    assert _table_name_for_step("Runtime") == "step_runtime_rows"
 
 
 def test_rows_for_result_handles_none_list_and_scalar() -> None:
@@ -54,6 +77,8 @@ def test_dag_run_persists_step_updates_to_duckdb_logger(monkeypatch, tmp_path) -
             steps,
             disabled_edges=None,
             disabled_steps=None,
+            store_rows=True,
+            parquet_dir=None,
         ) -> None:
             self.db_path = db_path
             self.dag_name = dag_name
@@ -143,6 +168,52 @@ def test_sqlite_logger_persists_runtime_and_rows(tmp_path) -> None:
         con.close()
 
 
+@pytest.mark.parametrize(("live_preview", "expected"), [(True, [1, 2, 3]), (False, [])])
+def test_sqlite_metadata_logger_keeps_rows_only_as_opt_in_live_preview(
+    tmp_path, monkeypatch, live_preview, expected
+) -> None:
+    monkeypatch.setattr(persist_sqlite, "LIVE_PREVIEW_ROWS", 3)
+    db_path = tmp_path / "runs.sqlite"
+    logger = SQLiteRunLogger(
+        db_path=str(db_path),
+        run_name="run_x",
+        dag_name="dag_x",
+        steps={
+            "r": dag_module.Step(name="r", func=lambda row: row, deps=[], mode="row"),
+            "t": dag_module.Step(name="t", func=lambda: None, deps=[]),
+        },
+        store_rows=False,
+        live_preview=live_preview,
+    )
+    for offset in (0, 2, 4):
+        logger.log_step(
+            "r",
+            {
+                "status": "running",
+                "result": [{"id": offset + 1}, {"id": offset + 2}],
+                "append_offset": offset,
+            },
+        )
+    logger.log_step("t", {"status": "done", "result": [{"id": idx} for idx in range(10)]})
+
+    def stored(con: sqlite3.Connection, step_name: str) -> list[int]:
+        return [
+            row[0]
+            for row in con.execute(
+                "SELECT row_id FROM step_rows WHERE step_name = ? ORDER BY row_id", [step_name]
+            ).fetchall()
+        ]
+
+    con = sqlite3.connect(db_path)
+    try:
+        assert stored(con, "r") == expected
+        assert stored(con, "t") == expected
+        logger.close()
+        assert con.execute("SELECT count(*) FROM step_rows").fetchone()[0] == 0
+    finally:
+        con.close()
+
+
 def test_dag_run_persists_step_updates_to_sqlite_logger(monkeypatch, tmp_path) -> None:
     events: list[tuple[str, str]] = []
     closed = {"value": False}
@@ -156,6 +227,8 @@ def test_dag_run_persists_step_updates_to_sqlite_logger(monkeypatch, tmp_path) -
             steps,
             disabled_edges=None,
             disabled_steps=None,
+            store_rows=True,
+            live_preview=False,
         ) -> None:
             self.db_path = db_path
             self.run_name = run_name
@@ -210,3 +283,557 @@ def test_sqlite_logger_handles_row_mode_running_updates_from_worker_thread(tmp_p
     _results, status = dag.run(dag_name="sqlite_threadsafe", logs_dir=str(tmp_path))
     assert status["extract"] == "done"
     assert status["slow_row"] == "done"
+
+
+def test_duckdb_logger_bulk_inserts_rows_in_order(tmp_path) -> None:
+    db_path = tmp_path / "run.duckdb"
+    logger = DuckDBRunLogger(
+        db_path=str(db_path),
+        dag_name="bulk",
+        steps={"a": dag_module.Step(name="a", func=lambda: None, deps=[])},
+    )
+    rows = [{"id": idx, "day": date(2024, 1, 1), "tags": ["x", "é"]} for idx in range(500)]
+    logger.log_step("a", {"status": "done", "result": rows})
+    logger.log_step("a", {"status": "done", "result": rows[:3]})
+    logger.close()
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        stored = read_step_rows(con, "step_a")
+    finally:
+        con.close()
+    assert [row_id for row_id, _payload in stored] == [1, 2, 3]
+    assert stored[2][1] == {"id": 2, "day": date(2024, 1, 1), "tags": ["x", "é"]}
+
+
+def test_duckdb_logger_creates_typed_step_tables_with_overflow(tmp_path) -> None:
+    db_path = tmp_path / "run.duckdb"
+    logger = DuckDBRunLogger(
+        db_path=str(db_path),
+        dag_name="typed",
+        steps={
+            "a": dag_module.Step(name="a", func=lambda: None, deps=[]),
+            "gate": dag_module.Step(name="gate", func=lambda: None, deps=[], is_branch=True),
+        },
+    )
+    rows = [
+        {"id": 1, "score": 1, "day": date(2024, 1, 1), "meta": {"k": "v"}},
+        {"id": 2, "score": 2.5, "day": date(2024, 1, 2), "meta": None},
+    ]
+    rows.extend({"id": idx, "score": "n/a"} for idx in range(3, 1003))
+    rows.extend({"id": idx, "score": "n/a", "late": True} for idx in range(1003, 1005))
+    logger.log_step("a", {"status": "done", "result": rows})
+    logger.log_step("gate", {"status": "done", "result": True})
+    logger.close()
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        columns = con.execute(
+            "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = 'step_a' ORDER BY column_index"
+        ).fetchall()
+        assert columns[:5] == [
+            ("row_id", "BIGINT"),
+            ("id", "BIGINT"),
+            ("score", "JSON"),
+            ("day", "DATE"),
+            ("meta", "JSON"),
+        ]
+        assert ("late", "BOOLEAN") not in columns
+        assert con.execute("SELECT count(*) FROM step_a WHERE id > 1000").fetchone()[0] == 4
+        stored = read_step_rows(con, "step_a", limit=2, offset=0)
+        assert stored == [(1, rows[0]), (2, rows[1])]
+        assert read_step_rows(con, "step_a", limit=1, offset=1003)[0][1] == {
+            "id": 1004,
+            "score": "n/a",
+            "late": True,
+        }
+        assert [record for _row_id, record in read_step_rows(con, "step_a")] == rows
+        assert read_step_rows(con, "step_gate") == [(1, True)]
+    finally:
+        con.close()
+    assert load_steps_from_duckdb(str(db_path))["gate"].result == "true"
+
+
+def test_duckdb_logger_keeps_exact_ints_in_mixed_numeric_columns(tmp_path) -> None:
+    db_path = tmp_path / "run.duckdb"
+    logger = DuckDBRunLogger(
+        db_path=str(db_path),
+        dag_name="numeric",
+        steps={"a": dag_module.Step(name="a", func=lambda: None, deps=[])},
+    )
+    big = 2**53 + 1
+    rows = [{"n": 2, "f": 0.5}, {"n": 2.5, "f": 1.5}, {"n": big, "f": 2.5}]
+    rows.extend({"n": float(idx), "f": 0.25} for idx in range(1000))
+    rows.append({"n": 1.0, "f": 3})
+    logger.log_step("a", {"status": "done", "result": rows})
+    logger.close()
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        types = dict(
+            con.execute(
+                "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = 'step_a'"
+            ).fetchall()
+        )
+        assert (types["n"], types["f"]) == ("JSON", "DOUBLE")
+        stored = [record for _row_id, record in read_step_rows(con, "step_a")]
+        assert stored == rows
+        assert type(stored[0]["n"]) is int and stored[2]["n"] == big
+        assert type(stored[-1]["f"]) is int
+        filtered = read_step_rows(con, "step_a", filters=[RowFilter("n", "gt", 999.5)])
+        assert [row_id for row_id, _record in filtered] == [3]
+    finally:
+        con.close()
+
+
+def test_read_step_rows_supports_keyset_projection_filters_and_sort(tmp_path) -> None:
+    db_path = tmp_path / "run.duckdb"
+    logger = DuckDBRunLogger(
+        db_path=str(db_path),
+        dag_name="paging",
+        steps={"a": dag_module.Step(name="a", func=lambda: None, deps=[])},
+    )
+    rows = [{"id": idx, "name": f"n{idx}", "score": idx * 1.5} for idx in range(1, 1201)]
+    rows[4]["id"] = "weird"
+    rows[1100]["late"] = 7
+    logger.log_step("a", {"status": "done", "result": rows})
+    logger.close()
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        assert [row_id for row_id, _ in read_step_rows(con, "step_a", limit=3, after_row_id=4)] == [
+            5,
+            6,
+            7,
+        ]
+        assert read_step_rows(con, "step_a", limit=2, after_row_id=3, descending=True) == [
+            (2, {"id": 2, "name": "n2", "score": 3.0}),
+            (1, {"id": 1, "name": "n1", "score": 1.5}),
+        ]
+        assert read_step_rows(con, "step_a", limit=2, columns=["id", "late"]) == [
+            (1, {"id": 1, "late": None}),
+            (2, {"id": 2, "late": None}),
+        ]
+        assert read_step_rows(
+            con, "step_a", columns=["id"], filters=[RowFilter("id", "eq", "weird")]
+        ) == [(5, {"id": "weird"})]
+        assert read_step_rows(
+            con, "step_a", columns=["late"], filters=[RowFilter("late", "ge", 5)]
+        ) == [(1101, {"late": 7})]
+        assert read_step_rows(con, "step_a", limit=1, columns=["score"], sort="score", descending=True) == [
+            (1200, {"score": 1800.0})
+        ]
+        assert count_step_rows(con, "step_a", [RowFilter("name", "contains", "119")]) == 12
+        assert count_step_rows(con, "step_a", [RowFilter("late", "eq", None)]) == 1199
+        assert count_step_rows(con, "step_a", [RowFilter("missing", "gt", 1)]) == 0
+        with pytest.raises(ValueError):
+            read_step_rows(con, "step_a", after_row_id=1, sort="score")
+    finally:
+        con.close()
+
+
+def test_duckdb_logger_batches_definitions_and_creates_step_tables_lazily(tmp_path) -> None:
+    def shared():
+        return {"id": 1}
+
+    steps = {
+        f"s{idx}": dag_module.Step(name=f"s{idx}", func=shared, deps=[]) for idx in range(50)
+    }
+    cached_source.cache_clear()
+    logger = DuckDBRunLogger(db_path=str(tmp_path / "run.duckdb"), dag_name="lazy", steps=steps)
+    logger.log_step("s1", {"status": "done", "result": {"id": 1}})
+    logger.close()
+    assert cached_source.cache_info().misses == 1
+
+    con = duckdb.connect(str(tmp_path / "run.duckdb"), read_only=True)
+    try:
+        assert con.execute("SELECT count(*) FROM step_definition").fetchone()[0] == 50
+        assert con.execute(
+            "SELECT count(*) FROM step_runtime WHERE status = 'pending'"
+        ).fetchone()[0] == 49
+        tables = {
+            row[0]
+            for row in con.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE regexp_matches(table_name, '^step_s[0-9]+$')"
+            ).fetchall()
+        }
+        assert tables == {"step_s1"}
+        assert count_step_rows(con, "step_s2") == 0
+        assert read_step_rows(con, "step_s2") == []
+    finally:
+        con.close()
+
+
+def _deco(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def test_safe_source_unwraps_decorated_steps() -> None:
+    @_deco
+    def first_step():
+        return {"id": 1}
+
+    @_deco
+    def second_step():
+        return {"id": 2}
+
+    first = safe_source(first_step)
+    second = safe_source(second_step)
+    assert first.lstrip().startswith("@_deco")
+    assert "def first_step():" in first
+    assert "def second_step():" in second
+    assert "wrapper" not in first + second
+
+
+def test_dag_run_default_sinks_keep_rows_out_of_sqlite(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return [{"id": 1}, {"id": 2}]
+
+    @dag.step(depends_on=[a])
+    def b(results):
+        with sqlite3.connect(tmp_path / "runs.sqlite") as con:
+            return {"live_rows": con.execute("SELECT count(*) FROM step_rows").fetchone()[0]}
+
+    results, _status = dag.run(dag_name="default_sinks", logs_dir=str(tmp_path))
+    assert results["b"] == {"live_rows": 0}
+    assert dag._last_run_dir is not None
+    con = sqlite3.connect(tmp_path / "runs.sqlite")
+    try:
+        assert con.execute("SELECT count(*) FROM step_rows").fetchone()[0] == 0
+        assert {row[0] for row in con.execute("SELECT status FROM step_runtime")} == {"done"}
+    finally:
+        con.close()
+    steps = load_steps_from_duckdb(os.path.join(dag._last_run_dir, "run.duckdb"))
+    assert steps["a"].output_lines == 2
+
+
+def test_dag_run_with_selected_sinks(tmp_path) -> None:
+    events: list[str] = []
+
+    class CustomSink:
+        def log_step(self, step_name: str, meta) -> None:
+            events.append(f"{step_name}:{meta['status']}")
+
+        def close(self) -> None:
+            events.append("closed")
+
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return [{"id": 1}, {"id": 2}]
+
+    dag.run(
+        dag_name="picked",
+        logs_dir=str(tmp_path),
+        sinks=["parquet", Sink("duckdb", detail="metadata"), "null", CustomSink()],
+    )
+    assert dag._last_run_dir is not None
+    run_dir = Path(dag._last_run_dir)
+    assert not (tmp_path / "runs.sqlite").exists()
+    assert events == ["a:running", "a:done", "closed"]
+    con = duckdb.connect()
+    try:
+        parquet_rows = con.execute(
+            f"SELECT id FROM read_parquet('{run_dir / 'parquet' / 'step_a' / '*.parquet'}') ORDER BY row_id"
+        ).fetchall()
+        assert parquet_rows == [(1,), (2,)]
+        runtime = con.execute(
+            f"SELECT status FROM read_parquet('{run_dir / 'parquet' / 'step_runtime.parquet'}')"
+        ).fetchall()
+        assert runtime == [("done",)]
+    finally:
+        con.close()
+    con = duckdb.connect(str(run_dir / "run.duckdb"), read_only=True)
+    try:
+        assert count_step_rows(con, "step_a") == 0
+        assert con.execute("SELECT output_lines FROM step_runtime").fetchone()[0] == 2
+    finally:
+        con.close()
+
+
+def test_dag_run_rejects_unknown_sink(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def a():
+        return {"id": 1}
+
+    with pytest.raises(ValueError, match="Sink desconhecido"):
+        dag.run(logs_dir=str(tmp_path), sinks=["csv"])
+    with pytest.raises(TypeError):
+        dag.run(logs_dir=str(tmp_path), sinks=[object()])
+
+
+def test_dag_run_applies_row_retention_and_persists_stats(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def source():
+        return [{"id": idx, "group": idx % 3} for idx in range(1, 51)]
+
+    @dag.step(depends_on=[source], persist_rows="all")
+    def kept(results):
+        return results["source"]
+
+    _results, status = dag.run(
+        dag_name="retention", logs_dir=str(tmp_path), persist_rows="head(5)"
+    )
+    assert status["kept"] == "done"
+    assert dag._last_run is not None
+    assert len(dag._last_run["source"]["result"]) == 50
+    con = duckdb.connect(os.path.join(dag._last_run_dir, "run.duckdb"), read_only=True)
+    try:
+        assert count_step_rows(con, "step_source") == 5
+        assert count_step_rows(con, "step_kept") == 50
+        stats = con.execute(
+            """
+            SELECT column_name, row_count, min_json, max_json, distinct_estimate
+            FROM step_stats WHERE step_name = 'source' ORDER BY column_name
+            """
+        ).fetchall()
+        assert stats == [("group", 50, "0", "2", 3), ("id", 50, "1", "50", 50)]
+        assert con.execute(
+            "SELECT count(*) FROM step_stats WHERE step_name = 'kept'"
+        ).fetchone()[0] == 0
+    finally:
+        con.close()
+
+
+def test_dag_step_rejects_invalid_persist_rows() -> None:
+    dag = Dag()
+
+    with pytest.raises(ValueError, match="persist_rows"):
+
+        @dag.step(persist_rows="tail(3)")
+        def a():
+            return {"id": 1}
+
+
+def test_dag_run_with_parquet_row_storage_creates_views(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def extract():
+        return [{"id": idx, "meta": {"even": idx % 2 == 0}} for idx in range(1, 4)]
+
+    @dag.step(depends_on=[extract])
+    def empty(results):
+        return []
+
+    dag.run(dag_name="parquet_rows", logs_dir=str(tmp_path / "logs"), row_storage="parquet")
+    assert dag._last_run_dir is not None
+    run_dir = tmp_path / "moved"
+    shutil.move(dag._last_run_dir, run_dir)
+    assert (run_dir / "rows" / "step_extract" / "part-00001.parquet").exists()
+    assert not (run_dir / "rows" / "step_empty").exists()
+    con = duckdb.connect(str(run_dir / "run.duckdb"), read_only=True)
+    try:
+        set_rows_search_path(con, str(run_dir / "run.duckdb"))
+        assert con.execute(
+            "SELECT table_type FROM information_schema.tables WHERE table_name = 'step_extract'"
+        ).fetchone() == ("VIEW",)
+        assert count_step_rows(con, "step_extract") == 3
+        assert read_step_rows(con, "step_extract", limit=1, offset=1) == [
+            (2, {"id": 2, "meta": {"even": True}})
+        ]
+    finally:
+        con.close()
+    steps = load_steps_from_duckdb(str(run_dir / "run.duckdb"))
+    assert steps["empty"].result == "[]"
+    assert '"id": 3' in str(steps["extract"].result)
+
+    with pytest.raises(ValueError, match="row_storage"):
+        dag.run(logs_dir=str(tmp_path), row_storage="csv")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("row_storage", ["duckdb", "parquet"])
+def test_duckdb_logger_appends_streamed_rows_without_rewriting(
+    tmp_path, monkeypatch, row_storage
+) -> None:
+    monkeypatch.setattr(persist_duckdb, "_PARQUET_FLUSH_S", 0.0)
+    parquet_dir = str(tmp_path / "rows") if row_storage == "parquet" else None
+    logger = DuckDBRunLogger(
+        db_path=str(tmp_path / "run.duckdb"),
+        dag_name="append",
+        steps={"r": dag_module.Step(name="r", func=lambda row: row, deps=[], mode="row")},
+        parquet_dir=parquet_dir,
+    )
+    logger.log_step(
+        "r", {"status": "running", "result": [{"id": 1}, {"id": 2}], "append_offset": 0}
+    )
+    logger.log_step("r", {"status": "running", "result": [{"id": "x3"}], "append_offset": 2})
+    logger.log_step("r", {"status": "done", "result": [{"id": 4}], "append_offset": 3})
+    if parquet_dir is not None:
+        assert sorted(os.listdir(tmp_path / "rows" / "step_r")) == [
+            "part-00001.parquet",
+            "part-00002.parquet",
+            "part-00003.parquet",
+        ]
+    logger.close()
+
+    if parquet_dir is not None:
+        assert os.listdir(tmp_path / "rows" / "step_r") == ["part-00001.parquet"]
+    con = duckdb.connect(str(tmp_path / "run.duckdb"), read_only=True)
+    try:
+        set_rows_search_path(con, str(tmp_path / "run.duckdb"))
+        assert read_step_rows(con, "step_r") == [
+            (1, {"id": 1}),
+            (2, {"id": 2}),
+            (3, {"id": "x3"}),
+            (4, {"id": 4}),
+        ]
+    finally:
+        con.close()
+
+
+def test_dag_run_streams_row_mode_output_to_sinks(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def extract():
+        return [{"id": idx} for idx in range(1, 7)]
+
+    @dag.step(depends_on=[extract], mode="row")
+    def slow(row):
+        time.sleep(0.08)
+        return {"id": row["id"]}
+
+    dag.run(dag_name="streamed", logs_dir=str(tmp_path), sinks=[Sink("sqlite")])
+    con = sqlite3.connect(tmp_path / "runs.sqlite")
+    try:
+        row_ids = [
+            row[0]
+            for row in con.execute(
+                "SELECT row_id FROM step_rows WHERE step_name = 'slow' ORDER BY row_id"
+            ).fetchall()
+        ]
+    finally:
+        con.close()
+    assert row_ids == [1, 2, 3, 4, 5, 6]
+
+
+def test_dag_run_collects_stats_from_streamed_rows_on_worker_threads(tmp_path, monkeypatch) -> None:
+    threads: list[str] = []
+    real_update = dag_module.StepStatsCollector.update
+
+    def tracking_update(self, records):
+        threads.append(threading.current_thread().name)
+        return real_update(self, records)
+
+    monkeypatch.setattr(dag_module.StepStatsCollector, "update", tracking_update)
+    dag = Dag()
+
+    @dag.step()
+    def extract():
+        return [{"id": idx} for idx in range(1, 7)]
+
+    @dag.step(depends_on=[extract], mode="row", persist_rows="none")
+    def slow(row):
+        time.sleep(0.08)
+        return {"id": row["id"], "even": row["id"] % 2 == 0}
+
+    dag.run(dag_name="streamed_stats", logs_dir=str(tmp_path), sinks=["duckdb"])
+    assert len(threads) >= 2
+    assert all(name.startswith("ninout-worker") for name in threads)
+    con = duckdb.connect(os.path.join(str(dag.last_run_dir), "run.duckdb"), read_only=True)
+    try:
+        stats = {
+            row[0]: row[1:]
+            for row in con.execute(
+                "SELECT column_name, row_count, min_json, max_json, distinct_estimate "
+                "FROM step_stats WHERE step_name = 'slow'"
+            ).fetchall()
+        }
+        assert count_step_rows(con, "step_slow") == 0
+    finally:
+        con.close()
+    assert stats == {"id": (6, "1", "6", 6), "even": (6, "false", "true", 2)}
+
+
+def test_duckdb_logger_buffers_streamed_parquet_rows_into_few_parts(tmp_path) -> None:
+    logger = DuckDBRunLogger(
+        db_path=str(tmp_path / "run.duckdb"),
+        dag_name="buffered",
+        steps={"r": dag_module.Step(name="r", func=lambda row: row, deps=[], mode="row")},
+        parquet_dir=str(tmp_path / "rows"),
+    )
+    for offset in range(0, 200, 10):
+        logger.log_step(
+            "r",
+            {
+                "status": "running",
+                "result": [{"id": idx} for idx in range(offset + 1, offset + 11)],
+                "append_offset": offset,
+            },
+        )
+    assert not (tmp_path / "rows" / "step_r").exists()
+    logger.log_step("r", {"status": "done", "result": [], "append_offset": 200})
+    logger.close()
+
+    assert os.listdir(tmp_path / "rows" / "step_r") == ["part-00001.parquet"]
+    con = duckdb.connect(str(tmp_path / "run.duckdb"), read_only=True)
+    try:
+        set_rows_search_path(con, str(tmp_path / "run.duckdb"))
+        assert count_step_rows(con, "step_r") == 200
+        assert read_step_rows(con, "step_r", limit=1, offset=199) == [(200, {"id": 200})]
+    finally:
+        con.close()
+
+
+def test_shared_duckdb_connection_is_detached_when_logger_setup_fails(
+    tmp_path, monkeypatch
+) -> None:
+    def broken_source(func: object) -> str:
+        raise RuntimeError("source unavailable")
+
+    monkeypatch.setattr(persist_duckdb, "safe_source", broken_source)
+    owner = duckdb.connect()
+    try:
+        with pytest.raises(RuntimeError, match="source unavailable"):
+            DuckDBRunLogger(
+                db_path=str(tmp_path / "run.duckdb"),
+                dag_name="broken",
+                steps={"a": dag_module.Step(name="a", func=lambda: None, deps=[])},
+                connection=owner,
+            )
+        databases = {
+            row[0]
+            for row in owner.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        }
+        assert not any(name.startswith("ninout_run_") for name in databases)
+    finally:
+        owner.close()
+
+
+def test_shared_sqlite_connection_is_rolled_back_when_close_fails(tmp_path, monkeypatch) -> None:
+    shared = sqlite3.connect(tmp_path / "runs.sqlite")
+    try:
+        logger = SQLiteRunLogger(
+            db_path=str(tmp_path / "runs.sqlite"),
+            run_name="run_x",
+            dag_name="dag_x",
+            steps={"a": dag_module.Step(name="a", func=lambda: None, deps=[])},
+            store_rows=False,
+            connection=shared,
+            live_preview=True,
+        )
+        logger.log_step("a", {"status": "done", "result": [{"id": 1}]})
+
+        def broken_catalog(finished: bool) -> None:
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(logger, "_update_catalog", broken_catalog)
+        with pytest.raises(sqlite3.OperationalError):
+            logger.close()
+        assert not shared.in_transaction
+        assert shared.execute("SELECT count(*) FROM step_rows").fetchone() == (1,)
+    finally:
+        shared.close()
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import time
+
 import pytest
 
+from ninout import Dag
+from ninout.core.engine.estimate import estimate_run
 from ninout.core.engine.models import Step
 from ninout.core.engine.planner import compile_execution_plan
 
@@ -30,3 +34,61 @@ def test_compile_execution_plan_rejects_invalid_disabled_entries() -> None:
         compile_execution_plan(steps, disabled_edges={("a", "missing")})
     with pytest.raises(ValueError):
         compile_execution_plan(steps, disabled_steps={"missing"})
+
+
+def test_estimate_run_simulates_workers_and_finds_critical_path() -> None:
+    steps = {
+        "extract": Step(name="extract", func=lambda: {}, deps=[]),
+        "slow": Step(name="slow", func=lambda: {}, deps=["extract"]),
+        "fast_a": Step(name="fast_a", func=lambda: {}, deps=["extract"]),
+        "fast_b": Step(name="fast_b", func=lambda: {}, deps=["extract"]),
+        "load": Step(name="load", func=lambda: {}, deps=["slow", "fast_a", "fast_b"]),
+        "unused": Step(name="unused", func=lambda: {}, deps=["load"]),
+    }
+    history = {"extract": [10.0, 30.0, 20.0], "slow": [100.0], "fast_a": [40.0], "fast_b": [40.0]}
+    plan = compile_execution_plan(steps, disabled_steps={"unused"})
+
+    serial = estimate_run(steps, plan, history, max_workers=1, default_ms=5.0)
+    assert serial.total_ms == serial.work_ms == 20 + 100 + 40 + 40 + 5
+    assert serial.critical_path == ["extract", "slow", "load"]
+    assert serial.critical_path_ms == 125
+    assert serial.skipped == ["unused"]
+    assert serial.missing_history == ["load"]
+
+    parallel = estimate_run(steps, plan, history, max_workers=3, default_ms=5.0)
+    assert parallel.total_ms == parallel.critical_path_ms == 125
+    by_name = {step.step_name: step for step in parallel.steps}
+    assert by_name["slow"].critical and by_name["slow"].slack_ms == 0
+    assert by_name["fast_a"].slack_ms == 60
+    assert [level.steps for level in parallel.levels] == [1, 3, 1]
+    assert parallel.levels[1].utilization == pytest.approx(180 / (100 * 3))
+
+    two = estimate_run(steps, plan, history, max_workers=2, durations={"slow": 10.0})
+    assert two.critical_path == ["extract", "fast_a", "load"]
+    assert two.total_ms == 20 + 50
+
+
+def test_dag_explain_uses_step_durations_from_run_history(tmp_path) -> None:
+    dag = Dag()
+
+    @dag.step()
+    def extract():
+        time.sleep(0.05)
+        return [{"id": 1}]
+
+    @dag.step(depends_on=[extract])
+    def load(results):
+        return results["extract"]
+
+    dag.run(dag_name="explain_history", logs_dir=str(tmp_path))
+    estimate = dag.explain(dag_name="explain_history", logs_dir=str(tmp_path), max_workers=2)
+    by_name = {step.step_name: step for step in estimate.steps}
+    assert by_name["extract"].source == "history"
+    assert by_name["extract"].duration_ms >= 50
+    assert estimate.critical_path == ["extract", "load"]
+    assert estimate.missing_history == []
+    assert "critical path" in estimate.format()
+
+    unknown = dag.explain(dag_name="never_ran", logs_dir=str(tmp_path), default_ms=1.0)
+    assert unknown.missing_history == ["extract", "load"]
+    assert unknown.total_ms == 2.0
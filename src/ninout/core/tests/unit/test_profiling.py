@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from ninout.core.engine.executor import run
+from ninout.core.engine.models import Step
+from ninout.core.engine.profiling import StepProfiler, parse_profile_mode
+
+
+def _leaf(n: int) -> int:
+    return sum(range(n))
+
+
+def _work() -> list[dict[str, int]]:
+    time.sleep(0.03)
+    return [{"value": _leaf(1000)} for _ in range(5)]
+
+
+def test_trace_mode_records_calls_and_stacks_per_thread() -> None:
+    profiler = StepProfiler("trace", _work)
+    noise = threading.Thread(target=lambda: [_leaf(1000) for _ in range(50)])
+    with profiler.active():
+        noise.start()
+        _work()
+    noise.join()
+    profile = profiler.report()
+
+    functions = {item.name: item for item in profile.functions}
+    leaf = next(item for name, item in functions.items() if name.startswith("_leaf "))
+    assert leaf.calls == 5
+    assert any(name == "<time.sleep>" for name in functions)
+    root = next(item for name, item in functions.items() if name.startswith("_work "))
+    assert root.total_ms >= 30
+    assert any(stack.count(";") == 2 and "_leaf" in stack for stack in profile.stacks)
+    assert all(stack.startswith("_work ") for stack in profile.stacks)
+
+
+def test_sampling_mode_trims_stacks_to_step_function() -> None:
+    profiler = StepProfiler("sampling", _work)
+    with profiler.active():
+        for _ in range(3):
+            _work()
+    profile = profiler.report()
+    assert profile.mode == "sampling"
+    assert profile.samples > 0
+    assert all(stack.startswith("_work ") for stack in profile.stacks)
+    assert all(item.calls is None for item in profile.functions)
+
+
+def test_executor_reports_profiles_for_selected_steps() -> None:
+    profiles: dict[str, object] = {}
+    steps = {
+        "extract": Step(name="extract", func=lambda: [{"id": 1}, {"id": 2}]),
+        "enrich": Step(
+            name="enrich",
+            func=lambda row: {"id": row["id"], "value": _leaf(100)},
+            deps=["extract"],
+            mode="row",
+        ),
+    }
+    run(
+        steps,
+        profile={"enrich": "trace"},
+        on_step_metrics=lambda name, metrics: profiles.update(
+            {name: metrics["profile"]} if "profile" in metrics else {}
+        ),
+    )
+    assert list(profiles) == ["enrich"]
+    functions = {item.name.split(" ")[0].split(".")[-1]: item for item in profiles["enrich"].functions}
+    assert functions["<lambda>"].calls == 2
+    assert functions["_leaf"].calls == 2
+
+
+def test_parse_profile_mode() -> None:
+    assert parse_profile_mode(None) is None
+    assert parse_profile_mode(True) == "trace"
+    assert parse_profile_mode("sampling") == "sampling"
+    with pytest.raises(ValueError):
+        parse_profile_mode("perf")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from ninout.core.ui.retention import (
+    RowRetention,
+    StepStatsCollector,
+    parse_row_retention,
+    retain_rows,
+)
+
+
+def test_parse_row_retention_accepts_known_policies() -> None:
+    assert parse_row_retention("all") == RowRetention("all")
+    assert parse_row_retention("none") == RowRetention("none")
+    assert parse_row_retention("head(10)") == RowRetention("head", 10)
+    assert parse_row_retention(" Reservoir(5) ") == RowRetention("reservoir", 5)
+    with pytest.raises(ValueError):
+        parse_row_retention("tail(3)")
+    with pytest.raises(ValueError):
+        parse_row_retention(RowRetention("head"))
+
+
+def test_retain_rows_keeps_original_row_ids() -> None:
+    rows = [{"id": idx} for idx in range(1, 101)]
+    assert retain_rows(rows, RowRetention("all")) == (rows, None)
+    assert retain_rows(rows, RowRetention("none")) == ([], [])
+    head_rows, head_ids = retain_rows(rows, RowRetention("head", 3))
+    assert head_rows == rows[:3]
+    assert head_ids == [1, 2, 3]
+    sample_rows, sample_ids = retain_rows(rows, RowRetention("reservoir", 10))
+    assert len(sample_rows) == 10
+    assert sample_ids == sorted(sample_ids)
+    assert all(row["id"] == row_id for row, row_id in zip(sample_rows, sample_ids))
+    assert retain_rows({"id": 1}, RowRetention("head", 1)) == ({"id": 1}, [1])
+    assert retain_rows({"id": 1}, RowRetention("none")) == (None, None)
+
+
+def test_step_stats_collector_counts_nulls_bounds_and_distinct_values() -> None:
+    collector = StepStatsCollector()
+    collector.update([{"id": idx, "kind": "a" if idx % 2 else "b"} for idx in range(5000)])
+    collector.update([{"id": None, "extra": [1]}])
+    stats = {item["column_name"]: item for item in collector.rows()}
+    assert stats["id"]["row_count"] == 5001
+    assert stats["id"]["value_count"] == 5000
+    assert stats["id"]["null_count"] == 1
+    assert (stats["id"]["min_value"], stats["id"]["max_value"]) == (0, 4999)
+    assert 4500 <= stats["id"]["distinct_estimate"] <= 5500
+    assert stats["kind"]["distinct_estimate"] == 2
+    assert stats["kind"]["null_count"] == 1
+    assert stats["extra"]["null_count"] == 5000
+    assert stats["extra"]["min_value"] is None
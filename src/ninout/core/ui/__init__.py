@@ -1,4 +1,14 @@
 from ninout.core.ui.persist_duckdb import DuckDBRunLogger, load_steps_from_duckdb
+from ninout.core.ui.persist_parquet import ParquetRunLogger
 from ninout.core.ui.persist_sqlite import SQLiteRunLogger
+from ninout.core.ui.sinks import NullRunLogger, RunSink, Sink
 
-__all__ = ["DuckDBRunLogger", "SQLiteRunLogger", "load_steps_from_duckdb"]
+__all__ = [
+    "DuckDBRunLogger",
+    "NullRunLogger",
+    "ParquetRunLogger",
+    "RunSink",
+    "SQLiteRunLogger",
+    "Sink",
+    "load_steps_from_duckdb",
+]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import inspect
+
+
+@lru_cache(maxsize=8192)
+def cached_source(target: object) -> str:
+    try:
+        return inspect.getsource(target).rstrip()
+    except (OSError, TypeError):
+        return "# Codigo fonte indisponivel"
+
+
+def safe_source(func: object) -> str:
+    try:
+        target = inspect.unwrap(func)
+    except ValueError:
+        target = func
+    return cached_source(getattr(target, "__code__", target))
@@ -1,28 +1,146 @@
 const runsList = document.getElementById("runs-list");
 const runMeta = document.getElementById("run-meta");
+const stepsScroll = document.getElementById("steps-scroll");
 const stepsBody = document.querySelector("#steps-table tbody");
 const stepRowsMeta = document.getElementById("step-rows-meta");
+const stepRowsScroll = document.getElementById("step-rows-scroll");
 const stepRowsTableHead = document.querySelector("#step-rows-table thead");
 const stepRowsTableBody = document.querySelector("#step-rows-table tbody");
+const stepStatsMeta = document.getElementById("step-stats-meta");
+const rowPipelineMeta = document.getElementById("row-pipeline-meta");
+const stepStatsTableHead = document.querySelector("#step-stats-table thead");
+const stepStatsTableBody = document.querySelector("#step-stats-table tbody");
 const refreshRunsBtn = document.getElementById("refresh-runs");
 const dagGraph = document.getElementById("dag-graph");
+const ganttWrap = document.getElementById("gantt-wrap");
+const gantt = document.getElementById("gantt");
+const traceLink = document.getElementById("trace-link");
+const profileSection = document.getElementById("profile-section");
+const profileMeta = document.getElementById("profile-meta");
+const flamegraph = document.getElementById("flamegraph");
+const profileTableBody = document.querySelector("#profile-table tbody");
+
+const SVG_NS = "http://www.w3.org/2000/svg";
+const RUN_STEP_FIELDS = [
+  "status",
+  "duration_ms",
+  "input_lines",
+  "output_lines",
+  "throughput_in_lps",
+  "throughput_out_lps",
+  "cpu_ms",
+  "result_bytes",
+  "peak_alloc_bytes",
+  "ready_at_utc",
+  "started_at_utc",
+  "finished_at_utc",
+  "worker",
+  "queue_wait_ms",
+  "row_telemetry",
+  "when_name",
+  "condition_bool",
+  "is_branch",
+  "disabled_self",
+  "disabled_deps",
+  "deps",
+].join(",");
+const STEP_COLUMNS = [
+  "step_name",
+  "status",
+  "duration_ms",
+  "input_lines",
+  "output_lines",
+  "throughput_in_lps",
+  "throughput_out_lps",
+  "cpu_ms",
+  "result_bytes",
+  "peak_alloc_bytes",
+  "queue_wait_ms",
+];
+const BYTE_COLUMNS = new Set(["result_bytes", "peak_alloc_bytes"]);
+const TABLE_ROW_HEIGHT = 34;
+const TABLE_OVERSCAN = 10;
+const ROWS_PAGE_SIZE = 200;
+const LOD_LABELS_UNITS_PER_PX = 2.5;
+const LOD_CLUSTER_UNITS_PER_PX = 6;
+const LOD_CLUSTER_MIN_STEPS = 200;
+const GANTT_LANE_HEIGHT = 22;
+const GANTT_LABEL_WIDTH = 150;
 
 let selectedRun = null;
 let selectedStep = null;
+let currentRun = null;
+let runEvents = null;
+let watchedRun = null;
+let graphView = null;
+let suppressGraphClick = false;
+let stepRowsState = null;
+
+const layoutCache = new Map();
+const stepRowCache = new Map();
 
 async function fetchJson(url) {
   const response = await fetch(url);
   if (!response.ok) {
-    throw new Error(`Request failed: ${response.status}`);
+    const error = new Error(`Request failed: ${response.status}`);
+    error.status = response.status;
+    throw error;
   }
   return response.json();
 }
 
+function createVirtualTable(container, tbody, columnCount, renderRow) {
+  const table = { container, tbody, columnCount, renderRow, items: [], onNearEnd: null };
+  container.addEventListener("scroll", () => renderVirtualRows(table));
+  return table;
+}
+
+function spacerRow(height, columnCount) {
+  const tr = document.createElement("tr");
+  tr.className = "spacer";
+  const td = document.createElement("td");
+  td.colSpan = Math.max(1, columnCount);
+  td.style.height = `${height}px`;
+  tr.appendChild(td);
+  return tr;
+}
+
+function setVirtualItems(table, items, columnCount = table.columnCount) {
+  table.items = items;
+  table.columnCount = columnCount;
+  renderVirtualRows(table);
+}
+
+function renderVirtualRows(table) {
+  const { container, items } = table;
+  const first = Math.max(0, Math.floor(container.scrollTop / TABLE_ROW_HEIGHT) - TABLE_OVERSCAN);
+  const count = Math.ceil(container.clientHeight / TABLE_ROW_HEIGHT) + TABLE_OVERSCAN * 2;
+  const last = Math.min(items.length, first + count);
+  const fragment = document.createDocumentFragment();
+  if (first > 0) {
+    fragment.appendChild(spacerRow(first * TABLE_ROW_HEIGHT, table.columnCount));
+  }
+  for (let idx = first; idx < last; idx += 1) {
+    fragment.appendChild(table.renderRow(items[idx], idx));
+  }
+  if (last < items.length) {
+    fragment.appendChild(spacerRow((items.length - last) * TABLE_ROW_HEIGHT, table.columnCount));
+  }
+  table.tbody.replaceChildren(fragment);
+  if (table.onNearEnd && last >= items.length - TABLE_OVERSCAN) {
+    table.onNearEnd();
+  }
+}
+
+const stepsTable = createVirtualTable(stepsScroll, stepsBody, STEP_COLUMNS.length, stepRow);
+const stepRowsTable = createVirtualTable(stepRowsScroll, stepRowsTableBody, 1, dataRow);
+
 function renderRuns(runs) {
   runsList.innerHTML = "";
   for (const run of runs) {
     const item = document.createElement("li");
-    item.textContent = `${run.run_name} (${run.dag_name})`;
+    const status = run.status ? ` - ${run.status}` : "";
+    item.textContent = `${run.run_name} (${run.dag_name})${status}`;
     item.addEventListener("click", () => loadRun(run.run_name));
     runsList.appendChild(item);
   }
@@ -42,25 +160,49 @@ function renderRunMeta(run) {
   );
 }
 
-function renderSteps(run) {
-  stepsBody.innerHTML = "";
-  for (const step of run.steps) {
+function stepRow(step) {
+  let entry = stepRowCache.get(step.step_name);
+  if (!entry) {
     const tr = document.createElement("tr");
-    if (selectedStep === step.step_name) {
-      tr.classList.add("selected");
+    const cells = STEP_COLUMNS.map(() => tr.appendChild(document.createElement("td")));
+    tr.addEventListener("click", () => selectStep(currentRun.run_name, step.step_name));
+    entry = { tr, cells, values: [] };
+    stepRowCache.set(step.step_name, entry);
+  }
+  patchStepRow(entry, step);
+  return entry.tr;
+}
+
+function patchStepRow(entry, step) {
+  STEP_COLUMNS.forEach((column, idx) => {
+    const value = formatStepCell(column, step[column]);
+    if (entry.values[idx] !== value) {
+      entry.values[idx] = value;
+      entry.cells[idx].textContent = value;
     }
-    tr.innerHTML = `
-      <td>${step.step_name}</td>
-      <td>${step.status}</td>
-      <td>${step.duration_ms ?? ""}</td>
-      <td>${step.input_lines ?? ""}</td>
-      <td>${step.output_lines ?? ""}</td>
-      <td>${step.throughput_in_lps ?? ""}</td>
-      <td>${step.throughput_out_lps ?? ""}</td>
-    `;
-    tr.addEventListener("click", () => selectStep(run.run_name, step.step_name));
-    stepsBody.appendChild(tr);
+  });
+  entry.tr.classList.toggle("selected", selectedStep === step.step_name);
+}
+
+function formatStepCell(column, value) {
+  if (value === null || value === undefined) return "";
+  if (BYTE_COLUMNS.has(column)) return formatBytes(value);
+  return String(value);
+}
+
+function formatBytes(value) {
+  const units = ["B", "KB", "MB", "GB"];
+  let size = Number(value);
+  let unit = 0;
+  while (size >= 1024 && unit < units.length - 1) {
+    size /= 1024;
+    unit += 1;
   }
+  return unit === 0 ? `${size} ${units[unit]}` : `${size.toFixed(1)} ${units[unit]}`;
+}
+
+function renderSteps(run) {
+  setVirtualItems(stepsTable, run.steps);
 }
 
 function statusClass(status) {
@@ -71,67 +213,30 @@ function statusClass(status) {
   return "status-pending";
 }
 
-function computeLayout(steps) {
-  const map = new Map(steps.map((s) => [s.step_name, s]));
-  const indegree = new Map();
-  const downstream = new Map();
-  for (const step of steps) {
-    indegree.set(step.step_name, 0);
-    downstream.set(step.step_name, []);
-  }
-  for (const step of steps) {
-    for (const dep of step.deps || []) {
-      if (!map.has(dep)) continue;
-      indegree.set(step.step_name, (indegree.get(step.step_name) || 0) + 1);
-      downstream.get(dep).push(step.step_name);
-    }
-  }
-  const queue = [];
-  for (const [name, deg] of indegree.entries()) {
-    if (deg === 0) queue.push(name);
-  }
-  const levels = new Map();
-  for (const name of queue) {
-    levels.set(name, 0);
-  }
-  while (queue.length) {
-    const node = queue.shift();
-    const nextLevel = (levels.get(node) || 0) + 1;
-    for (const child of downstream.get(node) || []) {
-      indegree.set(child, (indegree.get(child) || 1) - 1);
-      levels.set(child, Math.max(levels.get(child) || 0, nextLevel));
-      if (indegree.get(child) === 0) {
-        queue.push(child);
-      }
-    }
-  }
-
-  const grouped = new Map();
-  for (const step of steps) {
-    const level = levels.get(step.step_name) || 0;
-    if (!grouped.has(level)) grouped.set(level, []);
-    grouped.get(level).push(step.step_name);
-  }
-
-  const xGap = 220;
-  const yGap = 110;
-  const nodeW = 170;
-  const nodeH = 52;
+async function loadLayout(runName) {
+  const cached = layoutCache.get(runName);
+  if (cached) return cached;
+  const payload = await fetchJson(`/api/runs/${runName}/layout`);
   const positions = new Map();
-  let maxX = 0;
-  let maxY = 0;
-  const sortedLevels = [...grouped.keys()].sort((a, b) => a - b);
-  for (const level of sortedLevels) {
-    const nodes = grouped.get(level).sort();
-    nodes.forEach((name, idx) => {
-      const x = 40 + level * xGap;
-      const y = 30 + idx * yGap;
-      positions.set(name, { x, y, w: nodeW, h: nodeH });
-      maxX = Math.max(maxX, x + nodeW + 40);
-      maxY = Math.max(maxY, y + nodeH + 30);
-    });
+  const columnsByLevel = new Map();
+  for (const node of payload.nodes) {
+    positions.set(node.step_name, { x: node.x, y: node.y, w: payload.node_width, h: payload.node_height });
+    if (!columnsByLevel.has(node.level)) {
+      columnsByLevel.set(node.level, { level: node.level, x: node.x, nodes: [] });
+    }
+    columnsByLevel.get(node.level).nodes.push(node.step_name);
   }
-  return { positions, width: Math.max(800, maxX), height: Math.max(240, maxY) };
+  const layout = {
+    key: payload.fingerprint,
+    positions,
+    edges: payload.edges,
+    columns: [...columnsByLevel.values()].sort((a, b) => a.level - b.level),
+    nodeWidth: payload.node_width,
+    width: Math.max(800, payload.width),
+    height: Math.max(240, payload.height),
+  };
+  layoutCache.set(runName, layout);
+  return layout;
 }
 
 function edgeStyle(step, dep) {
@@ -147,155 +252,612 @@ function edgeStyle(step, dep) {
   return { stroke: "#6b7280", dash: "" };
 }
 
-function renderGraph(run) {
-  const steps = run.steps || [];
-  dagGraph.innerHTML = "";
-  if (!steps.length) {
-    return;
+function svgElement(tag, attributes = {}) {
+  const element = document.createElementNS(SVG_NS, tag);
+  for (const [name, value] of Object.entries(attributes)) {
+    element.setAttribute(name, String(value));
   }
-  const { positions, width, height } = computeLayout(steps);
-  dagGraph.setAttribute("viewBox", `0 0 ${width} ${height}`);
-
-  for (const step of steps) {
-    const target = positions.get(step.step_name);
-    for (const dep of step.deps || []) {
-      const source = positions.get(dep);
-      if (!source || !target) continue;
-      const style = edgeStyle(step, dep);
-      const line = document.createElementNS("http://www.w3.org/2000/svg", "line");
-      line.setAttribute("x1", String(source.x + source.w));
-      line.setAttribute("y1", String(source.y + source.h / 2));
-      line.setAttribute("x2", String(target.x));
-      line.setAttribute("y2", String(target.y + target.h / 2));
-      line.setAttribute("stroke", style.stroke);
-      line.setAttribute("stroke-width", "2");
-      if (style.dash) {
-        line.setAttribute("stroke-dasharray", style.dash);
-      }
-      dagGraph.appendChild(line);
-    }
+  return element;
+}
+
+function buildGraph(run, layout) {
+  const { positions, width, height } = layout;
+  const edgesLayer = svgElement("g", { class: "graph-edges" });
+  const nodesLayer = svgElement("g", { class: "graph-nodes" });
+  const clustersLayer = svgElement("g", { class: "graph-clusters" });
+  const nodes = new Map();
+
+  const stepsByName = new Map(run.steps.map((step) => [step.step_name, step]));
+  for (const edge of layout.edges) {
+    const step = stepsByName.get(edge.target);
+    if (!step) continue;
+    const style = edgeStyle(step, edge.source);
+    const line = svgElement("polyline", {
+      points: edge.points.map(([x, y]) => `${x},${y}`).join(" "),
+      fill: "none",
+      stroke: style.stroke,
+      "stroke-width": 2,
+    });
+    if (style.dash) line.setAttribute("stroke-dasharray", style.dash);
+    edgesLayer.appendChild(line);
   }
 
-  for (const step of steps) {
+  for (const step of run.steps) {
     const pos = positions.get(step.step_name);
     if (!pos) continue;
-
-    const group = document.createElementNS("http://www.w3.org/2000/svg", "g");
-    group.classList.add("graph-node");
-    if (selectedStep === step.step_name) group.classList.add("selected");
-    group.classList.add(statusClass(step.status));
-    if (step.disabled_self) group.classList.add("disabled");
-    group.addEventListener("click", () => selectStep(run.run_name, step.step_name));
-
-    const rect = document.createElementNS("http://www.w3.org/2000/svg", "rect");
-    rect.setAttribute("x", String(pos.x));
-    rect.setAttribute("y", String(pos.y));
-    rect.setAttribute("rx", "8");
-    rect.setAttribute("ry", "8");
-    rect.setAttribute("width", String(pos.w));
-    rect.setAttribute("height", String(pos.h));
-
-    const title = document.createElementNS("http://www.w3.org/2000/svg", "title");
-    const deps = (step.deps || []).join(", ");
-    title.textContent = `${step.step_name}\nstatus=${step.status}\ndeps=[${deps}]`;
-
-    const name = document.createElementNS("http://www.w3.org/2000/svg", "text");
-    name.setAttribute("x", String(pos.x + 10));
-    name.setAttribute("y", String(pos.y + 22));
+    const group = svgElement("g");
+    group.addEventListener("click", () => {
+      if (suppressGraphClick) return;
+      selectStep(currentRun.run_name, step.step_name);
+    });
+    const title = svgElement("title");
+    const rect = svgElement("rect", { x: pos.x, y: pos.y, rx: 8, ry: 8, width: pos.w, height: pos.h });
+    const name = svgElement("text", { x: pos.x + 10, y: pos.y + 22 });
     name.textContent = step.step_name;
+    const status = svgElement("text", { x: pos.x + 10, y: pos.y + 40 });
+    group.append(title, rect, name, status);
+    nodesLayer.appendChild(group);
+    const node = { group, title, status, signature: "" };
+    nodes.set(step.step_name, node);
+    patchGraphNode(node, step);
+  }
 
-    const status = document.createElementNS("http://www.w3.org/2000/svg", "text");
-    status.setAttribute("x", String(pos.x + 10));
-    status.setAttribute("y", String(pos.y + 40));
-    status.textContent = step.status;
+  dagGraph.replaceChildren(edgesLayer, nodesLayer, clustersLayer);
+  graphView = {
+    key: layout.key,
+    layout,
+    nodes,
+    clustersLayer,
+    box: { x: 0, y: 0, w: width, h: height },
+    lod: "",
+  };
+  applyViewBox();
+}
+
+function patchGraphNode(node, step) {
+  const signature = `${step.status}|${step.disabled_self}|${selectedStep === step.step_name}`;
+  if (node.signature === signature) return;
+  node.signature = signature;
+  const classes = ["graph-node", statusClass(step.status)];
+  if (selectedStep === step.step_name) classes.push("selected");
+  if (step.disabled_self) classes.push("disabled");
+  node.group.setAttribute("class", classes.join(" "));
+  node.status.textContent = step.status;
+  const deps = (step.deps || []).join(", ");
+  node.title.textContent = `${step.step_name}\nstatus=${step.status}\ndeps=[${deps}]`;
+}
 
+function renderClusters() {
+  const { layout, clustersLayer } = graphView;
+  const stepsByName = new Map(currentRun.steps.map((step) => [step.step_name, step]));
+  const height = Math.max(52, layout.height - 60);
+  const fragment = document.createDocumentFragment();
+  for (const column of layout.columns) {
+    const counts = {};
+    for (const name of column.nodes) {
+      const status = stepsByName.get(name)?.status || "pending";
+      counts[status] = (counts[status] || 0) + 1;
+    }
+    const group = svgElement("g", { class: "graph-cluster" });
+    const title = svgElement("title");
+    title.textContent = `level ${column.level}: ${column.nodes.length} steps\n${Object.entries(counts)
+      .map(([status, count]) => `${status}=${count}`)
+      .join("\n")}`;
     group.appendChild(title);
-    group.appendChild(rect);
-    group.appendChild(name);
-    group.appendChild(status);
-    dagGraph.appendChild(group);
+    let y = 30;
+    for (const status of ["failed", "running", "pending", "skipped", "done"]) {
+      if (!counts[status]) continue;
+      const segment = (counts[status] / column.nodes.length) * height;
+      group.appendChild(
+        svgElement("rect", {
+          x: column.x,
+          y,
+          width: layout.nodeWidth,
+          height: segment,
+          class: statusClass(status),
+        }),
+      );
+      y += segment;
+    }
+    fragment.appendChild(group);
+  }
+  clustersLayer.replaceChildren(fragment);
+}
+
+function applyViewBox() {
+  if (!graphView) return;
+  const { box } = graphView;
+  dagGraph.setAttribute("viewBox", `${box.x} ${box.y} ${box.w} ${box.h}`);
+  const unitsPerPx = Math.max(
+    box.w / Math.max(1, dagGraph.clientWidth || 800),
+    box.h / Math.max(1, dagGraph.clientHeight || 480),
+  );
+  let lod = "detail";
+  if (unitsPerPx > LOD_CLUSTER_UNITS_PER_PX && currentRun.steps.length >= LOD_CLUSTER_MIN_STEPS) {
+    lod = "cluster";
+  } else if (unitsPerPx > LOD_LABELS_UNITS_PER_PX) {
+    lod = "compact";
+  }
+  if (lod !== graphView.lod) {
+    graphView.lod = lod;
+    dagGraph.setAttribute("class", `lod-${lod}`);
   }
+  if (lod === "cluster") renderClusters();
 }
 
+function renderGraph(run, layout) {
+  if (!run.steps.length || !layout) {
+    dagGraph.replaceChildren();
+    graphView = null;
+    return;
+  }
+  if (!graphView || graphView.key !== layout.key || graphView.layout !== layout) {
+    buildGraph(run, layout);
+    return;
+  }
+  for (const step of run.steps) {
+    const node = graphView.nodes.get(step.step_name);
+    if (node) patchGraphNode(node, step);
+  }
+  if (graphView.lod === "cluster") renderClusters();
+}
+
+function graphPoint(event) {
+  const rect = dagGraph.getBoundingClientRect();
+  const { box } = graphView;
+  return {
+    x: box.x + ((event.clientX - rect.left) / Math.max(1, rect.width)) * box.w,
+    y: box.y + ((event.clientY - rect.top) / Math.max(1, rect.height)) * box.h,
+  };
+}
+
+dagGraph.addEventListener(
+  "wheel",
+  (event) => {
+    if (!graphView) return;
+    event.preventDefault();
+    const { box, layout } = graphView;
+    const point = graphPoint(event);
+    const factor = event.deltaY > 0 ? 1.2 : 1 / 1.2;
+    const maxW = Math.max(layout.width, layout.height) * 2;
+    const w = Math.min(maxW, Math.max(200, box.w * factor));
+    const scale = w / box.w;
+    graphView.box = {
+      x: point.x - (point.x - box.x) * scale,
+      y: point.y - (point.y - box.y) * scale,
+      w,
+      h: box.h * scale,
+    };
+    applyViewBox();
+  },
+  { passive: false },
+);
+
+let graphDrag = null;
+dagGraph.addEventListener("pointerdown", (event) => {
+  suppressGraphClick = false;
+  if (!graphView || event.button !== 0) return;
+  graphDrag = { x: event.clientX, y: event.clientY, box: { ...graphView.box }, moved: false };
+});
+window.addEventListener("pointermove", (event) => {
+  if (!graphDrag || !graphView) return;
+  const rect = dagGraph.getBoundingClientRect();
+  const dx = ((event.clientX - graphDrag.x) / Math.max(1, rect.width)) * graphDrag.box.w;
+  const dy = ((event.clientY - graphDrag.y) / Math.max(1, rect.height)) * graphDrag.box.h;
+  if (Math.abs(event.clientX - graphDrag.x) + Math.abs(event.clientY - graphDrag.y) > 3) {
+    graphDrag.moved = true;
+  }
+  graphView.box = { ...graphDrag.box, x: graphDrag.box.x - dx, y: graphDrag.box.y - dy };
+  applyViewBox();
+});
+window.addEventListener("pointerup", () => {
+  suppressGraphClick = Boolean(graphDrag && graphDrag.moved);
+  graphDrag = null;
+});
+
 async function loadRun(runName) {
-  const run = await fetchJson(`/api/runs/${runName}`);
+  const [run, layout] = await Promise.all([
+    fetchJson(`/api/runs/${runName}?fields=${RUN_STEP_FIELDS}`),
+    loadLayout(runName),
+  ]);
+  if (runName !== watchedRun) {
+    watchRun(runName);
+  }
+  if (runName !== selectedRun) {
+    stepRowCache.clear();
+  }
   selectedRun = runName;
+  currentRun = run;
   if (selectedStep && !run.steps.some((s) => s.step_name === selectedStep)) {
     selectedStep = null;
   }
   renderRunMeta(run);
-  renderGraph(run);
+  renderGraph(run, layout);
   renderSteps(run);
+  renderGantt(run);
   if (selectedStep) {
     await loadStepRows(run.run_name, selectedStep);
   }
 }
 
-async function loadStepRows(runName, stepName) {
-  const rows = await fetchJson(`/api/runs/${runName}/steps/${stepName}/rows?limit=100&offset=0`);
-  renderStepRowsTable(stepName, rows);
+function watchRun(runName) {
+  if (runEvents) {
+    runEvents.close();
+    runEvents = null;
+  }
+  watchedRun = runName;
+  if (!window.EventSource) return;
+  const source = new EventSource(`/api/runs/${runName}/events`);
+  source.addEventListener("steps", (event) => {
+    if (selectedRun === runName) applyStepChanges(JSON.parse(event.data));
+  });
+  source.addEventListener("end", () => {
+    source.close();
+    if (runEvents === source) runEvents = null;
+    if (selectedRun === runName && selectedStep) {
+      loadStepRows(runName, selectedStep).catch(() => {});
+    }
+  });
+  runEvents = source;
 }
 
-async function selectStep(runName, stepName) {
-  selectedStep = stepName;
-  await loadRun(runName);
+function applyStepChanges(changes) {
+  if (!currentRun) return;
+  const stepsByName = new Map(currentRun.steps.map((step) => [step.step_name, step]));
+  let selectedChanged = false;
+  for (const change of changes) {
+    const step = stepsByName.get(change.step_name);
+    if (!step) continue;
+    Object.assign(step, change);
+    const node = graphView && graphView.nodes.get(step.step_name);
+    if (node) patchGraphNode(node, step);
+    const row = stepRowCache.get(step.step_name);
+    if (row) patchStepRow(row, step);
+    if (change.step_name === selectedStep) selectedChanged = true;
+  }
+  if (graphView && graphView.lod === "cluster") renderClusters();
+  renderGantt(currentRun);
+  if (selectedChanged) {
+    loadStepRows(currentRun.run_name, selectedStep).catch(() => {});
+  }
 }
 
-function renderStepRowsTable(stepName, page) {
-  stepRowsMeta.textContent = `${stepName}: ${page.total_rows} rows (showing ${page.rows.length}, offset ${page.offset})`;
-  stepRowsTableHead.innerHTML = "";
-  stepRowsTableBody.innerHTML = "";
+function parseUtc(value) {
+  return Date.parse(`${value.replace(" ", "T")}Z`);
+}
 
-  const rows = page.rows || [];
-  if (!rows.length) {
-    const tr = document.createElement("tr");
-    tr.innerHTML = `<td colspan="2">No rows</td>`;
-    stepRowsTableBody.appendChild(tr);
+function renderGantt(run) {
+  traceLink.href = `/api/runs/${run.run_name}/trace`;
+  traceLink.download = `${run.run_name}.trace.json`;
+  const bars = run.steps
+    .filter((step) => step.started_at_utc)
+    .map((step) => {
+      const start = parseUtc(step.started_at_utc);
+      return {
+        step,
+        lane: step.worker || "main",
+        ready: step.ready_at_utc ? parseUtc(step.ready_at_utc) : start,
+        start,
+        end: step.finished_at_utc ? parseUtc(step.finished_at_utc) : Date.now(),
+      };
+    });
+  if (!bars.length) {
+    gantt.replaceChildren();
+    gantt.setAttribute("height", "0");
+    return;
+  }
+  const origin = bars.reduce((min, bar) => Math.min(min, bar.ready), Infinity);
+  const last = bars.reduce((max, bar) => Math.max(max, bar.end), -Infinity);
+  const lanes = [...new Set(bars.map((bar) => bar.lane))].sort();
+  const laneIndex = new Map(lanes.map((lane, idx) => [lane, idx]));
+  const width = ganttWrap.clientWidth || 800;
+  const height = lanes.length * GANTT_LANE_HEIGHT + 24;
+  const scale = (width - GANTT_LABEL_WIDTH - 12) / Math.max(1, last - origin);
+  const x = (time) => GANTT_LABEL_WIDTH + (time - origin) * scale;
+  gantt.setAttribute("viewBox", `0 0 ${width} ${height}`);
+  gantt.setAttribute("height", String(height));
+  const children = lanes.map((lane, idx) =>
+    svgElement("text", { class: "gantt-lane", x: 4, y: idx * GANTT_LANE_HEIGHT + 15 })
+  );
+  children.forEach((label, idx) => {
+    label.textContent = lanes[idx];
+  });
+  for (const bar of bars) {
+    const y = laneIndex.get(bar.lane) * GANTT_LANE_HEIGHT + 3;
+    if (bar.start > bar.ready) {
+      children.push(
+        svgElement("rect", {
+          class: "gantt-wait",
+          x: x(bar.ready),
+          y: y + 5,
+          width: Math.max(1, (bar.start - bar.ready) * scale),
+          height: GANTT_LANE_HEIGHT - 16,
+        })
+      );
+    }
+    const rect = svgElement("rect", {
+      class: `gantt-bar ${statusClass(bar.step.status)}${bar.step.step_name === selectedStep ? " selected" : ""}`,
+      x: x(bar.start),
+      y,
+      width: Math.max(1, (bar.end - bar.start) * scale),
+      height: GANTT_LANE_HEIGHT - 6,
+    });
+    const title = svgElement("title");
+    title.textContent = `${bar.step.step_name} (${bar.step.status})\n${bar.lane}\nrun ${(
+      bar.end - bar.start
+    ).toFixed(1)} ms, waited ${(bar.start - bar.ready).toFixed(1)} ms`;
+    rect.appendChild(title);
+    rect.addEventListener("click", () => selectStep(run.run_name, bar.step.step_name));
+    children.push(rect);
+  }
+  const total = svgElement("text", { class: "gantt-axis", x: width - 8, y: height - 6 });
+  total.textContent = `${(last - origin).toFixed(1)} ms`;
+  children.push(total);
+  gantt.replaceChildren(...children);
+}
+
+function rowsUrl(state) {
+  const params = new URLSearchParams({ limit: String(ROWS_PAGE_SIZE) });
+  if (state.nextAfter !== null) params.set("after_row_id", String(state.nextAfter));
+  return `/api/runs/${state.runName}/steps/${state.stepName}/rows?${params}`;
+}
+
+function renderRowPipeline(stepName) {
+  const step = currentRun && currentRun.steps.find((item) => item.step_name === stepName);
+  const telemetry = step && step.row_telemetry;
+  if (!telemetry) {
+    rowPipelineMeta.textContent = "";
+    return;
+  }
+  const latency = ["p50_ms", "p95_ms", "p99_ms"]
+    .map((key) => `${key.slice(0, 3)} ${telemetry[key] ?? "-"} ms`)
+    .join(", ");
+  rowPipelineMeta.textContent =
+    `Row pipeline: ${telemetry.rows} rows, per-row ${latency}; ` +
+    `queues (size ${telemetry.queue_size}) in max ${telemetry.in_depth_max}, out max ${telemetry.out_depth_max}; ` +
+    `producer blocked ${telemetry.producer_blocked_ms} ms, worker starved ${telemetry.worker_starved_ms} ms, ` +
+    `worker blocked ${telemetry.worker_blocked_ms} ms`;
+}
+
+async function loadStepRows(runName, stepName) {
+  renderRowPipeline(stepName);
+  loadStepProfile(runName, stepName).catch(() => {
+    profileSection.hidden = true;
+  });
+  const state = { runName, stepName, rows: [], columns: ["row_id"], total: 0, nextAfter: null, loading: true };
+  stepRowsState = state;
+  let page;
+  let stats;
+  try {
+    [page, stats] = await Promise.all([
+      fetchJson(rowsUrl(state)),
+      fetchJson(`/api/runs/${runName}/steps/${stepName}/stats`),
+    ]);
+  } catch (err) {
+    if (stepRowsState !== state || err.status !== 409) throw err;
+    stepRowsMeta.textContent = `${stepName}: rows available when the run finishes`;
+    stepRowsTableBody.replaceChildren();
     return;
   }
+  if (stepRowsState !== state) return;
+  renderStepStats(stats);
+  stepRowsScroll.scrollTop = 0;
+  appendStepRows(state, page);
+}
 
-  const columnSet = new Set(["row_id"]);
-  for (const row of rows) {
+async function loadMoreStepRows() {
+  const state = stepRowsState;
+  if (!state || state.loading || state.nextAfter === null) return;
+  state.loading = true;
+  const page = await fetchJson(rowsUrl(state));
+  if (stepRowsState === state) appendStepRows(state, page);
+}
+
+function appendStepRows(state, page) {
+  state.loading = false;
+  state.total = page.total_rows;
+  state.nextAfter = page.next_after_row_id ?? null;
+  const known = new Set(state.columns);
+  let columnsChanged = !state.rows.length;
+  for (const row of page.rows || []) {
     const payload = row.payload;
-    if (payload && typeof payload === "object" && !Array.isArray(payload)) {
-      for (const key of Object.keys(payload)) {
-        columnSet.add(key);
+    const keys =
+      payload && typeof payload === "object" && !Array.isArray(payload) ? Object.keys(payload) : ["payload"];
+    for (const key of keys) {
+      if (!known.has(key)) {
+        known.add(key);
+        state.columns.push(key);
+        columnsChanged = true;
       }
-    } else {
-      columnSet.add("payload");
     }
+    state.rows.push(row);
+  }
+  stepRowsMeta.textContent = `${state.stepName}: ${state.total} rows (loaded ${state.rows.length})`;
+  if (columnsChanged) renderStepRowsHead(state);
+  if (!state.rows.length) {
+    const tr = document.createElement("tr");
+    tr.innerHTML = `<td colspan="2">No rows</td>`;
+    stepRowsTableBody.replaceChildren(tr);
+    return;
   }
-  const columns = Array.from(columnSet);
+  stepRowsTable.onNearEnd = () => {
+    loadMoreStepRows().catch(() => {});
+  };
+  setVirtualItems(stepRowsTable, state.rows, state.columns.length);
+}
 
+function renderStepRowsHead(state) {
   const headRow = document.createElement("tr");
-  for (const col of columns) {
+  for (const col of state.columns) {
     const th = document.createElement("th");
     th.textContent = col;
     headRow.appendChild(th);
   }
-  stepRowsTableHead.appendChild(headRow);
+  stepRowsTableHead.replaceChildren(headRow);
+}
 
-  for (const row of rows) {
+function dataRow(row) {
+  const tr = document.createElement("tr");
+  const payload = row.payload;
+  const isRecord = payload && typeof payload === "object" && !Array.isArray(payload);
+  for (const col of stepRowsState.columns) {
+    const td = document.createElement("td");
+    let value;
+    if (col === "row_id") {
+      value = row.row_id;
+    } else if (!isRecord) {
+      value = col === "payload" ? JSON.stringify(payload) : undefined;
+    } else {
+      value = payload[col];
+    }
+    td.textContent = value === undefined || value === null ? "" : formatStatValue(value);
+    tr.appendChild(td);
+  }
+  return tr;
+}
+
+function formatStatValue(value) {
+  if (value === null || value === undefined) return "";
+  return typeof value === "object" ? JSON.stringify(value) : String(value);
+}
+
+function renderStepStats(stats) {
+  stepStatsTableHead.innerHTML = "";
+  stepStatsTableBody.innerHTML = "";
+  const columns = stats.columns || [];
+  if (!columns.length) {
+    stepStatsMeta.textContent = "";
+    return;
+  }
+  stepStatsMeta.textContent = `${stats.row_count ?? "?"} rows produced, ${stats.stored_rows} stored (sampled); exact column stats:`;
+  const headRow = document.createElement("tr");
+  for (const label of ["Column", "Values", "Nulls", "Min", "Max", "Distinct (est.)"]) {
+    const th = document.createElement("th");
+    th.textContent = label;
+    headRow.appendChild(th);
+  }
+  stepStatsTableHead.appendChild(headRow);
+  for (const column of columns) {
     const tr = document.createElement("tr");
-    const payload = row.payload;
-    for (const col of columns) {
+    for (const value of [
+      column.column_name,
+      column.value_count,
+      column.null_count,
+      column.min_value,
+      column.max_value,
+      column.distinct_estimate,
+    ]) {
       const td = document.createElement("td");
-      if (col === "row_id") {
-        td.textContent = String(row.row_id ?? "");
-      } else if (col === "payload") {
-        td.textContent = JSON.stringify(payload);
-      } else if (payload && typeof payload === "object" && !Array.isArray(payload)) {
-        const value = payload[col];
-        td.textContent = value === undefined ? "" : String(value);
-      } else {
-        td.textContent = "";
-      }
+      td.textContent = formatStatValue(value);
       tr.appendChild(td);
     }
-    stepRowsTableBody.appendChild(tr);
+    stepStatsTableBody.appendChild(tr);
   }
 }
 
+const FLAME_FRAME_HEIGHT = 18;
+const FLAME_MIN_WIDTH = 0.002;
+let profileState = null;
+
+async function loadStepProfile(runName, stepName) {
+  const state = { runName, stepName, tree: null };
+  profileState = state;
+  profileSection.hidden = true;
+  const profile = await fetchJson(`/api/runs/${runName}/steps/${stepName}/profile`);
+  if (profileState !== state) return;
+  state.tree = buildFlameTree(profile.stacks || []);
+  profileMeta.textContent = `${stepName}: ${profile.mode} profile, ${profile.samples} ${
+    profile.mode === "sampling" ? "samples" : "calls"
+  }`;
+  profileSection.hidden = false;
+  renderFlamegraph(state.tree);
+  renderProfileTable(profile.functions || []);
+}
+
+function buildFlameTree(stacks) {
+  const root = { name: "all", value: 0, children: new Map(), parent: null };
+  for (const { stack, ms } of stacks) {
+    let node = root;
+    root.value += ms;
+    for (const frame of stack.split(";")) {
+      let child = node.children.get(frame);
+      if (!child) {
+        child = { name: frame, value: 0, children: new Map(), parent: node };
+        node.children.set(frame, child);
+      }
+      child.value += ms;
+      node = child;
+    }
+  }
+  return root;
+}
+
+function renderFlamegraph(focus) {
+  const frames = [];
+  let depth = 0;
+  for (let node = focus; node.parent; node = node.parent) depth += 1;
+  const ancestors = [];
+  for (let node = focus.parent; node; node = node.parent) ancestors.unshift(node);
+  ancestors.forEach((node, level) => frames.push({ node, level, x: 0, width: 1 }));
+  const total = focus.value || 1;
+  const visit = (node, level, x) => {
+    const width = node.value / total;
+    if (width < FLAME_MIN_WIDTH) return;
+    frames.push({ node, level, x, width });
+    let offset = x;
+    for (const child of [...node.children.values()].sort((a, b) => b.value - a.value)) {
+      visit(child, level + 1, offset);
+      offset += child.value / total;
+    }
+  };
+  visit(focus, depth, 0);
+  const maxLevel = frames.reduce((max, frame) => Math.max(max, frame.level), 0);
+  flamegraph.style.height = `${(maxLevel + 1) * FLAME_FRAME_HEIGHT}px`;
+  flamegraph.replaceChildren(
+    ...frames.map(({ node, level, x, width }) => {
+      const div = document.createElement("div");
+      div.className = node === focus ? "flame-frame focus" : "flame-frame";
+      div.style.left = `${x * 100}%`;
+      div.style.width = `${width * 100}%`;
+      div.style.top = `${level * FLAME_FRAME_HEIGHT}px`;
+      div.textContent = node.name;
+      const share = profileState && profileState.tree.value ? (node.value / profileState.tree.value) * 100 : 0;
+      div.title = `${node.name}\n${node.value.toFixed(2)} ms (${share.toFixed(1)}%)`;
+      div.addEventListener("click", () => renderFlamegraph(node.parent ? node : profileState.tree));
+      return div;
+    })
+  );
+}
+
+function renderProfileTable(functions) {
+  profileTableBody.replaceChildren(
+    ...functions.map((item) => {
+      const tr = document.createElement("tr");
+      for (const value of [item.name, item.calls ?? "-", item.self_ms.toFixed(2), item.total_ms.toFixed(2)]) {
+        const td = document.createElement("td");
+        td.textContent = String(value);
+        tr.appendChild(td);
+      }
+      return tr;
+    })
+  );
+}
+
+async function selectStep(runName, stepName) {
+  selectedStep = stepName;
+  if (!currentRun || currentRun.run_name !== runName) {
+    await loadRun(runName);
+    return;
+  }
+  renderGraph(currentRun, graphView && graphView.layout);
+  renderGantt(currentRun);
+  for (const step of currentRun.steps) {
+    const row = stepRowCache.get(step.step_name);
+    if (row) patchStepRow(row, step);
+  }
+  await loadStepRows(runName, stepName);
+}
+
 async function loadRuns() {
   const runs = await fetchJson("/api/runs");
   renderRuns(runs);
@@ -310,12 +872,6 @@ refreshRunsBtn.addEventListener("click", () => {
   });
 });
 
-setInterval(() => {
-  if (selectedRun) {
-    loadRun(selectedRun).catch(() => {});
-  }
-}, 2000);
-
 loadRuns().catch((err) => {
   runMeta.textContent = String(err);
 });
@@ -1,35 +1,244 @@
 from __future__ import annotations
 
-from typing import Mapping
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import threading
+from typing import Mapping, Sequence
 
 from ninout.core.engine.models import Step
-from ninout.core.engine.validate import levels, topological_order
+
+_X_GAP = 200
+_Y_GAP = 120
+_NODE_W = 140
+_NODE_H = 48
+_MARGIN = 40
+_SWEEPS = 6
+_LAYOUT_JSON_CACHE_SIZE = 64
+
+_layout_json_cache: OrderedDict[str, str] = OrderedDict()
+_layout_json_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class DagLayout:
+    positions: dict[str, tuple[int, int]]
+    levels: dict[str, int]
+    edges: list[tuple[str, str, list[tuple[int, int]]]]
+    width: int
+    height: int
+    node_width: int = _NODE_W
+    node_height: int = _NODE_H
+
+
+def dag_fingerprint(deps: Mapping[str, Sequence[str]]) -> str:
+    canonical = json.dumps(
+        sorted((name, sorted(step_deps)) for name, step_deps in deps.items()),
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def _node_levels(deps: Mapping[str, Sequence[str]]) -> dict[str, int]:
+    indegree = {name: 0 for name in deps}
+    downstream: dict[str, list[str]] = {name: [] for name in deps}
+    for name, step_deps in deps.items():
+        for dep in step_deps:
+            if dep in downstream:
+                indegree[name] += 1
+                downstream[dep].append(name)
+    queue = [name for name, degree in indegree.items() if degree == 0]
+    level = {name: 0 for name in queue}
+    for node in queue:
+        for child in downstream[node]:
+            level[child] = max(level.get(child, 0), level[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+    if len(queue) != len(deps):
+        raise ValueError("Ciclo detectado no grafo")
+    return level
+
+
+def _count_crossings(
+    lower: list[int],
+    preds: list[list[int]],
+    index: list[int],
+) -> int:
+    pairs = sorted(
+        (index[source], index[target]) for target in lower for source in preds[target]
+    )
+    seen: list[int] = []
+    crossings = 0
+    for _source, target in pairs:
+        crossings += len(seen) - bisect_right(seen, target)
+        seen.insert(bisect_right(seen, target), target)
+    return crossings
+
+
+def _order_layers(
+    layers: list[list[int]],
+    preds: list[list[int]],
+    succs: list[list[int]],
+    sweeps: int,
+) -> list[list[int]]:
+    index = [0] * len(preds)
+
+    def reindex(layer: list[int]) -> None:
+        for position, node in enumerate(layer):
+            index[node] = position
+
+    def total_crossings() -> int:
+        return sum(
+            _count_crossings(layers[lvl], preds, index)
+            for lvl in range(1, len(layers))
+        )
+
+    def reorder(layer: list[int], neighbours: list[list[int]]) -> list[int]:
+        def barycenter(node: int) -> float:
+            linked = neighbours[node]
+            if not linked:
+                return float(index[node])
+            return sum(index[other] for other in linked) / len(linked)
+
+        return sorted(layer, key=lambda node: (barycenter(node), index[node]))
+
+    for layer in layers:
+        reindex(layer)
+    best = [list(layer) for layer in layers]
+    best_crossings = total_crossings()
+    for sweep in range(sweeps):
+        if best_crossings == 0:
+            break
+        if sweep % 2 == 0:
+            for lvl in range(1, len(layers)):
+                layers[lvl] = reorder(layers[lvl], preds)
+                reindex(layers[lvl])
+        else:
+            for lvl in range(len(layers) - 2, -1, -1):
+                layers[lvl] = reorder(layers[lvl], succs)
+                reindex(layers[lvl])
+        crossings = total_crossings()
+        if crossings < best_crossings:
+            best = [list(layer) for layer in layers]
+            best_crossings = crossings
+    return best
+
+
+def compute_layout(deps: Mapping[str, Sequence[str]], sweeps: int = _SWEEPS) -> DagLayout:
+    level = _node_levels(deps)
+    names = sorted(deps)
+    ids = {name: idx for idx, name in enumerate(names)}
+    node_level = [level[name] for name in names]
+    preds: list[list[int]] = [[] for _ in names]
+    succs: list[list[int]] = [[] for _ in names]
+    chains: list[tuple[str, str, list[int]]] = []
+
+    for name in names:
+        for dep in sorted(set(deps[name])):
+            if dep not in ids:
+                continue
+            chain: list[int] = []
+            previous = ids[dep]
+            for lvl in range(level[dep] + 1, level[name]):
+                dummy = len(node_level)
+                node_level.append(lvl)
+                preds.append([previous])
+                succs.append([])
+                succs[previous].append(dummy)
+                chain.append(dummy)
+                previous = dummy
+            preds[ids[name]].append(previous)
+            succs[previous].append(ids[name])
+            chains.append((dep, name, chain))
+
+    layers: list[list[int]] = [[] for _ in range(max(node_level, default=-1) + 1)]
+    for node, lvl in enumerate(node_level):
+        layers[lvl].append(node)
+    layers = _order_layers(layers, preds, succs, sweeps)
+
+    coords: list[tuple[int, int]] = [(0, 0)] * len(node_level)
+    width = 0
+    height = 0
+    for lvl, layer in enumerate(layers):
+        for position, node in enumerate(layer):
+            x = _MARGIN + lvl * _X_GAP
+            y = _MARGIN + position * _Y_GAP
+            coords[node] = (x, y)
+            width = max(width, x + _NODE_W + _MARGIN)
+            height = max(height, y + _NODE_H + _MARGIN)
+
+    edges: list[tuple[str, str, list[tuple[int, int]]]] = []
+    mid = _NODE_H // 2
+    for dep, name, chain in chains:
+        source_x, source_y = coords[ids[dep]]
+        points = [(source_x + _NODE_W, source_y + mid)]
+        for dummy in chain:
+            dummy_x, dummy_y = coords[dummy]
+            points.extend([(dummy_x, dummy_y + mid), (dummy_x + _NODE_W, dummy_y + mid)])
+        target_x, target_y = coords[ids[name]]
+        points.append((target_x, target_y + mid))
+        edges.append((dep, name, points))
+
+    return DagLayout(
+        positions={name: coords[ids[name]] for name in names},
+        levels=dict(level),
+        edges=edges,
+        width=width,
+        height=height,
+    )
+
+
+def layout_to_json(layout: DagLayout) -> str:
+    return json.dumps(
+        {
+            "positions": layout.positions,
+            "levels": layout.levels,
+            "edges": layout.edges,
+            "width": layout.width,
+            "height": layout.height,
+            "node_width": layout.node_width,
+            "node_height": layout.node_height,
+        },
+        separators=(",", ":"),
+    )
+
+
+def cached_layout_json(deps: Mapping[str, Sequence[str]]) -> tuple[str, str]:
+    fingerprint = dag_fingerprint(deps)
+    with _layout_json_lock:
+        payload = _layout_json_cache.get(fingerprint)
+        if payload is not None:
+            _layout_json_cache.move_to_end(fingerprint)
+            return fingerprint, payload
+    payload = layout_to_json(compute_layout(deps))
+    with _layout_json_lock:
+        _layout_json_cache[fingerprint] = payload
+        while len(_layout_json_cache) > _LAYOUT_JSON_CACHE_SIZE:
+            _layout_json_cache.popitem(last=False)
+    return fingerprint, payload
+
+
+def layout_from_json(payload: str) -> DagLayout:
+    data = json.loads(payload)
+    return DagLayout(
+        positions={name: (int(x), int(y)) for name, (x, y) in data["positions"].items()},
+        levels={name: int(lvl) for name, lvl in data["levels"].items()},
+        edges=[
+            (str(source), str(target), [(int(x), int(y)) for x, y in points])
+            for source, target, points in data["edges"]
+        ],
+        width=int(data["width"]),
+        height=int(data["height"]),
+        node_width=int(data["node_width"]),
+        node_height=int(data["node_height"]),
+    )
 
 
 def layout_positions(
     steps: Mapping[str, Step],
 ) -> tuple[Mapping[str, tuple[int, int]], int, int]:
-    order = topological_order(steps)
-    level = levels(steps, order)
-    grouped: dict[int, list[str]] = {}
-    for name, lvl in level.items():
-        grouped.setdefault(lvl, []).append(name)
-
-    x_gap = 200
-    y_gap = 120
-    node_w = 140
-    node_h = 48
-
-    positions: dict[str, tuple[int, int]] = {}
-    max_y = 0
-    max_x = 0
-    for lvl in sorted(grouped):
-        nodes = grouped[lvl]
-        for idx, name in enumerate(nodes):
-            x = 40 + lvl * x_gap
-            y = 40 + idx * y_gap
-            positions[name] = (x, y)
-            max_x = max(max_x, x + node_w + 40)
-            max_y = max(max_y, y + node_h + 40)
-
-    return positions, max_x, max_y
+    layout = compute_layout({name: step.deps for name, step in steps.items()})
+    return layout.positions, layout.width, layout.height
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-import inspect
+from datetime import date, datetime, timezone
+from itertools import count
 import json
+import os
 import re
-from typing import Mapping
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping
 
+from ninout.core.engine.metrics import RunStats
 from ninout.core.engine.models import Step
+from ninout.core.engine.profiling import StepProfile
+from ninout.core.ui._util import safe_source
+from ninout.core.ui.layout import cached_layout_json
+
+
+_PARQUET_OPTIONS = "FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE 100000"
+_PARQUET_PART_ROWS = 100_000
+_PARQUET_FLUSH_S = 5.0
+_METADATA_TABLES = {"step_definition", "step_runtime", "step_stats", "step_profile"}
 
 
 def _table_name_for_step(step_name: str) -> str:
@@ -15,18 +31,17 @@ def _table_name_for_step(step_name: str) -> str:
         normalized = "step"
     if normalized[0].isdigit():
         normalized = f"s_{normalized}"
-    return f"step_{normalized}"
+    table_name = f"step_{normalized}"
+    if table_name in _METADATA_TABLES:
+        return f"{table_name}_rows"
+    return table_name
 
 
-def _to_payload(value: object) -> str:
-    return json.dumps(value, ensure_ascii=False, default=str)
+_PAYLOAD_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str)
 
 
-def _safe_source(func: object) -> str:
-    try:
-        return inspect.getsource(func).rstrip()
-    except OSError:
-        return "# Codigo fonte indisponivel"
+def _to_payload(value: object) -> str:
+    return _PAYLOAD_ENCODER.encode(value)
 
 
 def _rows_for_result(value: object) -> list[tuple[int, str]]:
@@ -37,6 +52,577 @@ def _rows_for_result(value: object) -> list[tuple[int, str]]:
     return [(1, _to_payload(value))]
 
 
+_SCHEMA_SAMPLE_SIZE = 1000
+_OVERFLOW_COLUMN = "_overflow_json"
+_PAYLOAD_COLUMN = "_payload_json"
+_ABSENT_COLUMN = "_absent_json"
+_RESERVED_COLUMNS = {"row_id", _OVERFLOW_COLUMN, _PAYLOAD_COLUMN, _ABSENT_COLUMN}
+_TYPE_WIDENING = {
+    frozenset({"DATE", "TIMESTAMP"}): "TIMESTAMP",
+}
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _value_type(value: object) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "BIGINT" if -(2**63) <= value < 2**63 else "JSON"
+    if isinstance(value, float):
+        return "DOUBLE"
+    if isinstance(value, str):
+        return "VARCHAR"
+    if isinstance(value, datetime):
+        return "TIMESTAMP" if value.tzinfo is None else "VARCHAR"
+    if isinstance(value, date):
+        return "DATE"
+    if isinstance(value, (dict, list, tuple)):
+        return "JSON"
+    return "VARCHAR"
+
+
+def _widen_type(current: str | None, incoming: str | None) -> str | None:
+    if current is None:
+        return incoming
+    if incoming is None or incoming == current:
+        return current
+    return _TYPE_WIDENING.get(frozenset({current, incoming}), "JSON")
+
+
+def _result_records(value: object) -> list[object]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _infer_schema(
+    records: list[object],
+    sample_size: int = _SCHEMA_SAMPLE_SIZE,
+) -> dict[str, str]:
+    types: dict[str, str | None] = {}
+    lowered: set[str] = {name.lower() for name in _RESERVED_COLUMNS}
+    for record in records[:sample_size]:
+        if not isinstance(record, dict):
+            continue
+        for key, item in record.items():
+            if not isinstance(key, str) or not key:
+                continue
+            if key not in types:
+                if key.lower() in lowered:
+                    continue
+                lowered.add(key.lower())
+                types[key] = None
+            types[key] = _widen_type(types[key], _value_type(item))
+    return {key: column_type or "JSON" for key, column_type in types.items()}
+
+
+def _split_record(record: object, schema: Mapping[str, str]) -> dict[str, object]:
+    if not isinstance(record, dict):
+        return {_PAYLOAD_COLUMN: record}
+    staged: dict[str, object] = {}
+    overflow: dict[object, object] = {}
+    present = 0
+    for key, item in record.items():
+        column_type = schema.get(key) if isinstance(key, str) else None
+        if column_type is not None:
+            present += 1
+        if column_type is not None and (
+            item is None or _widen_type(column_type, _value_type(item)) == column_type
+        ):
+            staged[key] = item
+        else:
+            overflow[key] = item
+    if overflow:
+        staged[_OVERFLOW_COLUMN] = overflow
+    if present < len(schema):
+        staged[_ABSENT_COLUMN] = [key for key in schema if key not in record]
+    return staged
+
+
+def _staged_lines(
+    records: list[object],
+    schema: Mapping[str, str],
+    row_ids: Iterable[int],
+) -> Iterable[str]:
+    for row_id, record in zip(row_ids, records):
+        staged = _split_record(record, schema)
+        staged["row_id"] = row_id
+        yield _to_payload(staged) + "\n"
+
+
+def _table_columns(schema: Mapping[str, str]) -> list[tuple[str, str]]:
+    return [
+        ("row_id", "BIGINT"),
+        *schema.items(),
+        (_OVERFLOW_COLUMN, "JSON"),
+        (_PAYLOAD_COLUMN, "JSON"),
+        (_ABSENT_COLUMN, "JSON"),
+    ]
+
+
+_STATS_COLUMNS = [
+    ("run_id", "VARCHAR"),
+    ("step_name", "VARCHAR"),
+    ("column_name", "VARCHAR"),
+    ("row_count", "BIGINT"),
+    ("value_count", "BIGINT"),
+    ("null_count", "BIGINT"),
+    ("min_json", "VARCHAR"),
+    ("max_json", "VARCHAR"),
+    ("distinct_estimate", "BIGINT"),
+]
+
+_PROFILE_COLUMNS = [
+    ("run_id", "VARCHAR"),
+    ("step_name", "VARCHAR"),
+    ("mode", "VARCHAR"),
+    ("samples", "BIGINT"),
+    ("kind", "VARCHAR"),
+    ("name", "VARCHAR"),
+    ("calls", "BIGINT"),
+    ("self_ms", "DOUBLE"),
+    ("total_ms", "DOUBLE"),
+]
+
+_RUNTIME_METRIC_COLUMNS = {
+    "cpu_ms": "DOUBLE",
+    "result_bytes": "BIGINT",
+    "peak_alloc_bytes": "BIGINT",
+    "ready_at_utc": "TIMESTAMP",
+    "started_at_utc": "TIMESTAMP",
+    "finished_at_utc": "TIMESTAMP",
+    "worker": "VARCHAR",
+    "queue_wait_ms": "DOUBLE",
+    "row_telemetry": "JSON",
+}
+_METRIC_VALUE_TYPES: dict[str, type | tuple[type, ...]] = {
+    "DOUBLE": (int, float),
+    "BIGINT": int,
+    "TIMESTAMP": datetime,
+    "VARCHAR": str,
+    "JSON": dict,
+}
+
+
+_RUNTIME_COLUMNS = [
+    ("run_id", "VARCHAR"),
+    ("step_name", "VARCHAR"),
+    ("status", "VARCHAR"),
+    ("duration_ms", "DOUBLE"),
+    ("input_lines", "INTEGER"),
+    ("output_lines", "INTEGER"),
+    ("throughput_in_lps", "DOUBLE"),
+    ("throughput_out_lps", "DOUBLE"),
+    ("output_text", "VARCHAR"),
+    ("result_kind", "VARCHAR"),
+    ("updated_at_utc", "TIMESTAMP"),
+    *_RUNTIME_METRIC_COLUMNS.items(),
+]
+_RUN_STATS_COLUMNS = [
+    ("run_id", "VARCHAR"),
+    ("scope", "VARCHAR"),
+    ("metric", "VARCHAR"),
+    ("value", "DOUBLE"),
+]
+_ATTACH_IDS = count(1)
+
+
+_DEFINITION_COLUMNS = [
+    ("run_id", "VARCHAR"),
+    ("step_name", "VARCHAR"),
+    ("table_name", "VARCHAR"),
+    ("deps_json", "VARCHAR"),
+    ("when_name", "VARCHAR"),
+    ("condition_bool", "BOOLEAN"),
+    ("is_branch", "BOOLEAN"),
+    ("code_text", "VARCHAR"),
+    ("disabled_deps_json", "VARCHAR"),
+    ("disabled_self", "BOOLEAN"),
+]
+
+
+@contextmanager
+def _staged_file(lines: Iterable[str]) -> Iterator[tuple[str, float]]:
+    fd, staged_path = tempfile.mkstemp(prefix="ninout_rows_", suffix=".jsonl")
+    try:
+        started = time.perf_counter()
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.writelines(lines)
+        yield staged_path, time.perf_counter() - started
+    finally:
+        os.remove(staged_path)
+
+
+def _staged_select(columns: list[tuple[str, str]], staged_path: str) -> str:
+    column_sql = ", ".join(_quote_identifier(name) for name, _type in columns)
+    columns_struct = ", ".join(
+        f"{_quote_literal(name)}: {_quote_literal(column_type)}"
+        for name, column_type in columns
+    )
+    return f"""
+        SELECT {column_sql}
+        FROM read_json(
+            {_quote_literal(staged_path)},
+            format = 'newline_delimited',
+            columns = {{{columns_struct}}}
+        )
+    """
+
+
+def _load_staged(
+    con,
+    table_name: str,
+    columns: list[tuple[str, str]],
+    lines: Iterable[str],
+) -> float:
+    column_sql = ", ".join(_quote_identifier(name) for name, _type in columns)
+    with _staged_file(lines) as (staged_path, serialize_s):
+        con.execute(
+            f"INSERT INTO {table_name} ({column_sql}) {_staged_select(columns, staged_path)}"
+        )
+    return serialize_s
+
+
+def _insert_values(
+    con,
+    table_name: str,
+    columns: list[tuple[str, str]],
+    rows: list[tuple[object, ...]],
+) -> None:
+    if not rows:
+        return
+    column_sql = ", ".join(_quote_identifier(name) for name, _type in columns)
+    placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+    con.execute(
+        f"INSERT INTO {table_name} ({column_sql}) VALUES {', '.join([placeholders] * len(rows))}",
+        [value for row in rows for value in row],
+    )
+
+
+def _copy_staged_to_parquet(
+    con,
+    columns: list[tuple[str, str]],
+    lines: Iterable[str],
+    target_path: str,
+) -> float:
+    with _staged_file(lines) as (staged_path, serialize_s):
+        con.execute(
+            f"COPY ({_staged_select(columns, staged_path)}) "
+            f"TO {_quote_literal(target_path)} ({_PARQUET_OPTIONS})"
+        )
+    return serialize_s
+
+
+def _create_step_table(con, table_name: str, schema: Mapping[str, str]) -> None:
+    column_sql = ", ".join(
+        f"{_quote_identifier(name)} {column_type}"
+        for name, column_type in _table_columns(schema)
+    )
+    con.execute(f"DROP TABLE IF EXISTS {table_name}")
+    con.execute(f"CREATE TABLE {table_name} ({column_sql})")
+
+
+def _record_from_row(
+    columns: list[tuple[str, str]],
+    row: tuple[object, ...],
+) -> object:
+    values = dict(zip((name for name, _type in columns), row))
+    payload_json = values.get(_PAYLOAD_COLUMN)
+    if payload_json is not None:
+        return json.loads(str(payload_json))
+    if "payload_json" in values and len(columns) == 2:
+        return json.loads(str(values["payload_json"]))
+    absent_json = values.get(_ABSENT_COLUMN)
+    absent = set(json.loads(str(absent_json))) if absent_json is not None else ()
+    record: dict[str, object] = {}
+    for name, column_type in columns:
+        if name in _RESERVED_COLUMNS or name in absent:
+            continue
+        item = values[name]
+        if column_type == "JSON" and item is not None:
+            item = json.loads(str(item))
+        record[name] = item
+    overflow_json = values.get(_OVERFLOW_COLUMN)
+    if overflow_json is not None:
+        record.update(json.loads(str(overflow_json)))
+    return record
+
+
+def set_rows_search_path(con, db_path: str) -> None:
+    run_dir = os.path.dirname(os.path.abspath(db_path))
+    con.execute(f"SET file_search_path = {_quote_literal(run_dir)}")
+
+
+@dataclass
+class _PendingParquetRows:
+    first_row_id: int
+    records: list[object]
+    since: float
+
+
+def table_exists(con, table_name: str) -> bool:
+    row = con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+        [table_name],
+    ).fetchone()
+    return bool(row and row[0])
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    column: str
+    op: str
+    value: object
+
+
+ROW_FILTER_OPERATORS = {
+    "eq": "=",
+    "ne": "<>",
+    "lt": "<",
+    "le": "<=",
+    "gt": ">",
+    "ge": ">=",
+    "contains": "contains",
+}
+
+
+def _step_columns(con, table_name: str) -> list[tuple[str, str]]:
+    return [
+        (str(name), str(column_type))
+        for name, column_type in con.execute(
+            """
+            SELECT column_name, data_type
+            FROM duckdb_columns()
+            WHERE table_name = ?
+            ORDER BY column_index
+            """,
+            [table_name],
+        ).fetchall()
+    ]
+
+
+def _is_legacy_table(columns: list[tuple[str, str]]) -> bool:
+    return [name for name, _type in columns] == ["row_id", "payload_json"]
+
+
+def _typed_columns(columns: list[tuple[str, str]]) -> dict[str, str]:
+    if _is_legacy_table(columns):
+        return {"row_id": "BIGINT"}
+    return {
+        name: column_type
+        for name, column_type in columns
+        if name not in (_OVERFLOW_COLUMN, _PAYLOAD_COLUMN, _ABSENT_COLUMN)
+    }
+
+
+def _json_sources(columns: list[tuple[str, str]]) -> list[str]:
+    if _is_legacy_table(columns):
+        return ["payload_json"]
+    names = {name for name, _type in columns}
+    return [name for name in (_OVERFLOW_COLUMN, _PAYLOAD_COLUMN) if name in names]
+
+
+def _json_path(key: str) -> str:
+    escaped = key.replace("\\", "\\\\").replace('"', '\\"')
+    return _quote_literal(f'$."{escaped}"')
+
+
+def _filter_kind(value: object) -> str:
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, (int, float)):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+def _cast_operand(expression: str, source_type: str, kind: str) -> str:
+    if source_type == kind or (kind == "DOUBLE" and source_type == "BIGINT"):
+        return expression
+    if source_type == "JSON":
+        text = f"json_extract_string({expression}, '$')"
+    elif source_type == "VARCHAR":
+        text = expression
+    else:
+        text = f"CAST({expression} AS VARCHAR)"
+    return text if kind == "VARCHAR" else f"TRY_CAST({text} AS {kind})"
+
+
+def _field_operands(columns: list[tuple[str, str]], key: str, kind: str) -> list[str]:
+    operands: list[str] = []
+    typed = _typed_columns(columns)
+    if key in typed:
+        operands.append(_cast_operand(_quote_identifier(key), typed[key], kind))
+    if key == "row_id":
+        return operands
+    path = _json_path(key)
+    for source in _json_sources(columns):
+        text = f"json_extract_string({_quote_identifier(source)}, {path})"
+        operands.append(_cast_operand(text, "VARCHAR", kind))
+    return operands
+
+
+def _filter_clause(
+    columns: list[tuple[str, str]],
+    row_filter: RowFilter,
+) -> tuple[str, list[object]]:
+    if not _field_operands(columns, row_filter.column, "VARCHAR"):
+        matches_missing = row_filter.value is None and row_filter.op == "eq"
+        return ("TRUE" if matches_missing else "FALSE"), []
+    if row_filter.value is None:
+        operands = _field_operands(columns, row_filter.column, "VARCHAR")
+        if row_filter.op == "eq":
+            return "(" + " AND ".join(f"{operand} IS NULL" for operand in operands) + ")", []
+        return "(" + " OR ".join(f"{operand} IS NOT NULL" for operand in operands) + ")", []
+    if row_filter.op == "contains":
+        operands = _field_operands(columns, row_filter.column, "VARCHAR")
+        value: object = str(row_filter.value)
+        parts = [f"contains({operand}, ?)" for operand in operands]
+    else:
+        kind = _filter_kind(row_filter.value)
+        operands = _field_operands(columns, row_filter.column, kind)
+        value = str(row_filter.value) if kind == "VARCHAR" else row_filter.value
+        operator = ROW_FILTER_OPERATORS[row_filter.op]
+        parts = [f"{operand} {operator} ?" for operand in operands]
+    return "(" + " OR ".join(parts) + ")", [value] * len(parts)
+
+
+def _where_clause(
+    columns: list[tuple[str, str]],
+    filters: Iterable[RowFilter],
+) -> tuple[list[str], list[object]]:
+    clauses: list[str] = []
+    params: list[object] = []
+    for row_filter in filters:
+        clause, clause_params = _filter_clause(columns, row_filter)
+        clauses.append(clause)
+        params.extend(clause_params)
+    return clauses, params
+
+
+def _sort_expression(columns: list[tuple[str, str]], key: str) -> str:
+    typed = _typed_columns(columns)
+    if key in typed:
+        return _quote_identifier(key)
+    texts = [
+        f"json_extract_string({_quote_identifier(source)}, {_json_path(key)})"
+        for source in _json_sources(columns)
+    ]
+    if not texts:
+        return "NULL"
+    return texts[0] if len(texts) == 1 else f"COALESCE({', '.join(texts)})"
+
+
+def _projection(
+    columns: list[tuple[str, str]],
+    names: list[str],
+) -> tuple[list[str], list[list[str | None]], bool]:
+    typed = _typed_columns(columns)
+    select: list[str] = []
+    parts: list[list[str | None]] = []
+    for name in names:
+        name_parts: list[str | None] = []
+        if name in typed:
+            select.append(_quote_identifier(name))
+            name_parts.append(typed[name])
+        for source in _json_sources(columns):
+            select.append(f"json_extract({_quote_identifier(source)}, {_json_path(name)})")
+            name_parts.append("JSON")
+        parts.append(name_parts)
+    scalar_sources = [
+        source for source in _json_sources(columns) if source != _OVERFLOW_COLUMN
+    ]
+    if scalar_sources:
+        source = _quote_identifier(scalar_sources[0])
+        select.append(f"CASE WHEN json_type({source}) <> 'OBJECT' THEN {source} END")
+    return select, parts, bool(scalar_sources)
+
+
+def _projected_record(
+    names: list[str],
+    parts: list[list[str | None]],
+    has_scalar: bool,
+    values: tuple[object, ...],
+) -> object:
+    if has_scalar and values[-1] is not None:
+        return json.loads(str(values[-1]))
+    record: dict[str, object] = {}
+    index = 0
+    for name, name_parts in zip(names, parts):
+        value: object = None
+        for part_type in name_parts:
+            item = values[index]
+            index += 1
+            if value is None and item is not None:
+                value = json.loads(str(item)) if part_type == "JSON" else item
+        record[name] = value
+    return record
+
+
+def count_step_rows(con, table_name: str, filters: Iterable[RowFilter] = ()) -> int:
+    if not table_exists(con, table_name):
+        return 0
+    clauses, params = _where_clause(_step_columns(con, table_name), filters)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return int(con.execute(f"SELECT count(*) FROM {table_name}{where}", params).fetchone()[0])
+
+
+def read_step_rows(
+    con,
+    table_name: str,
+    limit: int | None = None,
+    offset: int = 0,
+    after_row_id: int | None = None,
+    columns: list[str] | None = None,
+    filters: Iterable[RowFilter] = (),
+    sort: str | None = None,
+    descending: bool = False,
+) -> list[tuple[int, object]]:
+    table_columns = _step_columns(con, table_name)
+    if not table_columns:
+        return []
+    clauses, params = _where_clause(table_columns, filters)
+    direction = "DESC" if descending else "ASC"
+    if after_row_id is not None:
+        if sort not in (None, "row_id"):
+            raise ValueError("after_row_id requires sorting by row_id")
+        clauses.append("row_id < ?" if descending else "row_id > ?")
+        params.append(after_row_id)
+    order = f"row_id {direction}"
+    if sort not in (None, "row_id"):
+        order = f"{_sort_expression(table_columns, sort)} {direction} NULLS LAST, {order}"
+    if columns is None:
+        select = [_quote_identifier(name) for name, _type in table_columns]
+    else:
+        select, parts, has_scalar = _projection(table_columns, columns)
+        select.insert(0, "row_id")
+    query = f"SELECT {', '.join(select)} FROM {table_name}"
+    if clauses:
+        query += f" WHERE {' AND '.join(clauses)}"
+    query += f" ORDER BY {order}"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+    rows = con.execute(query, params).fetchall()
+    if columns is not None:
+        return [
+            (int(row[0]), _projected_record(columns, parts, has_scalar, row[1:]))
+            for row in rows
+        ]
+    row_id_index = [name for name, _type in table_columns].index("row_id")
+    return [(int(row[row_id_index]), _record_from_row(table_columns, row)) for row in rows]
+
+
 def _result_kind(value: object) -> str:
     if value is None:
         return "none"
@@ -53,6 +639,9 @@ class DuckDBRunLogger:
         steps: Mapping[str, Step],
         disabled_edges: set[tuple[str, str]] | None = None,
         disabled_steps: set[str] | None = None,
+        store_rows: bool = True,
+        parquet_dir: str | None = None,
+        connection: object | None = None,
     ) -> None:
         try:
             import duckdb  # type: ignore[import-not-found]
@@ -61,172 +650,521 @@ class DuckDBRunLogger:
                 "duckdb nao esta instalado. Instale com `uv add duckdb` para persistir resultados."
             ) from exc
 
-        self._con = duckdb.connect(db_path)
-        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
-        disabled_edge_set = set(disabled_edges or set())
-        disabled_step_set = set(disabled_steps or set())
+        self._owner = connection
+        self._attached: str | None = None
+        if connection is None:
+            self._con = duckdb.connect(db_path)
+        else:
+            self._attached = f"ninout_run_{next(_ATTACH_IDS)}"
+            connection.execute(f"ATTACH {_quote_literal(db_path)} AS {self._attached}")
+            self._con = connection.cursor()
+        try:
+            if self._attached is not None:
+                self._con.execute(f"USE {self._attached}")
+            self._db_error = duckdb.Error
+            self._store_rows = store_rows
+            self._parquet_dir = os.path.abspath(parquet_dir) if parquet_dir else None
+            self._run_dir = os.path.dirname(os.path.abspath(db_path))
+            self._schemas: dict[str, dict[str, str]] = {}
+            self._parquet_parts: dict[str, list[tuple[str, int]]] = {}
+            self._parquet_pending: dict[str, _PendingParquetRows] = {}
+            if self._parquet_dir is not None:
+                set_rows_search_path(self._con, db_path)
+            self.serialize_s = 0.0
+            self._layout_deps = (
+                {name: list(step.deps) for name, step in steps.items()}
+                if db_path != ":memory:"
+                else None
+            )
+            self.run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            disabled_edge_set = set(disabled_edges or set())
+            disabled_step_set = set(disabled_steps or set())
 
-        self._con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS run_metadata (
-                run_id VARCHAR,
-                dag_name VARCHAR,
-                created_at_utc TIMESTAMP,
-                step_count INTEGER
+            self._con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_metadata (
+                    run_id VARCHAR,
+                    dag_name VARCHAR,
+                    created_at_utc TIMESTAMP,
+                    step_count INTEGER
+                )
+                """
             )
-            """
-        )
-        self._con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS step_definition (
-                run_id VARCHAR,
-                step_name VARCHAR,
-                table_name VARCHAR,
-                deps_json VARCHAR,
-                when_name VARCHAR,
-                condition_bool BOOLEAN,
-                is_branch BOOLEAN,
-                code_text VARCHAR,
-                disabled_deps_json VARCHAR,
-                disabled_self BOOLEAN
+            self._con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS step_definition (
+                    run_id VARCHAR,
+                    step_name VARCHAR,
+                    table_name VARCHAR,
+                    deps_json VARCHAR,
+                    when_name VARCHAR,
+                    condition_bool BOOLEAN,
+                    is_branch BOOLEAN,
+                    code_text VARCHAR,
+                    disabled_deps_json VARCHAR,
+                    disabled_self BOOLEAN
+                )
+                """
             )
-            """
-        )
-        self._con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS step_runtime (
-                run_id VARCHAR,
-                step_name VARCHAR,
-                status VARCHAR,
-                duration_ms DOUBLE,
-                input_lines INTEGER,
-                output_lines INTEGER,
-                throughput_in_lps DOUBLE,
-                throughput_out_lps DOUBLE,
-                output_text VARCHAR,
-                result_kind VARCHAR,
-                updated_at_utc TIMESTAMP
+            self._con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS step_runtime (
+                    run_id VARCHAR,
+                    step_name VARCHAR,
+                    status VARCHAR,
+                    duration_ms DOUBLE,
+                    input_lines INTEGER,
+                    output_lines INTEGER,
+                    throughput_in_lps DOUBLE,
+                    throughput_out_lps DOUBLE,
+                    output_text VARCHAR,
+                    result_kind VARCHAR,
+                    updated_at_utc TIMESTAMP
+                )
+                """
             )
-            """
-        )
-        self._con.execute(
-            "ALTER TABLE step_runtime ADD COLUMN IF NOT EXISTS throughput_in_lps DOUBLE"
-        )
-        self._con.execute(
-            "ALTER TABLE step_runtime ADD COLUMN IF NOT EXISTS throughput_out_lps DOUBLE"
-        )
-        self._con.execute(
-            "INSERT INTO run_metadata VALUES (?, ?, ?, ?)",
-            [self.run_id, dag_name, created_at, len(steps)],
-        )
-
-        self.table_map: dict[str, str] = {}
-        for step_name, step in steps.items():
-            table_name = _table_name_for_step(step_name)
-            self.table_map[step_name] = table_name
             self._con.execute(
-                f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    row_id BIGINT,
-                    payload_json VARCHAR
+                """
+                CREATE TABLE IF NOT EXISTS step_stats (
+                    run_id VARCHAR,
+                    step_name VARCHAR,
+                    column_name VARCHAR,
+                    row_count BIGINT,
+                    value_count BIGINT,
+                    null_count BIGINT,
+                    min_json VARCHAR,
+                    max_json VARCHAR,
+                    distinct_estimate BIGINT
                 )
                 """
             )
-            disabled_deps = sorted(
-                source for source, target in disabled_edge_set if target == step_name
+            self._con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS step_profile (
+                    run_id VARCHAR,
+                    step_name VARCHAR,
+                    mode VARCHAR,
+                    samples BIGINT,
+                    kind VARCHAR,
+                    name VARCHAR,
+                    calls BIGINT,
+                    self_ms DOUBLE,
+                    total_ms DOUBLE
+                )
+                """
             )
             self._con.execute(
                 """
-                INSERT INTO step_definition VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    self.run_id,
-                    step_name,
-                    table_name,
-                    _to_payload(step.deps),
-                    step.when,
-                    step.condition,
-                    step.is_branch,
-                    _safe_source(step.func),
-                    _to_payload(disabled_deps),
-                    step_name in disabled_step_set,
-                ],
+                CREATE TABLE IF NOT EXISTS run_stats (
+                    run_id VARCHAR,
+                    scope VARCHAR,
+                    metric VARCHAR,
+                    value DOUBLE
+                )
+                """
+            )
+            self._con.execute(
+                "ALTER TABLE step_runtime ADD COLUMN IF NOT EXISTS throughput_in_lps DOUBLE"
+            )
+            self._con.execute(
+                "ALTER TABLE step_runtime ADD COLUMN IF NOT EXISTS throughput_out_lps DOUBLE"
             )
+            for column_name, column_type in _RUNTIME_METRIC_COLUMNS.items():
+                self._con.execute(
+                    f"ALTER TABLE step_runtime ADD COLUMN IF NOT EXISTS {column_name} {column_type}"
+                )
+            self._con.execute("BEGIN TRANSACTION")
+            self._con.execute(
+                "INSERT INTO run_metadata VALUES (?, ?, ?, ?)",
+                [self.run_id, dag_name, created_at, len(steps)],
+            )
+
+            self.table_map: dict[str, str] = {
+                step_name: _table_name_for_step(step_name) for step_name in steps
+            }
+            definitions = [
+                {
+                    "run_id": self.run_id,
+                    "step_name": step_name,
+                    "table_name": self.table_map[step_name],
+                    "deps_json": _to_payload(step.deps),
+                    "when_name": step.when,
+                    "condition_bool": step.condition,
+                    "is_branch": step.is_branch,
+                    "code_text": safe_source(step.func),
+                    "disabled_deps_json": _to_payload(
+                        sorted(
+                            source
+                            for source, target in disabled_edge_set
+                            if target == step_name
+                        )
+                    ),
+                    "disabled_self": step_name in disabled_step_set,
+                }
+                for step_name, step in steps.items()
+            ]
+            if definitions:
+                _load_staged(
+                    self._con,
+                    "step_definition",
+                    _DEFINITION_COLUMNS,
+                    (_to_payload(item) + "\n" for item in definitions),
+                )
             self._con.execute(
                 """
                 INSERT INTO step_runtime (
-                    run_id, step_name, status, duration_ms, input_lines, output_lines,
-                    throughput_in_lps, throughput_out_lps, output_text, result_kind, updated_at_utc
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    run_id, step_name, status, output_text, result_kind, updated_at_utc
+                )
+                SELECT run_id, step_name, 'pending', '', 'none', ?
+                FROM step_definition
+                WHERE run_id = ?
                 """,
-                [
-                    self.run_id,
-                    step_name,
-                    "pending",
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    "",
-                    "none",
-                    created_at,
-                ],
+                [created_at, self.run_id],
             )
+            self._con.execute("COMMIT")
+        except BaseException:
+            self._release()
+            raise
 
     def log_step(self, step_name: str, meta: Mapping[str, object]) -> None:
         table_name = self.table_map[step_name]
         result = meta.get("result")
         status_value = str(meta.get("status", ""))
-        if status_value in {"done", "failed"} or result is not None:
-            rows = _rows_for_result(result)
-            self._con.execute(f"DELETE FROM {table_name}")
-            if rows:
-                self._con.executemany(
-                    f"INSERT INTO {table_name} (row_id, payload_json) VALUES (?, ?)",
-                    rows,
-                )
+        append_offset = meta.get("append_offset")
+        if self._store_rows and isinstance(append_offset, int) and isinstance(result, list):
+            self._append_rows(table_name, result, append_offset)
+        elif self._store_rows and (status_value in {"done", "failed"} or result is not None):
+            row_ids = meta.get("row_ids")
+            self._insert_rows(
+                table_name,
+                _result_records(result),
+                row_ids if isinstance(row_ids, list) else None,
+            )
+        if status_value in {"done", "failed"}:
+            self._flush_parquet_rows(table_name)
+        stats = meta.get("stats")
+        if isinstance(stats, list):
+            self._write_stats(step_name, stats)
+        profile = meta.get("profile")
+        if isinstance(profile, StepProfile):
+            self._write_profile(step_name, profile)
 
         updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
         self._con.execute(
             "DELETE FROM step_runtime WHERE run_id = ? AND step_name = ?",
             [self.run_id, step_name],
         )
+        runtime = {
+            "run_id": self.run_id,
+            "step_name": step_name,
+            "status": status_value,
+            "duration_ms": meta.get("duration_ms")
+            if isinstance(meta.get("duration_ms"), (int, float))
+            else None,
+            "input_lines": meta.get("input_lines")
+            if isinstance(meta.get("input_lines"), int)
+            else None,
+            "output_lines": meta.get("output_lines")
+            if isinstance(meta.get("output_lines"), int)
+            else None,
+            "throughput_in_lps": meta.get("throughput_in_lps")
+            if isinstance(meta.get("throughput_in_lps"), (int, float))
+            else None,
+            "throughput_out_lps": meta.get("throughput_out_lps")
+            if isinstance(meta.get("throughput_out_lps"), (int, float))
+            else None,
+            "output_text": str(meta.get("output", "")),
+            "result_kind": _result_kind(result),
+            "updated_at_utc": updated_at,
+        }
+        for name, kind in _RUNTIME_METRIC_COLUMNS.items():
+            value = meta.get(name)
+            if not isinstance(value, _METRIC_VALUE_TYPES[kind]):
+                value = None
+            runtime[name] = _to_payload(value) if kind == "JSON" and value is not None else value
+        columns = [(name, kind) for name, kind in _RUNTIME_COLUMNS if runtime[name] is not None]
+        _insert_values(
+            self._con,
+            "step_runtime",
+            columns,
+            [tuple(runtime[name] for name, _type in columns)],
+        )
+
+    def _insert_rows(
+        self,
+        table_name: str,
+        records: list[object],
+        row_ids: list[int] | None = None,
+    ) -> None:
+        self._drop_step_rows(table_name)
+        if not records:
+            return
+        ids = row_ids if row_ids is not None else range(1, len(records) + 1)
+        schema = _infer_schema(records)
+        self._schemas[table_name] = schema
+        self._write_rows(table_name, records, ids, schema, first=True)
+
+    def _append_rows(self, table_name: str, records: list[object], offset: int) -> None:
+        if offset == 0:
+            self._drop_step_rows(table_name)
+        if not records:
+            return
+        ids = range(offset + 1, offset + len(records) + 1)
+        schema = self._schemas.get(table_name)
+        first = schema is None
+        if schema is None:
+            schema = _infer_schema(records)
+            self._schemas[table_name] = schema
+        if self._parquet_dir is not None:
+            self._buffer_parquet_rows(table_name, records, offset)
+            return
+        self._write_rows(table_name, records, ids, schema, first=first)
+
+    def _write_rows(
+        self,
+        table_name: str,
+        records: list[object],
+        row_ids: Iterable[int],
+        schema: Mapping[str, str],
+        first: bool,
+    ) -> None:
+        if self._parquet_dir is not None:
+            self._write_parquet_part(table_name, records, row_ids, schema)
+            return
+        if first:
+            _create_step_table(self._con, table_name, schema)
+        try:
+            self.serialize_s += _load_staged(
+                self._con,
+                table_name,
+                _table_columns(schema),
+                _staged_lines(records, schema, row_ids),
+            )
+        except self._db_error:
+            started = time.perf_counter()
+            rows = [
+                (row_id, payload_json)
+                for row_id, (_idx, payload_json) in zip(row_ids, _rows_for_result(records))
+            ]
+            self.serialize_s += time.perf_counter() - started
+            self._con.executemany(
+                f"INSERT INTO {table_name} (row_id, {_PAYLOAD_COLUMN}) VALUES (?, ?)",
+                rows,
+            )
+
+    def _step_parquet_dir(self, table_name: str) -> str:
+        return os.path.join(str(self._parquet_dir), table_name)
+
+    def _buffer_parquet_rows(self, table_name: str, records: list[object], offset: int) -> None:
+        pending = self._parquet_pending.get(table_name)
+        if pending is None:
+            pending = _PendingParquetRows(offset + 1, [], time.perf_counter())
+            self._parquet_pending[table_name] = pending
+        pending.records.extend(records)
+        if (
+            len(pending.records) >= _PARQUET_PART_ROWS
+            or time.perf_counter() - pending.since >= _PARQUET_FLUSH_S
+        ):
+            self._flush_parquet_rows(table_name)
+
+    def _flush_parquet_rows(self, table_name: str) -> None:
+        pending = self._parquet_pending.pop(table_name, None)
+        if pending is None or not pending.records:
+            return
+        row_ids = range(pending.first_row_id, pending.first_row_id + len(pending.records))
+        self._write_parquet_part(
+            table_name, pending.records, row_ids, self._schemas.get(table_name, {})
+        )
+
+    def _compact_parquet_parts(self, table_name: str) -> None:
+        groups: list[list[str]] = []
+        group: list[str] = []
+        group_rows = 0
+        for part_path, rows in self._parquet_parts.get(table_name, []):
+            if rows >= _PARQUET_PART_ROWS or group_rows + rows > _PARQUET_PART_ROWS:
+                groups.append(group)
+                group, group_rows = [], 0
+            if rows < _PARQUET_PART_ROWS:
+                group.append(part_path)
+                group_rows += rows
+        groups.append(group)
+        for paths in groups:
+            if len(paths) < 2:
+                continue
+            sources = ", ".join(_quote_literal(path) for path in paths)
+            staged_part = f"{paths[0]}.tmp"
+            self._con.execute(
+                f"""
+                COPY (
+                    SELECT * FROM read_parquet([{sources}], union_by_name = true)
+                    ORDER BY row_id
+                ) TO {_quote_literal(staged_part)} ({_PARQUET_OPTIONS})
+                """
+            )
+            os.replace(staged_part, paths[0])
+            for path in paths[1:]:
+                os.remove(path)
+
+    def _view_pattern(self, step_dir: str) -> str:
+        try:
+            return os.path.join(os.path.relpath(step_dir, self._run_dir), "*.parquet")
+        except ValueError:
+            return os.path.join(step_dir, "*.parquet")
+
+    def _write_parquet_part(
+        self,
+        table_name: str,
+        records: list[object],
+        row_ids: Iterable[int],
+        schema: Mapping[str, str],
+    ) -> None:
+        step_dir = self._step_parquet_dir(table_name)
+        parts = self._parquet_parts.setdefault(table_name, [])
+        if not parts:
+            os.makedirs(step_dir, exist_ok=True)
+        part_path = os.path.join(step_dir, f"part-{len(parts) + 1:05d}.parquet")
+        staged_part = f"{part_path}.tmp"
+        try:
+            self.serialize_s += _copy_staged_to_parquet(
+                self._con,
+                _table_columns(schema),
+                _staged_lines(records, schema, row_ids),
+                staged_part,
+            )
+        except self._db_error:
+            self.serialize_s += _copy_staged_to_parquet(
+                self._con,
+                _table_columns({}),
+                _staged_lines(records, {}, row_ids),
+                staged_part,
+            )
+        os.replace(staged_part, part_path)
+        parts.append((part_path, len(records)))
+        if len(parts) == 1:
+            pattern = self._view_pattern(step_dir)
+            self._con.execute(
+                f"""
+                CREATE OR REPLACE VIEW {table_name} AS
+                SELECT * FROM read_parquet({_quote_literal(pattern)}, union_by_name = true)
+                """
+            )
+
+    def _drop_step_rows(self, table_name: str) -> None:
+        self._schemas.pop(table_name, None)
+        if self._parquet_dir is None:
+            self._con.execute(f"DROP TABLE IF EXISTS {table_name}")
+            return
+        self._parquet_parts.pop(table_name, None)
+        self._parquet_pending.pop(table_name, None)
+        self._con.execute(f"DROP VIEW IF EXISTS {table_name}")
+        shutil.rmtree(self._step_parquet_dir(table_name), ignore_errors=True)
+
+    def _write_stats(self, step_name: str, stats: list[object]) -> None:
         self._con.execute(
-            """
-            INSERT INTO step_runtime (
-                run_id, step_name, status, duration_ms, input_lines, output_lines,
-                throughput_in_lps, throughput_out_lps, output_text, result_kind, updated_at_utc
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            "DELETE FROM step_stats WHERE run_id = ? AND step_name = ?",
+            [self.run_id, step_name],
+        )
+        _insert_values(
+            self._con,
+            "step_stats",
+            _STATS_COLUMNS,
             [
-                self.run_id,
-                step_name,
-                status_value,
-                meta.get("duration_ms")
-                if isinstance(meta.get("duration_ms"), (int, float))
-                else None,
-                meta.get("input_lines")
-                if isinstance(meta.get("input_lines"), int)
-                else None,
-                meta.get("output_lines")
-                if isinstance(meta.get("output_lines"), int)
-                else None,
-                meta.get("throughput_in_lps")
-                if isinstance(meta.get("throughput_in_lps"), (int, float))
-                else None,
-                meta.get("throughput_out_lps")
-                if isinstance(meta.get("throughput_out_lps"), (int, float))
-                else None,
-                str(meta.get("output", "")),
-                _result_kind(result),
-                updated_at,
+                (
+                    self.run_id,
+                    step_name,
+                    item.get("column_name"),
+                    item.get("row_count"),
+                    item.get("value_count"),
+                    item.get("null_count"),
+                    None if item.get("min_value") is None else _to_payload(item.get("min_value")),
+                    None if item.get("max_value") is None else _to_payload(item.get("max_value")),
+                    item.get("distinct_estimate"),
+                )
+                for item in stats
+                if isinstance(item, dict)
             ],
         )
 
+    def _write_profile(self, step_name: str, profile: StepProfile) -> None:
+        self._con.execute(
+            "DELETE FROM step_profile WHERE run_id = ? AND step_name = ?",
+            [self.run_id, step_name],
+        )
+        base = {
+            "run_id": self.run_id,
+            "step_name": step_name,
+            "mode": profile.mode,
+            "samples": profile.samples,
+        }
+        records = [
+            {
+                **base,
+                "kind": "function",
+                "name": item.name,
+                "calls": item.calls,
+                "self_ms": item.self_ms,
+                "total_ms": item.total_ms,
+            }
+            for item in profile.functions
+        ]
+        records.extend(
+            {**base, "kind": "stack", "name": stack, "calls": None, "self_ms": weight, "total_ms": None}
+            for stack, weight in profile.stacks.items()
+        )
+        if not records:
+            records.append(
+                {**base, "kind": "empty", "name": "", "calls": None, "self_ms": None, "total_ms": None}
+            )
+        self.serialize_s += _load_staged(
+            self._con,
+            "step_profile",
+            _PROFILE_COLUMNS,
+            (_to_payload(item) + "\n" for item in records),
+        )
+
+    def log_run_stats(self, stats: RunStats) -> None:
+        self._con.execute("DELETE FROM run_stats WHERE run_id = ?", [self.run_id])
+        _insert_values(
+            self._con,
+            "run_stats",
+            _RUN_STATS_COLUMNS,
+            [(self.run_id, scope, metric, value) for scope, metric, value in stats.rows()],
+        )
+
+    def export_parquet(self, table_name: str, path: str) -> bool:
+        if not table_exists(self._con, table_name):
+            return False
+        self._con.execute(
+            f"COPY {table_name} TO {_quote_literal(path)} ({_PARQUET_OPTIONS})"
+        )
+        return True
+
+    def _write_layout(self, deps: Mapping[str, list[str]]) -> None:
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS dag_layout (fingerprint VARCHAR, layout_json JSON)"
+        )
+        self._con.execute("DELETE FROM dag_layout")
+        self._con.execute("INSERT INTO dag_layout VALUES (?, ?)", list(cached_layout_json(deps)))
+
     def close(self) -> None:
-        self._con.close()
+        try:
+            for table_name in list(self._parquet_pending):
+                self._flush_parquet_rows(table_name)
+            for table_name in self._parquet_parts:
+                self._compact_parquet_parts(table_name)
+            if self._layout_deps is not None:
+                self._write_layout(self._layout_deps)
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        try:
+            self._con.close()
+        finally:
+            if self._attached is not None:
+                self._owner.execute(f"DETACH {self._attached}")
+                self._attached = None
 
 
 def load_steps_from_duckdb(db_path: str) -> dict[str, Step]:
@@ -239,6 +1177,7 @@ def load_steps_from_duckdb(db_path: str) -> dict[str, Step]:
 
     con = duckdb.connect(db_path, read_only=True)
     try:
+        set_rows_search_path(con, db_path)
         run_id_row = con.execute(
             "SELECT run_id FROM run_metadata ORDER BY created_at_utc DESC LIMIT 1"
         ).fetchone()
@@ -295,10 +1234,7 @@ def load_steps_from_duckdb(db_path: str) -> dict[str, Step]:
                 result_kind,
             ) = row
 
-            payload_rows = con.execute(
-                f"SELECT payload_json FROM {table_name} ORDER BY row_id"
-            ).fetchall()
-            parsed_rows = [json.loads(item[0]) for item in payload_rows]
+            parsed_rows = [record for _row_id, record in read_step_rows(con, table_name)]
             if result_kind == "none":
                 result_value = ""
             elif result_kind == "scalar":
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+from typing import Mapping
+
+from ninout.core.engine.metrics import RunStats
+from ninout.core.engine.models import Step
+from ninout.core.ui.persist_duckdb import DuckDBRunLogger
+
+
+class ParquetRunLogger:
+    def __init__(
+        self,
+        output_dir: str,
+        dag_name: str,
+        steps: Mapping[str, Step],
+        disabled_edges: set[tuple[str, str]] | None = None,
+        disabled_steps: set[str] | None = None,
+        store_rows: bool = True,
+    ) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self._staging = DuckDBRunLogger(
+            db_path=":memory:",
+            dag_name=dag_name,
+            steps=steps,
+            disabled_edges=disabled_edges,
+            disabled_steps=disabled_steps,
+            store_rows=store_rows,
+            parquet_dir=output_dir,
+        )
+        self.run_id = self._staging.run_id
+        self.table_map = self._staging.table_map
+
+    def _parquet_path(self, table_name: str) -> str:
+        return os.path.join(self.output_dir, f"{table_name}.parquet")
+
+    @property
+    def serialize_s(self) -> float:
+        return self._staging.serialize_s
+
+    def log_step(self, step_name: str, meta: Mapping[str, object]) -> None:
+        self._staging.log_step(step_name, meta)
+
+    def log_run_stats(self, stats: RunStats) -> None:
+        self._staging.log_run_stats(stats)
+
+    def close(self) -> None:
+        try:
+            for table_name in (
+                "run_metadata",
+                "step_definition",
+                "step_runtime",
+                "step_stats",
+                "step_profile",
+                "run_stats",
+            ):
+                self._staging.export_parquet(table_name, self._parquet_path(table_name))
+        finally:
+            self._staging.close()
@@ -1,27 +1,23 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-import inspect
 import json
 import os
 import sqlite3
 import threading
+import time
 from typing import Mapping
 
 from ninout.core.engine.models import Step
+from ninout.core.ui._util import safe_source
+
+LIVE_PREVIEW_ROWS = 1000
 
 
 def _to_payload(value: object) -> str:
     return json.dumps(value, ensure_ascii=False, default=str)
 
 
-def _safe_source(func: object) -> str:
-    try:
-        return inspect.getsource(func).rstrip()
-    except OSError:
-        return "# Codigo fonte indisponivel"
-
-
 def _rows_for_result(value: object) -> list[tuple[int, str]]:
     if value is None:
         return []
@@ -38,6 +34,166 @@ def _result_kind(value: object) -> str:
     return "scalar"
 
 
+_RUNTIME_METRIC_COLUMNS = {
+    "cpu_ms": "REAL",
+    "result_bytes": "INTEGER",
+    "peak_alloc_bytes": "INTEGER",
+    "ready_at_utc": "TEXT",
+    "started_at_utc": "TEXT",
+    "finished_at_utc": "TEXT",
+    "worker": "TEXT",
+    "queue_wait_ms": "REAL",
+    "row_telemetry": "TEXT",
+}
+_METRIC_VALUE_TYPES: dict[str, type | tuple[type, ...]] = {
+    "REAL": (int, float),
+    "INTEGER": int,
+    "TEXT": (datetime, str, dict),
+}
+
+
+def _runtime_metric_values(meta: Mapping[str, object]) -> list[object]:
+    values: list[object] = []
+    for name, kind in _RUNTIME_METRIC_COLUMNS.items():
+        value = meta.get(name)
+        if not isinstance(value, _METRIC_VALUE_TYPES[kind]):
+            value = None
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, dict):
+            value = _to_payload(value)
+        values.append(value)
+    return values
+
+
+def _ensure_columns(con: sqlite3.Connection, table: str, columns: Mapping[str, str]) -> None:
+    existing = {row[1] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, kind in columns.items():
+        if name not in existing:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+
+
+def ensure_run_catalog(con: sqlite3.Connection) -> None:
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_catalog (
+            run_name TEXT PRIMARY KEY,
+            run_id TEXT,
+            dag_name TEXT,
+            created_at_utc TEXT,
+            finished_at_utc TEXT,
+            updated_at_utc TEXT,
+            status TEXT,
+            step_count INTEGER,
+            status_summary_json TEXT,
+            source TEXT,
+            db_mtime REAL
+        )
+        """
+    )
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_run_catalog_created ON run_catalog (created_at_utc)"
+    )
+    con.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_run_catalog_dag
+        ON run_catalog (dag_name, created_at_utc)
+        """
+    )
+    con.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_run_catalog_status
+        ON run_catalog (status, created_at_utc)
+        """
+    )
+
+
+def upsert_run_catalog(con: sqlite3.Connection, entry: Mapping[str, object]) -> None:
+    con.execute(
+        """
+        INSERT INTO run_catalog (
+            run_name, run_id, dag_name, created_at_utc, finished_at_utc, updated_at_utc,
+            status, step_count, status_summary_json, source, db_mtime
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (run_name) DO UPDATE SET
+            run_id = excluded.run_id,
+            dag_name = excluded.dag_name,
+            created_at_utc = excluded.created_at_utc,
+            finished_at_utc = excluded.finished_at_utc,
+            updated_at_utc = excluded.updated_at_utc,
+            status = excluded.status,
+            step_count = excluded.step_count,
+            status_summary_json = excluded.status_summary_json,
+            source = excluded.source,
+            db_mtime = excluded.db_mtime
+        WHERE excluded.source = 'run' OR run_catalog.source <> 'run'
+        """,
+        [
+            entry.get("run_name"),
+            entry.get("run_id"),
+            entry.get("dag_name"),
+            entry.get("created_at_utc"),
+            entry.get("finished_at_utc"),
+            entry.get("updated_at_utc"),
+            entry.get("status"),
+            entry.get("step_count"),
+            _to_payload(entry.get("status_summary") or {}),
+            entry.get("source"),
+            entry.get("db_mtime"),
+        ],
+    )
+
+
+def run_status_from_summary(summary: Mapping[str, int], finished: bool) -> str:
+    unfinished = summary.get("pending", 0) + summary.get("running", 0)
+    if unfinished and not finished:
+        return "running"
+    if unfinished or summary.get("failed", 0):
+        return "failed"
+    return "done"
+
+
+def load_step_durations(db_path: str, dag_name: str, runs: int = 20) -> dict[str, list[float]]:
+    if not os.path.isfile(db_path):
+        return {}
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute(
+            """
+            SELECT s.step_name, s.duration_ms
+            FROM step_runtime s
+            JOIN (
+                SELECT run_name, run_id FROM run_catalog
+                WHERE dag_name = ? AND status IN ('done', 'failed')
+                ORDER BY created_at_utc DESC
+                LIMIT ?
+            ) c ON c.run_name = s.run_name AND c.run_id = s.run_id
+            WHERE s.status = 'done' AND s.duration_ms IS NOT NULL
+            """,
+            [dag_name, runs],
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        con.close()
+    durations: dict[str, list[float]] = {}
+    for step_name, duration_ms in rows:
+        durations.setdefault(str(step_name), []).append(float(duration_ms))
+    return durations
+
+
+def _catalog_timestamp() -> str:
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=" ")
+
+
+def connect_runs_db(db_path: str, busy_timeout_s: float = 10.0) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    con = sqlite3.connect(db_path, timeout=busy_timeout_s, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
 class SQLiteRunLogger:
     def __init__(
         self,
@@ -47,14 +203,20 @@ class SQLiteRunLogger:
         steps: Mapping[str, Step],
         disabled_edges: set[tuple[str, str]] | None = None,
         disabled_steps: set[str] | None = None,
+        store_rows: bool = True,
+        connection: sqlite3.Connection | None = None,
+        live_preview: bool = False,
     ) -> None:
-        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
-        self._con = sqlite3.connect(db_path, check_same_thread=False)
+        self._owns_connection = connection is None
+        self._con = connect_runs_db(db_path) if connection is None else connection
         self._lock = threading.Lock()
-        with self._lock:
-            self._con.execute("PRAGMA journal_mode=WAL")
-            self._con.execute("PRAGMA synchronous=NORMAL")
         self.run_name = run_name
+        self.dag_name = dag_name
+        self.serialize_s = 0.0
+        self._store_rows = store_rows
+        self._live_preview = live_preview and not store_rows
+        self._step_status: dict[str, str] = {step_name: "pending" for step_name in steps}
+        self._catalog_created_at = _catalog_timestamp()
         self.run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
         created_at = datetime.now(timezone.utc).isoformat()
         disabled_edge_set = set(disabled_edges or set())
@@ -109,6 +271,7 @@ class SQLiteRunLogger:
                 )
                 """
             )
+            _ensure_columns(self._con, "step_runtime", _RUNTIME_METRIC_COLUMNS)
             self._con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS step_rows (
@@ -130,18 +293,15 @@ class SQLiteRunLogger:
                 [self.run_name, self.run_id, dag_name, created_at, len(steps)],
             )
 
-            for step_name, step in steps.items():
-                disabled_deps = sorted(
-                    source for source, target in disabled_edge_set if target == step_name
-                )
-                self._con.execute(
-                    """
-                    INSERT OR REPLACE INTO step_definition (
-                        run_name, run_id, step_name, deps_json, when_name,
-                        condition_bool, is_branch, code_text, disabled_deps_json, disabled_self
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    [
+            self._con.executemany(
+                """
+                INSERT OR REPLACE INTO step_definition (
+                    run_name, run_id, step_name, deps_json, when_name,
+                    condition_bool, is_branch, code_text, disabled_deps_json, disabled_self
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
                         self.run_name,
                         self.run_id,
                         step_name,
@@ -149,42 +309,103 @@ class SQLiteRunLogger:
                         step.when,
                         step.condition,
                         int(step.is_branch),
-                        _safe_source(step.func),
-                        _to_payload(disabled_deps),
+                        safe_source(step.func),
+                        _to_payload(
+                            sorted(
+                                source
+                                for source, target in disabled_edge_set
+                                if target == step_name
+                            )
+                        ),
                         int(step_name in disabled_step_set),
-                    ],
-                )
-                self._con.execute(
-                    """
-                    INSERT OR REPLACE INTO step_runtime (
-                        run_name, run_id, step_name, status, duration_ms,
-                        input_lines, output_lines, throughput_in_lps, throughput_out_lps,
-                        output_text, result_kind, updated_at_utc
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    [
-                        self.run_name,
-                        self.run_id,
-                        step_name,
-                        "pending",
-                        None,
-                        None,
-                        None,
-                        None,
-                        None,
-                        "",
-                        "none",
-                        created_at,
-                    ],
+                    )
+                    for step_name, step in steps.items()
+                ],
+            )
+            self._con.execute(
+                """
+                INSERT OR REPLACE INTO step_runtime (
+                    run_name, run_id, step_name, status, output_text, result_kind, updated_at_utc
                 )
+                SELECT run_name, run_id, step_name, 'pending', '', 'none', ?
+                FROM step_definition
+                WHERE run_name = ? AND run_id = ?
+                """,
+                [created_at, self.run_name, self.run_id],
+            )
+            ensure_run_catalog(self._con)
+            self._update_catalog(finished=False)
             self._con.commit()
 
+    def _status_summary(self) -> dict[str, int]:
+        summary: dict[str, int] = {}
+        for status in self._step_status.values():
+            summary[status] = summary.get(status, 0) + 1
+        return summary
+
+    def _update_catalog(self, finished: bool) -> None:
+        summary = self._status_summary()
+        now = _catalog_timestamp()
+        upsert_run_catalog(
+            self._con,
+            {
+                "run_name": self.run_name,
+                "run_id": self.run_id,
+                "dag_name": self.dag_name,
+                "created_at_utc": self._catalog_created_at,
+                "finished_at_utc": now if finished else None,
+                "updated_at_utc": now,
+                "status": run_status_from_summary(summary, finished=finished),
+                "step_count": len(self._step_status),
+                "status_summary": summary,
+                "source": "run",
+                "db_mtime": None,
+            },
+        )
+
     def log_step(self, step_name: str, meta: Mapping[str, object]) -> None:
         with self._lock:
             result = meta.get("result")
             status_value = str(meta.get("status", ""))
-            if status_value in {"done", "failed"} or result is not None:
-                rows = _rows_for_result(result)
+            append_offset = meta.get("append_offset")
+            keep_rows = self._store_rows or self._live_preview
+            row_limit = None if self._store_rows else LIVE_PREVIEW_ROWS
+            if keep_rows and isinstance(append_offset, int) and isinstance(result, list):
+                if append_offset == 0:
+                    self._con.execute(
+                        "DELETE FROM step_rows WHERE run_name = ? AND run_id = ? AND step_name = ?",
+                        [self.run_name, self.run_id, step_name],
+                    )
+                if row_limit is not None:
+                    result = result[: max(0, row_limit - append_offset)]
+                started = time.perf_counter()
+                appended = [
+                    (self.run_name, self.run_id, step_name, append_offset + idx, payload_json)
+                    for idx, payload_json in _rows_for_result(result)
+                ]
+                self.serialize_s += time.perf_counter() - started
+                self._con.executemany(
+                    """
+                    INSERT OR REPLACE INTO step_rows (
+                        run_name, run_id, step_name, row_id, payload_json
+                    ) VALUES (?, ?, ?, ?, ?)
+                    """,
+                    appended,
+                )
+            elif keep_rows and (status_value in {"done", "failed"} or result is not None):
+                started = time.perf_counter()
+                rows = _rows_for_result(
+                    result[:row_limit]
+                    if row_limit is not None and isinstance(result, list)
+                    else result
+                )
+                self.serialize_s += time.perf_counter() - started
+                row_ids = meta.get("row_ids")
+                if isinstance(row_ids, list):
+                    rows = [
+                        (row_id, payload_json)
+                        for row_id, (_idx, payload_json) in zip(row_ids, rows)
+                    ]
                 self._con.execute(
                     "DELETE FROM step_rows WHERE run_name = ? AND run_id = ? AND step_name = ?",
                     [self.run_name, self.run_id, step_name],
@@ -203,13 +424,15 @@ class SQLiteRunLogger:
                     )
 
             updated_at = datetime.now(timezone.utc).isoformat()
+            metric_columns = ", ".join(_RUNTIME_METRIC_COLUMNS)
+            metric_params = ", ".join("?" for _ in _RUNTIME_METRIC_COLUMNS)
             self._con.execute(
-                """
+                f"""
                 INSERT OR REPLACE INTO step_runtime (
                     run_name, run_id, step_name, status, duration_ms,
                     input_lines, output_lines, throughput_in_lps, throughput_out_lps,
-                    output_text, result_kind, updated_at_utc
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    output_text, result_kind, updated_at_utc, {metric_columns}
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {metric_params})
                 """,
                 [
                     self.run_name,
@@ -234,10 +457,28 @@ class SQLiteRunLogger:
                     str(meta.get("output", "")),
                     _result_kind(result),
                     updated_at,
+                    *_runtime_metric_values(meta),
                 ],
             )
+            if self._step_status.get(step_name) != status_value:
+                self._step_status[step_name] = status_value
+                self._update_catalog(finished=False)
             self._con.commit()
 
     def close(self) -> None:
         with self._lock:
-            self._con.close()
+            try:
+                if self._live_preview:
+                    self._con.execute(
+                        "DELETE FROM step_rows WHERE run_name = ? AND run_id = ?",
+                        [self.run_name, self.run_id],
+                    )
+                self._update_catalog(finished=True)
+                self._con.commit()
+            except BaseException:
+                if not self._owns_connection:
+                    self._con.rollback()
+                raise
+            finally:
+                if self._owns_connection:
+                    self._con.close()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import chain
+import json
+import random
+import re
+from typing import Literal, TypeAlias
+
+RetentionKind: TypeAlias = Literal["all", "head", "reservoir", "none"]
+
+_RETENTION_PATTERN = re.compile(r"^(head|reservoir)\((\d+)\)$")
+# KMV over the K smallest hashes: relative standard error ~ 1/sqrt(K - 2), ~3% for K = 1024.
+_DISTINCT_SKETCH_SIZE = 1024
+# Prefilter at 4x the expected K-th smallest hash (K/n of the range); below K hits, sort all.
+_PREFILTER_MARGIN = 4
+_HASH_MASK = (1 << 64) - 1
+_HASH_OFFSET = 1 << 63
+
+
+@dataclass(frozen=True)
+class RowRetention:
+    kind: RetentionKind = "all"
+    limit: int | None = None
+
+    @property
+    def keeps_all(self) -> bool:
+        return self.kind == "all"
+
+
+def parse_row_retention(value: str | RowRetention) -> RowRetention:
+    if isinstance(value, RowRetention):
+        policy = value
+    else:
+        text = str(value).strip().lower()
+        match = _RETENTION_PATTERN.fullmatch(text)
+        if text in {"all", "none"}:
+            policy = RowRetention(kind=text)  # type: ignore[arg-type]
+        elif match is not None:
+            policy = RowRetention(kind=match.group(1), limit=int(match.group(2)))  # type: ignore[arg-type]
+        else:
+            raise ValueError(
+                f"Politica persist_rows invalida: {value}. Use all, none, head(n) ou reservoir(n)."
+            )
+    if policy.kind in {"head", "reservoir"} and (policy.limit is None or policy.limit < 0):
+        raise ValueError(f"Politica persist_rows {policy.kind} exige limite >= 0")
+    return policy
+
+
+def retain_rows(
+    result: object,
+    policy: RowRetention,
+) -> tuple[object, list[int] | None]:
+    if policy.keeps_all or result is None:
+        return result, None
+    if not isinstance(result, list):
+        if policy.kind == "none" or policy.limit == 0:
+            return None, None
+        return result, [1]
+    if policy.kind == "none":
+        kept: list[tuple[int, object]] = []
+    elif policy.kind == "head":
+        kept = list(enumerate(result[: policy.limit], start=1))
+    else:
+        kept = _reservoir_sample(result, int(policy.limit or 0))
+    return [record for _row_id, record in kept], [row_id for row_id, _record in kept]
+
+
+def _reservoir_sample(records: list[object], size: int) -> list[tuple[int, object]]:
+    if size <= 0:
+        return []
+    rng = random.Random()
+    sample: list[tuple[int, object]] = []
+    for row_id, record in enumerate(records, start=1):
+        if len(sample) < size:
+            sample.append((row_id, record))
+            continue
+        slot = rng.randrange(row_id)
+        if slot < size:
+            sample[slot] = (row_id, record)
+    sample.sort(key=lambda item: item[0])
+    return sample
+
+
+def _canonical_json(value: object) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+_FAMILIES: tuple[tuple[type | tuple[type, ...], str], ...] = (
+    (bool, "bool"),
+    ((int, float), "number"),
+    (str, "str"),
+    (datetime, "datetime"),
+    (date, "date"),
+)
+
+
+def _type_family(kind: type) -> str | None:
+    for types, family in _FAMILIES:
+        if issubclass(kind, types):
+            return family
+    return None
+
+
+class _ColumnStats:
+    def __init__(self, seen_rows: int) -> None:
+        self.value_count = 0
+        self.null_count = seen_rows
+        self.family: str | None = None
+        self.comparable = True
+        self.min_value: object = None
+        self.max_value: object = None
+        self._sketch: set[int] = set()
+
+    def update(self, values: list[object], missing: int = 0) -> None:
+        present = [value for value in values if value is not None]
+        self.null_count += missing + len(values) - len(present)
+        if not present:
+            return
+        self.value_count += len(present)
+        self._add_distinct(present)
+        if self.comparable:
+            self._add_bounds(present)
+
+    def _add_bounds(self, values: list[object]) -> None:
+        families = {_type_family(kind) for kind in set(map(type, values))}
+        if self.family is not None:
+            families.add(self.family)
+        if len(families) == 1 and None not in families:
+            try:
+                low = min(values)  # type: ignore[type-var]
+                high = max(values)  # type: ignore[type-var]
+                if self.min_value is not None:
+                    low = min(low, self.min_value)  # type: ignore[type-var]
+                    high = max(high, self.max_value)  # type: ignore[type-var]
+            except TypeError:
+                pass
+            else:
+                self.family = families.pop()
+                self.min_value, self.max_value = low, high
+                return
+        self.comparable = False
+        self.min_value = None
+        self.max_value = None
+
+    def _add_distinct(self, values: list[object]) -> None:
+        try:
+            hashes = set(map(hash, zip(values, map(type, values))))
+        except TypeError:
+            hashes = set(map(hash, map(_canonical_json, values)))
+        if len(self._sketch) >= _DISTINCT_SKETCH_SIZE:
+            hashes = set(filter(max(self._sketch).__gt__, hashes))
+        hashes |= self._sketch
+        if len(hashes) > _DISTINCT_SKETCH_SIZE:
+            cutoff = (
+                (_HASH_MASK + 1) * _PREFILTER_MARGIN * _DISTINCT_SKETCH_SIZE // len(hashes)
+                - _HASH_OFFSET
+            )
+            candidates = list(filter(cutoff.__gt__, hashes))
+            if len(candidates) < _DISTINCT_SKETCH_SIZE:
+                candidates = list(hashes)
+            hashes = set(sorted(candidates)[:_DISTINCT_SKETCH_SIZE])
+        self._sketch = hashes
+
+    def distinct_estimate(self) -> int:
+        if len(self._sketch) < _DISTINCT_SKETCH_SIZE:
+            return len(self._sketch)
+        largest = max(self._sketch) + _HASH_OFFSET
+        return int((_DISTINCT_SKETCH_SIZE - 1) * (_HASH_MASK + 1) / (largest + 1))
+
+
+class StepStatsCollector:
+    def __init__(self) -> None:
+        self.row_count = 0
+        self._columns: dict[str, _ColumnStats] = {}
+
+    def update(self, records: list[object]) -> None:
+        if not records:
+            return
+        rows = [record if isinstance(record, dict) else {"value": record} for record in records]
+        present = Counter(chain.from_iterable(rows))
+        if not all(isinstance(key, str) for key in present):
+            rows = [{str(key): value for key, value in row.items()} for row in rows]
+            present = Counter(chain.from_iterable(rows))
+        for column, stats in self._columns.items():
+            if column not in present:
+                stats.update([], missing=len(rows))
+        for column, count in present.items():
+            stats = self._columns.get(column)
+            if stats is None:
+                stats = _ColumnStats(seen_rows=self.row_count)
+                self._columns[column] = stats
+            if count == len(rows):
+                stats.update([row[column] for row in rows])
+            else:
+                stats.update(
+                    [row[column] for row in rows if column in row], missing=len(rows) - count
+                )
+        self.row_count += len(rows)
+
+    def rows(self) -> list[dict[str, object]]:
+        return [
+            {
+                "column_name": column,
+                "row_count": self.row_count,
+                "value_count": stats.value_count,
+                "null_count": stats.null_count,
+                "min_value": stats.min_value,
+                "max_value": stats.max_value,
+                "distinct_estimate": stats.distinct_estimate(),
+            }
+            for column, stats in self._columns.items()
+        ]
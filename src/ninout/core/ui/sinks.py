@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Literal, Mapping, Protocol, TypeAlias, runtime_checkable
+
+SinkKind: TypeAlias = Literal["duckdb", "sqlite", "parquet", "null"]
+SinkDetail: TypeAlias = Literal["rows", "preview", "metadata"]
+
+_SINK_KINDS = {"duckdb", "sqlite", "parquet", "null"}
+_SINK_DETAILS = {"rows", "preview", "metadata"}
+
+
+@runtime_checkable
+class RunSink(Protocol):
+    def log_step(self, step_name: str, meta: Mapping[str, object]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+@dataclass(frozen=True)
+class Sink:
+    kind: SinkKind
+    detail: SinkDetail = "rows"
+
+    @property
+    def store_rows(self) -> bool:
+        return self.detail == "rows"
+
+    @property
+    def live_preview(self) -> bool:
+        return self.detail == "preview"
+
+
+DEFAULT_SINKS: tuple[Sink, ...] = (Sink("duckdb"), Sink("sqlite", detail="metadata"))
+
+
+class NullRunLogger:
+    def log_step(self, step_name: str, meta: Mapping[str, object]) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def resolve_sinks(
+    sinks: Iterable[SinkKind | Sink | RunSink] | None,
+) -> list[Sink | RunSink]:
+    if sinks is None:
+        return list(DEFAULT_SINKS)
+    resolved: list[Sink | RunSink] = []
+    for item in sinks:
+        if isinstance(item, str):
+            item = Sink(item)  # type: ignore[arg-type]
+        if isinstance(item, Sink):
+            if item.kind not in _SINK_KINDS:
+                raise ValueError(f"Sink desconhecido: {item.kind}")
+            if item.detail not in _SINK_DETAILS:
+                raise ValueError(f"Sink {item.kind} tem detail invalido: {item.detail}")
+            if item.live_preview and item.kind != "sqlite":
+                raise ValueError(f"Sink {item.kind} nao suporta detail preview")
+        elif not isinstance(item, RunSink):
+            raise TypeError(
+                f"Sink deve ser str, Sink ou objeto com log_step/close, recebeu {type(item).__name__}"
+            )
+        resolved.append(item)
+    return resolved
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Mapping
+
+_PID = 1
+_QUEUE_TID = 0
+
+
+def _parse(value: object) -> datetime | None:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        return datetime.fromisoformat(value)
+    return None
+
+
+def _micros(value: datetime, origin: datetime) -> float:
+    return round((value - origin).total_seconds() * 1_000_000, 1)
+
+
+def build_chrome_trace(run_name: str, steps: Iterable[Mapping[str, object]]) -> dict[str, object]:
+    timed: list[tuple[Mapping[str, object], datetime | None, datetime, datetime]] = []
+    for step in steps:
+        started = _parse(step.get("started_at_utc"))
+        finished = _parse(step.get("finished_at_utc"))
+        if started is None or finished is None:
+            continue
+        timed.append((step, _parse(step.get("ready_at_utc")), started, finished))
+    timed.sort(key=lambda item: (item[2], str(item[0].get("step_name"))))
+
+    workers = sorted({str(step.get("worker") or "main") for step, _, _, _ in timed})
+    tids = {worker: idx for idx, worker in enumerate(workers, start=1)}
+    events: list[dict[str, object]] = [
+        {"ph": "M", "pid": _PID, "name": "process_name", "args": {"name": run_name}},
+        {"ph": "M", "pid": _PID, "tid": _QUEUE_TID, "name": "thread_name", "args": {"name": "queue"}},
+    ]
+    events.extend(
+        {"ph": "M", "pid": _PID, "tid": tid, "name": "thread_name", "args": {"name": worker}}
+        for worker, tid in tids.items()
+    )
+    if not timed:
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    origin = min(ready or started for _, ready, started, _ in timed)
+    for idx, (step, ready, started, finished) in enumerate(timed):
+        name = str(step.get("step_name"))
+        events.append(
+            {
+                "ph": "X",
+                "pid": _PID,
+                "tid": tids[str(step.get("worker") or "main")],
+                "name": name,
+                "cat": str(step.get("status") or "done"),
+                "ts": _micros(started, origin),
+                "dur": max(0.0, _micros(finished, started)),
+                "args": {
+                    key: step[key]
+                    for key in (
+                        "status",
+                        "duration_ms",
+                        "cpu_ms",
+                        "queue_wait_ms",
+                        "input_lines",
+                        "output_lines",
+                    )
+                    if step.get(key) is not None
+                },
+            }
+        )
+        if ready is not None and ready < started:
+            for phase, moment in (("b", ready), ("e", started)):
+                events.append(
+                    {
+                        "ph": phase,
+                        "pid": _PID,
+                        "tid": _QUEUE_TID,
+                        "name": name,
+                        "cat": "queue",
+                        "id": idx,
+                        "ts": _micros(moment, origin),
+                    }
+                )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}